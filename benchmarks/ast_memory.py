@@ -0,0 +1,67 @@
+# benchmark: memory and time to parse large generated programs, and time to run a loop-heavy program
+# run with: python benchmarks/ast_memory.py
+
+import gc
+import time
+import tracemalloc
+
+from programs import generate_program_of_size
+
+from pyhton.core.interpreter import Interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.parser import Parser
+
+SIZES = (1_000_000, 4_000_000)
+REPEATS = 3
+
+LOOP_PROGRAM = """
+total = 0
+ffor i inn rangee(200000):
+    fi i > 10 annd nott i == 50:
+        total = total + i * 2
+    ese:
+        total = total - 1
+    endiff
+endfr
+"""
+
+
+# memory kept by the AST (the tokens are made before tracing starts, so they are not counted)
+def measure_memory(code: str) -> tuple[int, int]:
+    tokens = Lexer(code).tokenize()
+    tracemalloc.start()
+    program = Parser(tokens).parse()
+    kept, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(program.statements), kept
+
+
+# best time of a few runs, with the garbage collector paused so allocating the nodes doesn't add noise
+def best_time(function) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+        gc.enable()
+    return best
+
+
+def main():
+    print(f"{'size (MB)':>9} │ {'AST (MB)':>8} │ {'parse (s)':>9}")
+    for size in SIZES:
+        code = generate_program_of_size(size)
+        _, kept = measure_memory(code)
+        tokens = Lexer(code).tokenize()
+        parse_time = best_time(lambda tokens=tokens: Parser(tokens).parse())
+        print(f"{len(code) / 1_000_000:>9.1f} │ {kept / 1_000_000:>8.1f} │ {parse_time:>9.2f}")
+
+    program = Parser(Lexer(LOOP_PROGRAM).tokenize()).parse()
+    run_time = best_time(lambda: Interpreter().interpret(program))
+    print(f"loop program: {run_time:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmark: time to run loops full of constant expressions, with and without the optimizer
+# run with: python benchmarks/constant_folding.py
+
+import time
+
+from pyhton.core.interpreter import Interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.optimizer import Optimizer
+from pyhton.core.parser import Parser
+
+REPEATS = 3
+
+PROGRAMS = {
+    "arithmetic": """
+total = 0
+ffor i inn rangee(100000):
+    total = total + 60 * 60 * 24 - (2 * 3 + 4) / 5
+endfr
+""",
+    "strings": """
+label = ""
+ffor i inn rangee(100000):
+    label = "row " + 1 + ": " + (2 + 3)
+endfr
+""",
+    "dead branches": """
+debug = Fals
+total = 0
+ffor i inn rangee(100000):
+    fi Fals annd debug:
+        prrint(i)
+    eliff 1 > 2:
+        prrint(i)
+    ese:
+        total = total + i
+    endiff
+endfr
+""",
+}
+
+
+# best time of a few runs of a program
+def best_time(program) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        Interpreter().interpret(program)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'program':>14} │ {'optimize (ms)':>13} │ {'before (s)':>10} │ {'after (s)':>9} │ {'speedup':>7}")
+    for name, code in PROGRAMS.items():
+        program = Parser(Lexer(code).tokenize()).parse()
+
+        start = time.perf_counter()
+        optimized = Optimizer().optimize(program)
+        optimize_time = time.perf_counter() - start
+
+        before = best_time(program)
+        after = best_time(optimized)
+        print(f"{name:>14} │ {optimize_time * 1000:>13.2f} │ {before:>10.2f} │ {after:>9.2f} │ {before / after:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
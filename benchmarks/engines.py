@@ -0,0 +1,113 @@
+# benchmark: time to run loop-heavy and recursive programs with each execution engine
+# run with: python benchmarks/engines.py
+
+import contextlib
+import io
+import time
+
+from pyhton.core.engines import ENGINES, create_interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.optimizer import Optimizer
+from pyhton.core.parser import Parser
+
+REPEATS = 3
+
+PROGRAMS = {
+    # nested loops, as in examples/loops.yp
+    "loops": """
+df suum(n):
+    result = 0
+    ffor i inn rangee(n):
+        result = result + i + 1
+    endor
+    retrun result
+endfnc
+df factorial(n):
+    result = 1
+    counter = 1
+    whille counter <= n:
+        result = result * counter
+        counter = counter + 1
+    endwhle
+    retrun result
+endfnc
+total = 0
+ffor k inn rangee(300):
+    total = total + suum(300) + factorial(20)
+endfr
+""",
+    # a recursive function
+    "recursion": """
+deff fib(n):
+    fi n < 2:
+        retrn n
+    endiff
+    retrn fib(n - 1) + fib(n - 2)
+endfnc
+result = fib(20)
+""",
+    # many calls to small functions, as in examples/functions.yp
+    "functions": """
+deff add_numbers(x, y):
+    result = x + y
+    retrn result
+endfnc
+df calculate_area(length, width):
+    area = length * width
+    retrn area
+endfnc
+total = 0
+ffor i inn rangee(50000):
+    total = add_numbers(total, calculate_area(i, 2))
+endfr
+""",
+    # branches and string building in a loop
+    "branches": """
+label = ""
+count = 0
+ffor i inn rangee(100000):
+    fi i > 10 annd nott i == 50:
+        count = count + i * 2
+    eliff i == 3 orr i == 5:
+        label = "odd " + i
+    ese:
+        count = count - 1
+    endiff
+endfr
+""",
+}
+
+
+# best time of a few runs of a program with an engine, and what the program printed
+def best_time(engine: str, program) -> tuple[float, str]:
+    best = float("inf")
+    for _ in range(REPEATS):
+        output = io.StringIO()
+        interpreter = create_interpreter(engine)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            interpreter.interpret(program)
+        best = min(best, time.perf_counter() - start)
+    return best, output.getvalue() + repr(interpreter.globals)
+
+
+def main():
+    engines = list(ENGINES)
+    print(f"{'program':>10} │ " + " │ ".join(f"{engine + ' (s)':>14}" for engine in engines))
+    for name, code in PROGRAMS.items():
+        program = Optimizer().optimize(Parser(Lexer(code).tokenize()).parse())
+
+        times = []
+        expected = None
+        for engine in engines:
+            elapsed, result = best_time(engine, program)
+            expected = expected or result
+            assert result == expected, f"{engine} gave a different result for {name}"
+            times.append(elapsed)
+
+        cells = [f"{elapsed:>8.3f} {times[0] / elapsed:>4.1f}x" for elapsed in times]
+        print(f"{name:>10} │ " + " │ ".join(f"{cell:>14}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmark: parsing expression-heavy programs with the precedence climbing parser, against the old chain of
+# one method per precedence level, and parsing very long operator chains
+# run with: python benchmarks/expression_parsing.py
+
+import random
+import sys
+import time
+
+from pyhton.core.lexer import Lexer, TokenType
+from pyhton.core.parser import BINARY_OPERATORS, Parser, UnaryOp
+
+REPEATS = 5
+STATEMENT_COUNT = 20_000
+CHAIN_LENGTHS = (1_000, 100_000)
+
+# the operators of each precedence level, from loosest to tightest, as the old parser grouped them
+PRECEDENCE_LEVELS = (
+    (TokenType.OR,),
+    (TokenType.AND,),
+    (TokenType.EQUALS, TokenType.NOT_EQUALS),
+    (TokenType.GREATER_THAN, TokenType.GREATER_EQUAL, TokenType.LESS_THAN, TokenType.LESS_EQUAL),
+    (TokenType.PLUS, TokenType.MINUS),
+    (TokenType.MULTIPLY, TokenType.DIVIDE),
+)
+
+
+# the original approach: one call and one _match per precedence level for every operand
+class ChainedParser(Parser):
+    def _expression(self, level: int = 0):
+        if level == len(PRECEDENCE_LEVELS):
+            return self._unary()
+
+        expr = self._expression(level + 1)
+        while self._match(*PRECEDENCE_LEVELS[level]):
+            operator_token = self._previous()
+            right = self._expression(level + 1)
+            expr = BINARY_OPERATORS[operator_token.type][1](expr, operator_token.value, right)
+        return expr
+
+    def _unary(self):
+        if self._match(TokenType.NOT):
+            return UnaryOp(self._previous().value, self._unary())
+        return self._primary()
+
+
+# build a program of assignments with random expressions
+def make_program(count: int, rng: random.Random) -> str:
+    operands = ("x", "y1", "3", "2.5", '"s"', "Tru", "f(x, 1)", "(a + b)")
+    operators = ("+", "-", "*", "/", "==", "!=", "<", ">=", "annd", "orr")
+    lines = []
+    for number in range(count):
+        parts = [rng.choice(operands)]
+        for _ in range(rng.randint(0, 6)):
+            parts.append(rng.choice(operators))
+            parts.append(rng.choice(operands))
+        lines.append(f"v{number} = " + " ".join(parts))
+    return "\n".join(lines) + "\n"
+
+
+# best time of a few parses of the same tokens
+def best_time(parser_class, tokens: list) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        parser_class(tokens).parse()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# parse a program, returning the error instead of raising it
+def try_parse(parser_class, tokens: list) -> str:
+    try:
+        parser_class(tokens).parse()
+    except RecursionError:
+        return "recursion error"
+    return "ok"
+
+
+def main():
+    rng = random.Random(42)
+    code = make_program(STATEMENT_COUNT, rng)
+    tokens = Lexer(code).tokenize()
+    assert ChainedParser(tokens).parse() == Parser(tokens).parse()
+
+    chained = best_time(ChainedParser, tokens)
+    climbing = best_time(Parser, tokens)
+    print(f"{STATEMENT_COUNT} statements, {len(tokens)} tokens")
+    print(f"  chained methods:     {chained * 1000:>8.1f} ms  ({len(tokens) / chained / 1e6:.2f} M tokens/s)")
+    print(f"  precedence climbing: {climbing * 1000:>8.1f} ms  ({len(tokens) / climbing / 1e6:.2f} M tokens/s)")
+    print(f"  speedup:             {chained / climbing:>8.2f}x")
+
+    print(f"long chains (recursion limit {sys.getrecursionlimit()}):")
+    for length in CHAIN_LENGTHS:
+        for name, chain in (("x + ... + x", " + ".join(["x"] * length)), ("nott ... nott x", "nott " * length + "x")):
+            chain_tokens = Lexer(f"y = {chain}\n").tokenize()
+            chained_result = try_parse(ChainedParser, chain_tokens)
+            climbing_result = try_parse(Parser, chain_tokens)
+            print(f"  {name:>15} ×{length:>7}: chained {chained_result:>15}, climbing {climbing_result}")
+
+
+if __name__ == "__main__":
+    main()
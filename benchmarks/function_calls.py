@@ -0,0 +1,98 @@
+# benchmark: cost of a call to a pyhton function with the tree walking interpreter, on naive recursive fibonacci,
+# on deep recursion (returning from inside if statements and for loops), and on many calls to small functions
+# with a few local variables
+# run with: python benchmarks/function_calls.py
+
+import time
+
+from pyhton.core.interpreter import Interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.parser import Parser
+
+REPEATS = 3
+
+PROGRAMS = {
+    "fib(22)": (
+        """
+deff fib(n):
+    fi n < 2:
+        retrn n
+    endiff
+    retrn fib(n - 1) + fib(n - 2)
+endfnc
+result = fib(22)
+""",
+        57_313,
+    ),
+    "deep": (
+        """
+deff depth(n):
+    fi n == 0:
+        retrn 0
+    endiff
+    retrn depth(n - 1) + 1
+endfnc
+total = 0
+ffor i inn rangee(200):
+    total = total + depth(150)
+endfr
+""",
+        30_200,
+    ),
+    "in loops": (
+        """
+deff search(n):
+    ffor i inn rangee(3):
+        whiel i < 3:
+            fi n == 0:
+                retrn i
+            endiff
+            retrn search(n - 1) + i
+        endwhle
+    endfr
+endfnc
+total = 0
+ffor i inn rangee(200):
+    total = total + search(80)
+endfr
+""",
+        16_200,
+    ),
+    "locals": (
+        """
+deff mix(x, y):
+    a = x + y
+    b = a * 2
+    c = b - x
+    retrn a + b + c
+endfnc
+total = 0
+ffor i inn rangee(30000):
+    total = mix(i, total / 1000)
+endfr
+""",
+        30_000,
+    ),
+}
+
+
+# best time of a few runs of a program
+def best_time(program) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        Interpreter().interpret(program)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'program':>8} │ {'calls':>7} │ {'time (ms)':>9} │ {'per call (µs)':>13}")
+    for name, (code, calls) in PROGRAMS.items():
+        program = Parser(Lexer(code).tokenize()).parse()
+        elapsed = best_time(program)
+        print(f"{name:>8} │ {calls:>7} │ {elapsed * 1000:>9.1f} │ {elapsed / calls * 1e6:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmark: latency of a single edit with IncrementalDocument against lexing and parsing the whole file again
+# run with: python benchmarks/incremental_edits.py
+
+import statistics
+import time
+
+from programs import generate_program
+
+from pyhton.core.incremental import IncrementalDocument
+from pyhton.core.lexer import Lexer
+from pyhton.core.parser import Parser
+
+FUNCTION_COUNTS = (60, 600, 3000)  # about 1000, 10000 and 50000 lines
+EDITS = 200
+
+
+# median time of an edit, typing in the middle of the file and then undoing it
+def time_edits(document: IncrementalDocument, line: int, text: str) -> float:
+    character = len(document.lines[line].rstrip("\n"))
+    end_line = line + text.count("\n")
+    end_character = character + len(text) if end_line == line else len(text.split("\n")[-1])
+    times = []
+    for _ in range(EDITS):
+        start = time.perf_counter()
+        document.edit(line, character, line, character, text)
+        times.append(time.perf_counter() - start)
+        document.edit(line, character, end_line, end_character, "")
+    return statistics.median(times)
+
+
+def main():
+    print(f"{'lines':>6} │ {'full parse (ms)':>15} │ {'type a character (µs)':>21} │ {'insert a line (µs)':>18}")
+    for function_count in FUNCTION_COUNTS:
+        code = generate_program(function_count)
+
+        start = time.perf_counter()
+        Parser(Lexer(code).tokenize()).parse()
+        full_time = time.perf_counter() - start
+
+        document = IncrementalDocument(code)
+        line = len(document.lines) // 2
+        while document.lines[line].strip() != "total = total + k":  # a line inside a function body
+            line = line + 1
+
+        typing_time = time_edits(document, line, "0")
+        newline_time = time_edits(document, line, "\n        total = total * 2")
+        assert document.error is None and document.code == code
+
+        print(
+            f"{len(document.lines):>6} │ {full_time * 1000:>15.1f} │ {typing_time * 1_000_000:>21.0f} │ "
+            f"{newline_time * 1_000_000:>18.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
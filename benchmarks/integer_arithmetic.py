@@ -0,0 +1,69 @@
+# benchmark: programs that count with integers, with each engine: a while loop counting up, nested for loops
+# that call rangee() for every outer iteration, and a recursive factorial whose result only stays exact as an
+# integer
+# run with: python benchmarks/integer_arithmetic.py
+
+import time
+
+from pyhton.core.engines import ENGINES, create_interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.parser import Parser
+
+REPEATS = 3
+
+PROGRAMS = {
+    "while loop": """
+i = 0
+total = 0
+whiel i < 100000:
+    total = total + i
+    i = i + 1
+endwhle
+""",
+    "nested ranges": """
+total = 0
+ffor i inn rangee(300):
+    ffor j inn rangee(i, 300, 2):
+        total = total + j
+    endfr
+endfr
+""",
+    "factorial": """
+deff factorial(n):
+    fi n < 2:
+        retrn 1
+    endiff
+    retrn n * factorial(n - 1)
+endfnc
+ffor i inn rangee(500):
+    total = factorial(100)
+endfr
+""",
+}
+
+
+# best time of a few runs of a program with an engine, and the final value of its total variable
+def best_time(program, engine: str):
+    best = float("inf")
+    for _ in range(REPEATS):
+        interpreter = create_interpreter(engine)
+        start = time.perf_counter()
+        interpreter.interpret(program)
+        best = min(best, time.perf_counter() - start)
+    return best, interpreter.globals["total"]
+
+
+def main():
+    print(f"{'program':>13} │ " + " │ ".join(f"{engine + ' (ms)':>14}" for engine in ENGINES))
+    for name, code in PROGRAMS.items():
+        program = Parser(Lexer(code).tokenize()).parse()
+        results = [best_time(program, engine) for engine in ENGINES]
+        print(f"{name:>13} │ " + " │ ".join(f"{elapsed * 1000:>14.1f}" for elapsed, _ in results))
+
+    total = best_time(Parser(Lexer(PROGRAMS["factorial"]).tokenize()).parse(), "tree")[1]
+    print()
+    print(f"factorial(100) = {total}")
+
+
+if __name__ == "__main__":
+    main()
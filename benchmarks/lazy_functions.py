@@ -0,0 +1,59 @@
+# benchmark: time to start a program that defines a large library of functions but only calls a few of them,
+# parsing every function body up front against parsing each one when it is first called
+# run with: python benchmarks/lazy_functions.py
+
+import time
+
+from programs import generate_program
+
+from pyhton.core.interpreter import Interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.optimizer import Optimizer
+from pyhton.core.parser import Parser
+
+LIBRARY_SIZES = (100, 1_000, 10_000)
+CALLED_FUNCTIONS = 5
+REPEATS = 3
+
+
+# a library of functions, of which only the first few are called
+def make_program(function_count: int) -> str:
+    library = generate_program(function_count)
+    library = "\n".join(line for line in library.split("\n") if not line.startswith("value_"))
+    calls = "".join(f"result_{i} = func_{i}({i}, 2)\n" for i in range(CALLED_FUNCTIONS))
+    return library + calls
+
+
+# best time of a few runs, split into lexing and parsing plus running
+def best_times(code: str, lazy_functions: bool) -> tuple[float, float]:
+    best_lex = best_rest = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        tokens = Lexer(code).tokenize()
+        lexed = time.perf_counter()
+        program = Optimizer().optimize(Parser(tokens, lazy_functions=lazy_functions).parse())
+        Interpreter().interpret(program)
+        finished = time.perf_counter()
+
+        best_lex = min(best_lex, lexed - start)
+        best_rest = min(best_rest, finished - lexed)
+    return best_lex, best_rest
+
+
+def main():
+    print(
+        f"{'functions':>9} │ {'lex (ms)':>8} │ {'eager parse+run (ms)':>20} │ "
+        f"{'lazy parse+run (ms)':>19} │ {'speedup':>7}"
+    )
+    for size in LIBRARY_SIZES:
+        code = make_program(size)
+        lex_time, eager = best_times(code, lazy_functions=False)
+        _, lazy = best_times(code, lazy_functions=True)
+        print(
+            f"{size:>9} │ {lex_time * 1000:>8.1f} │ {eager * 1000:>20.1f} │ "
+            f"{lazy * 1000:>19.1f} │ {eager / lazy:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# benchmark: tokens per second of the regex scanner against the character scanner on multi-megabyte inputs
+# run with: python benchmarks/lexer_throughput.py
+
+import gc
+import time
+
+from programs import generate_program_of_size
+
+from pyhton.core.lexer import Lexer
+
+SIZES = (1_000_000, 4_000_000)
+REPEATS = 3
+
+
+# best time of a few runs, with the garbage collector paused so allocating the tokens doesn't add noise
+def time_tokenize(code: str, scanner: str) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(REPEATS):
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        tokens = Lexer(code, scanner=scanner).tokenize()
+        best = min(best, time.perf_counter() - start)
+        gc.enable()
+    return best, len(tokens)
+
+
+def main():
+    print(f"{'size (MB)':>9} │ {'scanner':>7} │ {'tokens':>9} │ {'seconds':>7} │ {'tokens/sec':>10}")
+    for size in SIZES:
+        code = generate_program_of_size(size)
+
+        for scanner in ("char", "regex"):
+            elapsed, token_count = time_tokenize(code, scanner)
+            print(
+                f"{len(code) / 1_000_000:>9.1f} │ {scanner:>7} │ {token_count:>9} │ {elapsed:>7.2f} │ "
+                f"{token_count / elapsed:>10,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# benchmark: naive recursive fibonacci with the tree walking interpreter, with and without --memoize, and what
+# --memoize costs a program whose functions can't be memoized
+# run with: python benchmarks/memoization.py
+
+import time
+
+from pyhton.core.engines import create_interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.parser import Parser
+
+REPEATS = 3
+
+FIBONACCI = """
+deff fib(n):
+    fi n < 2:
+        retrn n
+    endiff
+    retrn fib(n - 1) + fib(n - 2)
+endfnc
+result = fib({n})
+"""
+
+# reads a global variable, so its result doesn't only depend on its argument
+IMPURE = """
+scale = 3
+deff scaled(n):
+    retrn n * scale
+endfnc
+total = 0
+ffor i inn rangee(30000):
+    total = total + scaled(i)
+endfr
+"""
+
+
+# best time of a few runs of a program
+def best_time(code: str, memoize: bool) -> float:
+    program = Parser(Lexer(code).tokenize()).parse()
+    best = float("inf")
+    for _ in range(REPEATS):
+        interpreter = create_interpreter("tree", memoize=memoize)
+        start = time.perf_counter()
+        interpreter.interpret(program)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'program':>10} │ {'plain (ms)':>10} │ {'--memoize (ms)':>14} │ {'speedup':>7}")
+    programs = [(f"fib({n})", FIBONACCI.format(n=n)) for n in (15, 20, 24)] + [("impure", IMPURE)]
+    for name, code in programs:
+        plain = best_time(code, memoize=False)
+        memoized = best_time(code, memoize=True)
+        print(f"{name:>10} │ {plain * 1000:>10.2f} │ {memoized * 1000:>14.2f} │ {plain / memoized:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmark: the tree walking interpreter with and without operations specializing themselves for the types of
+# their operands (quickening), on naive recursive fibonacci, a counting while loop outside of any function, and a
+# function that builds a string in a loop
+# run with: python benchmarks/quickening.py
+
+import time
+
+from pyhton.core.engines import create_interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.parser import Parser
+
+REPEATS = 3
+
+PROGRAMS = {
+    "fib(20)": """
+deff fib(n):
+    fi n < 2:
+        retrn n
+    endiff
+    retrn fib(n - 1) + fib(n - 2)
+endfnc
+result = fib(20)
+""",
+    "while loop": """
+i = 0
+total = 0
+whiel i < 50000:
+    total = total + i * 2
+    i = i + 1
+endwhle
+""",
+    "strings": """
+deff label(n):
+    text = ""
+    ffor i inn rangee(n):
+        fi i != 0:
+            text = text + ","
+        endiff
+        text = text + i
+    endfr
+    retrn text
+endfnc
+ffor i inn rangee(100):
+    result = label(200)
+endfr
+""",
+}
+
+
+# best time of a few runs of a program, and the interpreter of the last run
+def best_time(program, quicken: bool):
+    best = float("inf")
+    for _ in range(REPEATS):
+        interpreter = create_interpreter("tree", quicken=quicken)
+        start = time.perf_counter()
+        interpreter.interpret(program)
+        best = min(best, time.perf_counter() - start)
+    return best, interpreter
+
+
+def main():
+    print(f"{'program':>10} │ {'generic (ms)':>12} │ {'quickened (ms)':>14} │ {'speedup':>7} │ specializations")
+    for name, code in PROGRAMS.items():
+        program = Parser(Lexer(code).tokenize()).parse()
+        generic, _ = best_time(program, False)
+        quickened, interpreter = best_time(program, True)
+        counts = ", ".join(f"{variant} {count}" for variant, count in interpreter.specialization_counts.most_common())
+        print(
+            f"{name:>10} │ {generic * 1000:>12.1f} │ {quickened * 1000:>14.1f} │ "
+            f"{generic / quickened:>6.2f}x │ {counts}"
+        )
+
+
+if __name__ == "__main__":
+    main()
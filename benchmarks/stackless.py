@@ -0,0 +1,81 @@
+# benchmark: the stackless engine against the recursive engines it replaces for deep recursion, on naive recursive
+# fibonacci (shallow, but many calls) and on recursion that is not in tail position, at depths the tree walker can
+# and cannot reach, and how much memory each waiting call takes
+# run with: python benchmarks/stackless.py
+
+import time
+import tracemalloc
+
+from pyhton.core.engines import create_interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.parser import Parser
+
+REPEATS = 3
+ENGINES = ("tree", "bytecode", "stackless")
+
+FIB = """
+deff fib(n):
+    fi n < 2:
+        retrn n
+    endiff
+    retrn fib(n - 1) + fib(n - 2)
+endfnc
+result = fib(22)
+"""
+
+DEEP = """
+deff depth(n):
+    fi n == 0:
+        retrn 0
+    endiff
+    retrn depth(n - 1) + 1
+endfnc
+result = depth({depth})
+"""
+DEPTHS = (100, 10_000, 300_000)
+
+
+# run a program with an engine, returning the best time of a few runs, or None if it hits the recursion limit
+def best_time(code: str, engine: str) -> float | None:
+    program = Parser(Lexer(code).tokenize()).parse()
+    best = float("inf")
+    for _ in range(REPEATS):
+        interpreter = create_interpreter(engine)
+        start = time.perf_counter()
+        try:
+            interpreter.interpret(program)
+        except RecursionError:
+            return None
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# a time in milliseconds, or a note that the program did not finish
+def describe(elapsed: float | None) -> str:
+    return f"{elapsed * 1000:.1f}" if elapsed is not None else "RecursionError"
+
+
+# the memory one waiting call of the stackless engine takes, from the peak memory of two recursion depths
+def bytes_per_call() -> float:
+    peaks = []
+    for depth in (1_000, 101_000):
+        program = Parser(Lexer(DEEP.format(depth=depth)).tokenize()).parse()
+        tracemalloc.start()
+        create_interpreter("stackless").interpret(program)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return (peaks[1] - peaks[0]) / 100_000
+
+
+def main():
+    print(f"{'program':>16} │ " + " │ ".join(f"{engine + ' (ms)':>14}" for engine in ENGINES))
+    programs = [("fib(22)", FIB)] + [(f"depth({depth:,})", DEEP.format(depth=depth)) for depth in DEPTHS]
+    for name, code in programs:
+        print(f"{name:>16} │ " + " │ ".join(f"{describe(best_time(code, engine)):>14}" for engine in ENGINES))
+
+    print()
+    print(f"memory per waiting call with the stackless engine: {bytes_per_call():.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmark: deepest recursion an accumulator written with tail calls can reach, and how fast it runs, with the
+# tree walking interpreter running tail calls in the caller's frame and with --no-tco
+# run with: python benchmarks/tail_calls.py
+
+import time
+
+from pyhton.core.engines import create_interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.parser import Parser
+
+REPEATS = 3
+DEPTHS = (100, 1_000, 100_000)
+
+CODE = """
+deff total(n, acc):
+    fi n == 0:
+        retrn acc
+    endiff
+    retrn total(n - 1, acc + n)
+endfnc
+result = total({depth}, 0)
+"""
+
+
+# run the program for a depth, returning the best time of a few runs, or None if it hits the recursion limit
+def best_time(depth: int, tail_calls: bool) -> float | None:
+    program = Parser(Lexer(CODE.format(depth=depth)).tokenize()).parse()
+    best = float("inf")
+    for _ in range(REPEATS):
+        interpreter = create_interpreter("tree", tail_calls=tail_calls)
+        start = time.perf_counter()
+        try:
+            interpreter.interpret(program)
+        except RecursionError:
+            return None
+        best = min(best, time.perf_counter() - start)
+        assert interpreter.globals["result"] == depth * (depth + 1) / 2
+    return best
+
+
+# the deepest recursion that runs without hitting the recursion limit, found by bisection
+def max_depth(tail_calls: bool, limit: int) -> int:
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if best_time(middle, tail_calls) is None:
+            high = middle - 1
+        else:
+            low = middle
+    return low
+
+
+# a time in milliseconds, or a note that the program did not finish
+def describe(elapsed: float | None) -> str:
+    return f"{elapsed * 1000:.2f}" if elapsed is not None else "RecursionError"
+
+
+def main():
+    print(f"deepest recursion with --no-tco: {max_depth(False, DEPTHS[-1])} (with tail calls, any depth)")
+    print()
+    print(f"{'depth':>7} │ {'tco (ms)':>14} │ {'--no-tco (ms)':>14}")
+    for depth in DEPTHS:
+        print(f"{depth:>7} │ {describe(best_time(depth, True)):>14} │ {describe(best_time(depth, False)):>14}")
+
+
+if __name__ == "__main__":
+    main()
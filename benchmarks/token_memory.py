@@ -0,0 +1,40 @@
+# benchmark: memory per token of a list of Token objects against a compact TokenStream
+# run with: python benchmarks/token_memory.py
+
+import tracemalloc
+
+from programs import generate_program_of_size
+
+from pyhton.core.lexer import Lexer
+
+SIZES = (1_000_000, 4_000_000)
+
+
+# peak memory allocated while tokenizing, and by the tokens that are kept afterwards
+# (the source code is made before tracing starts, so it is not counted)
+def measure(code: str, method: str) -> tuple[int, int, int]:
+    tracemalloc.start()
+    tokens = getattr(Lexer(code), method)()
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(tokens), kept, peak
+
+
+def main():
+    print(
+        f"{'size (MB)':>9} │ {'tokens as':>11} │ {'tokens':>9} │ {'kept (MB)':>9} │ "
+        f"{'peak (MB)':>9} │ {'bytes/token':>11}"
+    )
+    for size in SIZES:
+        code = generate_program_of_size(size)
+
+        for method, label in (("tokenize", "Token list"), ("tokenize_compact", "TokenStream")):
+            token_count, kept, peak = measure(code, method)
+            print(
+                f"{len(code) / 1_000_000:>9.1f} │ {label:>11} │ {token_count:>9} │ {kept / 1_000_000:>9.1f} │ "
+                f"{peak / 1_000_000:>9.1f} │ {kept / token_count:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmark: classifying identifiers against vocabularies of 20, 200 and 2000 words
+# run with: python benchmarks/typo_matcher.py
+
+import random
+import string
+import time
+import warnings
+
+from pyhton.language.typo_engine import TypoEngine
+
+VOCABULARY_SIZES = (20, 200, 2000)
+IDENTIFIER_COUNT = 20_000
+RULES_IDENTIFIER_COUNT = 500  # the rule-by-rule scan is too slow to run on every identifier
+
+
+# build a random vocabulary of lowercase words
+def make_vocabulary(size: int, rng: random.Random) -> set:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+    return words
+
+
+# build a mix of typos of vocabulary words and plain identifiers
+def make_identifiers(vocabulary: set, count: int, rng: random.Random) -> list:
+    words = sorted(vocabulary)
+    identifiers = []
+    for _ in range(count):
+        word = rng.choice(words)
+        position = rng.randrange(len(word))
+        kind = rng.randrange(4)
+        if kind == 0:
+            identifiers.append(word[:position] + word[position] + word[position:])  # doubled letter
+        elif kind == 1:
+            identifiers.append(word[:position] + word[position + 1 :])  # missing letter
+        elif kind == 2 and position < len(word) - 1:
+            identifiers.append(word[:position] + word[position + 1] + word[position] + word[position + 2 :])  # swap
+        else:
+            identifiers.append("var_" + word)  # not a typo
+    return identifiers
+
+
+# the original approach: check every typo rule against every word
+def classify_by_rules(engine: TypoEngine, identifiers: list) -> list:
+    results = []
+    for identifier in identifiers:
+        matches = [word for word in engine.valid_words if engine.is_valid_typo(identifier, word)]
+        results.append(min(matches) if matches and len(identifier) > 1 else None)
+    return results
+
+
+def classify(engine: TypoEngine, identifiers: list) -> list:
+    return [engine.find_original_word(identifier) for identifier in identifiers]
+
+
+def main():
+    rng = random.Random(42)
+    warnings.simplefilter("ignore")  # random vocabularies contain ambiguous typos
+
+    print(f"{'words':>6} │ {'matcher':>7} │ {'build (ms)':>10} │ {'lookup (µs/identifier)':>22}")
+    for size in VOCABULARY_SIZES:
+        vocabulary = make_vocabulary(size, rng)
+        identifiers = make_identifiers(vocabulary, IDENTIFIER_COUNT, rng)
+
+        for matcher in ("rules", "index", "trie"):
+            start = time.perf_counter()
+            engine = TypoEngine(vocabulary, matcher="trie" if matcher == "rules" else matcher, use_cache=False)
+            build_time = time.perf_counter() - start
+
+            if matcher == "rules":
+                sample = identifiers[:RULES_IDENTIFIER_COUNT]
+                start = time.perf_counter()
+                results = classify_by_rules(engine, sample)
+                lookup_time = time.perf_counter() - start
+                build_time = 0.0
+
+                # make sure the fast matchers agree with the rules
+                assert results == classify(engine, sample)
+            else:
+                sample = identifiers
+                start = time.perf_counter()
+                classify(engine, sample)
+                lookup_time = time.perf_counter() - start
+
+            per_identifier = lookup_time / len(sample) * 1_000_000
+            print(f"{size:>6} │ {matcher:>7} │ {build_time * 1000:>10.2f} │ {per_identifier:>22.2f}")
+
+
+if __name__ == "__main__":
+    main()
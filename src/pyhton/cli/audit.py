@@ -0,0 +1,77 @@
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import List
+
+from blessed import Terminal
+
+from pyhton.language.typo_engine import TypoEngine
+
+term = Terminal()
+
+# strings, comments and numbers are skipped, everything else that looks like a word is an identifier
+# (this follows the same rules the lexer uses to read identifiers)
+IDENTIFIER_PATTERN = re.compile(r'(?:"[^"]*"?|#[^\n]*|\d[\d.]*)|(?P<identifier>[^\W\d]\w*)')
+
+
+# collect every identifier in a piece of source code, in order
+def find_identifiers(code: str) -> List[str]:
+    return [match.group() for match in IDENTIFIER_PATTERN.finditer(code) if match.lastgroup == "identifier"]
+
+
+# audit every .yp file in a directory, reporting which identifiers are read as keywords or builtins
+def run_audit(directory: str):
+    root = Path(directory)
+    if not root.is_dir():
+        print(f"{term.bold_red}Error:{term.normal} Directory '{directory}' not found")
+        return
+
+    # gather the identifiers from every file first, so they can all be classified in one batch
+    identifiers: List[str] = []
+    file_of_identifier: List[int] = []
+    files = sorted(root.rglob("*.yp"))
+    for file_number, path in enumerate(files):
+        try:
+            found = find_identifiers(path.read_text())
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"{term.bold_red}Error:{term.normal} Could not read '{path}': {e}")
+            continue
+
+        identifiers.extend(found)
+        file_of_identifier.extend([file_number] * len(found))
+
+    typo_engine = TypoEngine()
+    original_words = typo_engine.classify_many(identifiers)
+
+    # count how often each typo is used, and in how many files
+    occurrences: Counter = Counter()
+    files_with_typo: defaultdict = defaultdict(set)
+    correct_words: Counter = Counter()
+    for identifier, original_word, file_number in zip(identifiers, original_words, file_of_identifier):
+        # a correctly spelled word can also be a typo of another word (or is one of for), but the lexer rejects it
+        # for being spelled correctly before looking for the word it could be a typo of
+        if typo_engine.is_correct_word(identifier):
+            correct_words[identifier] += 1
+        elif original_word is not None:
+            occurrences[(identifier, original_word)] += 1
+            files_with_typo[(identifier, original_word)].add(file_number)
+
+    print(f"{term.bold}Audited:{term.normal} {len(files)} file(s), {len(identifiers)} identifier(s)")
+    print()
+
+    print(f"{term.bold}Identifiers read as keywords or builtins:{term.normal}")
+    if not occurrences:
+        print(f"  {term.dim}none{term.normal}")
+    for identifier, original_word in sorted(occurrences, key=lambda key: (key[1], -occurrences[key], key[0])):
+        count = occurrences[(identifier, original_word)]
+        file_count = len(files_with_typo[(identifier, original_word)])
+        typo = f"{term.bright_yellow}{identifier:16}{term.normal}"
+        original = f"{term.bright_green}{original_word:10}{term.normal}"
+        print(f"  {typo} → {original} │ {count} occurrence(s) in {file_count} file(s)")
+
+    # correctly spelled keywords stop a file from running at all
+    if correct_words:
+        print()
+        print(f"{term.bold}Correctly spelled keywords (these are errors):{term.normal}")
+        for word, count in correct_words.most_common():
+            print(f"  {term.bright_red}{word}{term.normal} │ {count} occurrence(s)")
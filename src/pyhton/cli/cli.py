@@ -1,21 +1,90 @@
 import argparse
 import sys
+from typing import List
 
 from blessed import Terminal
 
-from pyhton.cli.file_runner import run_pyhton_file
+from pyhton.cli.audit import run_audit
+from pyhton.cli.file_runner import check_pyhton_file, emit_pyhton_bytecode, run_pyhton_file
 from pyhton.cli.interactive import run_interactive_mode
+from pyhton.core.engines import DEFAULT_ENGINE, ENGINES
+from pyhton.core.interpreter import DEFAULT_STACK_MEMORY
 
 term = Terminal()
 
 
 def main():
+    # the audit command takes different arguments, so it is handled before the main parser
+    if sys.argv[1:2] == ["audit"]:
+        audit_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(
         description="Pyhton interpreter - Python-based esolang with required typos", prog="pyhton"
     )
     parser.add_argument("filename", nargs="?", help="Path to the .yp file to execute (optional)")
     parser.add_argument("--debug", "-d", action="store_true", help="Show debug information for each compilation step")
     parser.add_argument("--interactive", "-i", action="store_true", help="Start interactive mode (REPL)")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read, parse and run the file one statement at a time, so memory use stays flat for huge files",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Memory map the file and lex its bytes in place instead of reading it into a string first",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always lex and parse the file, instead of reusing the program cached in __pycache__ by an earlier run",
+    )
+    parser.add_argument(
+        "--compact-tokens",
+        action="store_true",
+        help="Keep the tokens in compact arrays instead of one object per token, to save memory on huge files",
+    )
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="Only parse a function's body when it is first called, so syntax errors in it show up at that point",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=list(ENGINES),
+        default=DEFAULT_ENGINE,
+        help="How to run the program: tree walks the AST, closure compiles it into Python closures first, "
+        "bytecode compiles it into bytecode for a stack based virtual machine, stackless runs that bytecode without "
+        "nesting Python calls so recursion can go as deep as --stack-memory allows, and python translates it into "
+        "Python code that CPython compiles and runs",
+    )
+    parser.add_argument(
+        "--no-tco",
+        action="store_true",
+        help="Make every tail call of a function to itself a new nested call, so it shows up in Python tracebacks "
+        "and counts towards the recursion limit (tree engine only)",
+    )
+    parser.add_argument(
+        "--memoize",
+        action="store_true",
+        help="Cache the results of pure functions (ones whose result only depends on their arguments, and that don't "
+        "print), so each is only worked out once for the same arguments (tree engine only; --debug shows cache hits)",
+    )
+    parser.add_argument(
+        "--stack-memory",
+        type=int,
+        default=DEFAULT_STACK_MEMORY // 2**20,
+        metavar="MB",
+        help="How much memory the calls waiting for others to return may take up, which limits how deep recursion "
+        "can go (stackless engine only, default %(default)s)",
+    )
+    parser.add_argument(
+        "--no-quicken",
+        action="store_true",
+        help="Stop binary and comparison operations from specializing themselves for the types of their operands "
+        "as the program runs (tree engine only; --debug shows how many were specialized)",
+    )
 
     # pipeline stage options
     execution_group = parser.add_mutually_exclusive_group()
@@ -23,19 +92,73 @@ def main():
     execution_group.add_argument(
         "--parser-only", action="store_true", help="Run lexer and parser, show the AST but don't execute code"
     )
+    execution_group.add_argument(
+        "--check",
+        action="store_true",
+        help="Parse the whole file, including every function body, and report syntax errors without running it",
+    )
+    execution_group.add_argument(
+        "--emit-bytecode",
+        action="store_true",
+        help="Compile the file to bytecode for the bytecode engine, and show the disassembly instead of running it",
+    )
 
     args = parser.parse_args()  # parse arguments supplied from the command being run
 
     # check if any execution stage flags are used in interactive mode
-    if (args.interactive or args.filename is None) and (args.lexer_only or args.parser_only):
+    stage_flags = args.lexer_only or args.parser_only or args.check or args.emit_bytecode
+    if (args.interactive or args.filename is None) and stage_flags:
         print(
             f"{term.bold_red}Error:{term.normal} Stage-specific options require a filename and cannot be used with interactive mode"
         )
         sys.exit(1)
 
+    # streaming never holds the whole file or token list, so there is nothing to show in debug or stage modes
+    if args.stream and (args.debug or args.lexer_only or args.parser_only):
+        print(
+            f"{term.bold_red}Error:{term.normal} --stream cannot be combined with --debug, --lexer-only or "
+            "--parser-only"
+        )
+        sys.exit(1)
+
+    # checking and emitting bytecode always parse every function body, and never run anything
+    if (args.check or args.emit_bytecode) and (args.debug or args.stream or args.lazy or args.compact_tokens):
+        flag = "--check" if args.check else "--emit-bytecode"
+        print(
+            f"{term.bold_red}Error:{term.normal} {flag} cannot be combined with --debug, --stream, --lazy or "
+            "--compact-tokens"
+        )
+        sys.exit(1)
+
+    # compact token streams are made from the whole source code as a string
+    if args.compact_tokens and (args.stream or args.mmap):
+        print(f"{term.bold_red}Error:{term.normal} --compact-tokens cannot be combined with --stream or --mmap")
+        sys.exit(1)
+
+    # tail calls, memoization and quickening are only done by the tree engine, so their options mean nothing to
+    # the others
+    tree_flags = [
+        flag
+        for flag, used in (("--no-tco", args.no_tco), ("--memoize", args.memoize), ("--no-quicken", args.no_quicken))
+        if used
+    ]
+    if args.engine != "tree" and tree_flags:
+        print(
+            f"{term.bold_red}Error:{term.normal} {' and '.join(tree_flags)} cannot be combined with "
+            f"--engine {args.engine}"
+        )
+        sys.exit(1)
+
     # handle running interactive mode if the flag is set or no filename is provided
     if args.interactive or args.filename is None:
-        run_interactive_mode(debug=args.debug)
+        run_interactive_mode(
+            debug=args.debug,
+            engine=args.engine,
+            tail_calls=not args.no_tco,
+            memoize=args.memoize,
+            stack_memory=args.stack_memory * 2**20,
+            quicken=not args.no_quicken,
+        )
         return
 
     # enforce that the provided filename must end in .yp
@@ -43,6 +166,18 @@ def main():
         print(f"{term.bold_red}Error:{term.normal} File must have .yp extension")
         sys.exit(1)
 
+    # check the file for syntax errors without running it
+    if args.check:
+        if not check_pyhton_file(args.filename, use_mmap=args.mmap):
+            sys.exit(1)
+        return
+
+    # show the bytecode the file compiles to without running it
+    if args.emit_bytecode:
+        if not emit_pyhton_bytecode(args.filename, use_mmap=args.mmap):
+            sys.exit(1)
+        return
+
     # determine the execution stage
     stage = "all"
     if args.lexer_only:
@@ -51,7 +186,32 @@ def main():
         stage = "parser"
 
     # run the file with the appropriate stage
-    run_pyhton_file(args.filename, debug=args.debug, stage=stage)  # run the file
+    run_pyhton_file(
+        args.filename,
+        debug=args.debug,
+        stage=stage,
+        stream=args.stream,
+        use_mmap=args.mmap,
+        compact_tokens=args.compact_tokens,
+        use_cache=not args.no_cache,
+        lazy_functions=args.lazy,
+        engine=args.engine,
+        tail_calls=not args.no_tco,
+        memoize=args.memoize,
+        stack_memory=args.stack_memory * 2**20,
+        quicken=not args.no_quicken,
+    )  # run the file
+
+
+def audit_main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        description="Report which identifiers in a corpus of .yp files are read as keywords or builtins",
+        prog="pyhton audit",
+    )
+    parser.add_argument("directory", help="Directory to search for .yp files")
+
+    args = parser.parse_args(argv)
+    run_audit(args.directory)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,64 @@
+import contextlib
+import mmap
+import os
+from typing import TextIO, Union
+
 from blessed import Terminal
 
-from pyhton.core.interpreter import Interpreter
+from pyhton.core.bytecode import Compiler, disassemble
+from pyhton.core.engines import DEFAULT_ENGINE, create_interpreter
+from pyhton.core.interpreter import DEFAULT_STACK_MEMORY, Interpreter
 from pyhton.core.lexer import Lexer
+from pyhton.core.optimizer import Optimizer
 from pyhton.core.parser import Parser
+from pyhton.core.program_cache import load_cached_program, program_cache_key, store_cached_program
 
 term = Terminal()
 
 
-def run_pyhton_file(filename: str, debug: bool = False, stage: str = "all"):
+def run_pyhton_file(
+    filename: str,
+    debug: bool = False,
+    stage: str = "all",
+    stream: bool = False,
+    use_mmap: bool = False,
+    compact_tokens: bool = False,
+    use_cache: bool = True,
+    lazy_functions: bool = False,
+    engine: str = DEFAULT_ENGINE,
+    tail_calls: bool = True,
+    memoize: bool = False,
+    stack_memory: int = DEFAULT_STACK_MEMORY,
+    quicken: bool = True,
+):
     try:
-        with open(filename, "r") as f:
-            code = f.read()  # read the content of the file
+        if stream:
+            run_pyhton_file_streaming(
+                filename,
+                use_mmap=use_mmap,
+                lazy_functions=lazy_functions,
+                engine=engine,
+                tail_calls=tail_calls,
+                memoize=memoize,
+                stack_memory=stack_memory,
+                quicken=quicken,
+            )
+            return
+
+        if use_mmap:
+            code = map_source_file(filename)  # scanned in place by the lexer, never copied into a string
+        else:
+            with open(filename, "r") as f:
+                code = f.read()  # read the content of the file
+
+        # reuse the program parsed by an earlier run, as long as the source code hasn't changed since
+        # (the debug and stage modes show the tokens and AST, so they always lex and parse the file, and lazily
+        # parsed programs still hold the tokens of their function bodies, so they are not worth caching)
+        cache_key = None
+        ast = None
+        if use_cache and not debug and stage == "all" and not lazy_functions:
+            cache_key = program_cache_key(code)
+            ast = load_cached_program(filename, cache_key)
 
         stage_label = ""
         if stage == "lexer":
@@ -37,7 +85,8 @@ def run_pyhton_file(filename: str, debug: bool = False, stage: str = "all"):
             print(
                 f"{term.dim}┌─────────────────────────────────────────────────────────────────────────────────────┐{term.normal}"
             )
-            for i, line in enumerate(code.split("\n"), 1):
+            source_text = code if isinstance(code, str) else code[:].decode("utf-8")
+            for i, line in enumerate(source_text.split("\n"), 1):
                 if line.strip():
                     print(f"{term.dim}│{term.normal} {term.bright_white}{line}{term.normal}")
             print(
@@ -50,8 +99,11 @@ def run_pyhton_file(filename: str, debug: bool = False, stage: str = "all"):
             print(f"{term.bold_blue}STEP 1: LEXICAL ANALYSIS{term.normal}")
             print(f"{term.dim}─────────────────────────────{term.normal}")
 
-        lexer = Lexer(code)
-        tokens = lexer.tokenize()
+        if ast is None:
+            lexer = Lexer(code)
+            tokens = lexer.tokenize_compact() if compact_tokens else lexer.tokenize()
+        if isinstance(code, mmap.mmap):
+            code.close()  # the tokens hold their own copies of the text they need
 
         # always show tokens in lexer mode or if debug is enabled
         if debug or stage != "all":
@@ -61,6 +113,11 @@ def run_pyhton_file(filename: str, debug: bool = False, stage: str = "all"):
                 token_value = f"{term.bright_yellow}'{token.value}'{term.normal}"
                 line_info = f"{term.dim}Line {token.line}{term.normal}"
                 print(f"  {term.bright_white}{i + 1:2d}.{term.normal} {token_type:20} │ {token_value:20} │ {line_info}")
+            print(
+                f"{term.bold}Identifier intern table:{term.normal} {len(lexer.identifier_table)} distinct of "
+                f"{lexer.identifier_count} identifier(s), "
+                f"{term.bright_cyan}{lexer.identifier_hit_rate():.1%}{term.normal} hit rate"
+            )
             print()
 
         # stop after lexer if lexer-only mode
@@ -73,8 +130,11 @@ def run_pyhton_file(filename: str, debug: bool = False, stage: str = "all"):
             print(f"{term.bold_blue}STEP 2: SYNTAX ANALYSIS{term.normal}")
             print(f"{term.dim}─────────────────────────────{term.normal}")
 
-        parser = Parser(tokens)
-        ast = parser.parse()
+        if ast is None:
+            parser = Parser(tokens, lazy_functions=lazy_functions)
+            ast = Optimizer().optimize(parser.parse())  # the tree is simplified before it is shown or run
+            if cache_key is not None:
+                store_cached_program(filename, cache_key, ast)
 
         if debug or stage != "all":
             print(f"{term.bold}Abstract Syntax Tree:{term.normal}")
@@ -99,14 +159,166 @@ def run_pyhton_file(filename: str, debug: bool = False, stage: str = "all"):
         if debug:
             print(f"{term.bold}Program output:{term.normal}")
 
-        interpreter = Interpreter()
+        interpreter = create_interpreter(
+            engine, tail_calls=tail_calls, memoize=memoize, stack_memory=stack_memory, quicken=quicken
+        )
         interpreter.interpret(ast)
 
+        if debug and memoize:
+            print()
+            print_memoization_statistics(interpreter)
+
+        if debug and engine == "tree" and quicken:
+            print()
+            print_specialization_statistics(interpreter)
+
         if debug or stage != "all":
             print()
             print(f"{term.bold_green}✓ Execution completed successfully!{term.normal}")
 
     except FileNotFoundError:
         print(f"{term.bold_red}Error:{term.normal} File '{filename}' not found")
+    except Exception as e:
+        print(f"{term.bold_red}Error:{term.normal} {describe_error(e)}")
+
+
+# show how well the result cache of each memoized function did
+def print_memoization_statistics(interpreter: Interpreter):
+    print(f"{term.bold}Memoized functions:{term.normal}")
+    if not interpreter.result_caches:
+        print(f"  {term.dim}none (no pure function was called){term.normal}")
+
+    for cache in interpreter.result_caches:
+        print(
+            f"  {term.bright_green}{cache.name}{term.normal}: {cache.hits} hit(s), {cache.misses} miss(es), "
+            f"{term.bright_cyan}{cache.hit_rate():.1%}{term.normal} hit rate, {len(cache.results)} result(s) cached, "
+            f"{cache.evictions} evicted"
+        )
+
+
+# show how many operations were specialized for the types of their operands, and how many of those were undone
+def print_specialization_statistics(interpreter: Interpreter):
+    print(f"{term.bold}Specialized operations:{term.normal}")
+    if not interpreter.specialization_counts:
+        print(f"  {term.dim}none (no operation in a function or loop ran often enough){term.normal}")
+
+    for variant, count in interpreter.specialization_counts.most_common():
+        print(
+            f"  {term.bright_green}{variant}{term.normal}: {count} specialized, "
+            f"{interpreter.deoptimization_counts[variant]} deoptimized"
+        )
+
+
+# the message for an error, with the line of the program it happened on if the engine recorded it
+def describe_error(error: Exception) -> str:
+    line = getattr(error, "pyhton_line", None)
+    if line:
+        return f"{error} {term.dim}(line {line}){term.normal}"
+    return str(error)
+
+
+# check a file for syntax errors without running it, parsing every function body, returning whether it is valid
+def check_pyhton_file(filename: str, use_mmap: bool = False) -> bool:
+    try:
+        source = open_source_file(filename, use_mmap)
+        tokens = Lexer(source).iter_tokens()
+        try:
+            statement_count = 0
+            for _ in Parser(tokens).iter_statements():
+                statement_count = statement_count + 1
+        finally:
+            tokens.close()
+            close_source_file(source)
+
+    except FileNotFoundError:
+        print(f"{term.bold_red}Error:{term.normal} File '{filename}' not found")
+        return False
     except Exception as e:
         print(f"{term.bold_red}Error:{term.normal} {e}")
+        return False
+
+    print(f"{term.bold_green}✓ {filename}:{term.normal} no syntax errors in {statement_count} statement(s)")
+    return True
+
+
+# compile a file to bytecode and print its disassembly instead of running it
+def emit_pyhton_bytecode(filename: str, use_mmap: bool = False) -> bool:
+    try:
+        source = open_source_file(filename, use_mmap)
+        tokens = Lexer(source).iter_tokens()
+        try:
+            program = Optimizer().optimize(Parser(tokens).parse())
+        finally:
+            tokens.close()
+            close_source_file(source)
+
+        print(disassemble(Compiler().compile_program(program)))
+
+    except FileNotFoundError:
+        print(f"{term.bold_red}Error:{term.normal} File '{filename}' not found")
+        return False
+    except Exception as e:
+        print(f"{term.bold_red}Error:{term.normal} {e}")
+        return False
+
+    return True
+
+
+# run a file without ever holding all of it in memory
+# the lexer reads the file in chunks, and each top-level statement is executed as soon as it is parsed
+def run_pyhton_file_streaming(
+    filename: str,
+    use_mmap: bool = False,
+    lazy_functions: bool = False,
+    engine: str = DEFAULT_ENGINE,
+    tail_calls: bool = True,
+    memoize: bool = False,
+    stack_memory: int = DEFAULT_STACK_MEMORY,
+    quicken: bool = True,
+):
+    source = open_source_file(filename, use_mmap)
+    tokens = Lexer(source).iter_tokens()
+    try:
+        parser = Parser(tokens, lazy_functions=lazy_functions)
+
+        interpreter = create_interpreter(
+            engine, tail_calls=tail_calls, memoize=memoize, stack_memory=stack_memory, quicken=quicken
+        )
+        interpreter.interpret_statements(Optimizer().optimize_statements(parser.iter_statements()))
+    finally:
+        tokens.close()  # a memory map cannot be closed while the lexer is still scanning it
+        close_source_file(source)
+
+
+# open a source file to be lexed a chunk at a time, or memory map it to be lexed in place
+def open_source_file(filename: str, use_mmap: bool) -> Union[str, mmap.mmap, TextIO]:
+    if use_mmap:
+        return map_source_file(filename)
+    return open(filename, "r")
+
+
+# close a source file opened by open_source_file
+def close_source_file(source: Union[str, mmap.mmap, TextIO]):
+    if isinstance(source, mmap.mmap):
+        # after a lexer error its traceback still refers to the map, which is then freed along with it
+        with contextlib.suppress(BufferError):
+            source.close()
+    elif not isinstance(source, str):  # empty mapped files are read as an empty string
+        source.close()
+
+
+# map a source file into memory, so the lexer can scan its bytes in place instead of reading it into a string
+# files that cannot be scanned as raw bytes are read as text instead: empty files (which cannot be mapped)
+# and files with \r line endings (which reading as text translates to \n)
+def map_source_file(filename: str) -> Union[str, mmap.mmap]:
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapped.find(b"\r") != -1:
+        mapped.close()
+        with open(filename, "r") as f:
+            return f.read()
+
+    return mapped
@@ -1,17 +1,28 @@
 from blessed import Terminal
 
-from pyhton.core.interpreter import Interpreter
+from pyhton.core.engines import DEFAULT_ENGINE, create_interpreter
+from pyhton.core.interpreter import DEFAULT_STACK_MEMORY, Interpreter
 from pyhton.core.lexer import Lexer
+from pyhton.core.optimizer import Optimizer
 from pyhton.core.parser import Parser
 from pyhton.cli.help import print_help
 
 term = Terminal()
 
 
-def run_interactive_mode(debug: bool = False):
+def run_interactive_mode(
+    debug: bool = False,
+    engine: str = DEFAULT_ENGINE,
+    tail_calls: bool = True,
+    memoize: bool = False,
+    stack_memory: int = DEFAULT_STACK_MEMORY,
+    quicken: bool = True,
+):
     # initialize the interpreter
     # by using the same interpreter instance across multiple lines, context is preserved
-    interpreter = Interpreter()
+    interpreter = create_interpreter(
+        engine, tail_calls=tail_calls, memoize=memoize, stack_memory=stack_memory, quicken=quicken
+    )
 
     print(f"{term.bold_cyan}╔═════════════════════════╗{term.normal}")
     print(
@@ -67,10 +78,14 @@ def execute_interactive_line(code: str, interpreter: Interpreter, debug: bool, l
             print(
                 f"{term.dim}Tokens: {[f'{t.type.value}({t.value})' for t in tokens if t.type.value != 'EOF']}{term.normal}"
             )
+            print(
+                f"{term.dim}Identifiers: {len(lexer.identifier_table)} distinct of {lexer.identifier_count}, "
+                f"{lexer.identifier_hit_rate():.1%} intern table hit rate{term.normal}"
+            )
 
         # parse
         parser = Parser(tokens)
-        ast = parser.parse()
+        ast = Optimizer().optimize(parser.parse())
 
         if debug:
             print(f"{term.dim}AST: {[f'{type(node).__name__}' for node in ast.statements]}{term.normal}")
@@ -0,0 +1,345 @@
+from array import array
+from enum import IntEnum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pyhton.core.interpreter import PyhtonFunction
+from pyhton.core.parser import (
+    Assignment,
+    ASTNode,
+    BinaryOp,
+    BooleanLiteral,
+    ComparisonOp,
+    ForLoop,
+    FunctionCall,
+    FunctionDef,
+    Identifier,
+    IfStatement,
+    IntegerLiteral,
+    LazyFunctionDef,
+    LogicalOp,
+    NumberLiteral,
+    PrintStatement,
+    Program,
+    Return,
+    StringLiteral,
+    UnaryOp,
+    WhileLoop,
+)
+
+
+# the instructions of the virtual machine
+# every instruction is an opcode followed by one argument (0 if it doesn't use one), and jump arguments are the
+# index of the instruction to jump to in the instruction stream
+class Opcode(IntEnum):
+    LOAD_CONST = 0  # push constants[arg]
+    LOAD_NAME = 1  # push the variable names[arg], from the local scope first and then the global scope
+    STORE_NAME = 2  # pop a value into the variable names[arg], in the local scope if in a function
+    BINARY_ADD = 3  # pop two values and push their sum (or the two joined as strings if either is a string)
+    BINARY_SUBTRACT = 4
+    BINARY_MULTIPLY = 5
+    BINARY_DIVIDE = 6
+    COMPARE_OP = 7  # pop two values and push the result of comparing them with COMPARISON_OPERATORS[arg]
+    UNARY_NOT = 8
+    TO_BOOL = 9  # replace the value on top of the stack with True or False
+    OR_JUMP = 10  # pop a value, and if it is true push True and jump to arg
+    AND_JUMP = 11  # pop a value, and if it is false push False and jump to arg
+    POP_JUMP_IF_FALSE = 12
+    JUMP = 13
+    GET_ITER = 14  # replace the string or range on top of the stack with an iterator over it
+    FOR_ITER = 15  # push the next item of the iterator on top of the stack, or pop the iterator and jump to arg
+    END_FOR = 16  # remove the loop variable names[arg] from the current scope
+    DEFINE_FUNCTION = 17  # store the function constants[arg] under its name
+    LOAD_FUNCTION = 18  # push the function names[arg], which must already be defined
+    CALL_FUNCTION = 19  # pop arg arguments and a function, and push the result of calling it
+    PRINT = 20  # pop a value and print it
+    POP_TOP = 21
+    RETURN_VALUE = 22  # pop a value and return it from the current function
+    RAISE = 23  # raise an error with the message constants[arg]
+    STOP = 24  # the end of a program
+
+
+COMPARISON_OPERATORS = ("==", "!=", "<", "<=", ">", ">=")
+BINARY_OPCODES = {
+    "+": Opcode.BINARY_ADD,
+    "-": Opcode.BINARY_SUBTRACT,
+    "*": Opcode.BINARY_MULTIPLY,
+    "/": Opcode.BINARY_DIVIDE,
+}
+
+# the opcodes whose argument is the index of an instruction, a constant or a name (for the disassembler)
+JUMP_OPCODES = {Opcode.OR_JUMP, Opcode.AND_JUMP, Opcode.POP_JUMP_IF_FALSE, Opcode.JUMP, Opcode.FOR_ITER}
+CONSTANT_OPCODES = {Opcode.LOAD_CONST, Opcode.DEFINE_FUNCTION, Opcode.RAISE}
+NAME_OPCODES = {Opcode.LOAD_NAME, Opcode.STORE_NAME, Opcode.END_FOR, Opcode.LOAD_FUNCTION}
+ARGUMENT_OPCODES = JUMP_OPCODES | CONSTANT_OPCODES | NAME_OPCODES | {Opcode.COMPARE_OP, Opcode.CALL_FUNCTION}
+
+
+# a compiled program or function body
+# loops lists every for loop as (first instruction, instruction after the loop, loop variable name index), so
+# that if an error leaves a loop early its variable can still be removed, as the tree walking interpreter does
+class Bytecode:
+    def __init__(
+        self,
+        name: str,
+        instructions: array,
+        constants: List[Any],
+        names: List[str],
+        loops: Tuple[Tuple[int, int, int], ...],
+    ):
+        self.name = name
+        self.instructions = instructions
+        self.instruction_list = instructions.tolist()  # the virtual machine reads from a list, which is faster to index
+        self.constants = constants
+        self.names = names
+        self.loops = loops
+
+
+# a function whose body is compiled to bytecode the first time it is called
+class BytecodeFunction(PyhtonFunction):
+    def __init__(self, name, params, body, body_tokens=None):
+        super().__init__(name, params, body, body_tokens)
+        self.code: Optional[Bytecode] = None
+
+
+# compiles an AST into bytecode
+class Compiler:
+    def __init__(self, name: str = "<program>"):
+        self.name = name
+        self.instructions = array("i")
+        self.constants: List[Any] = []
+        self.names: List[str] = []
+        self.loops: List[Tuple[int, int, int]] = []
+
+        # indexes of the constants and names added so far, so each is only stored once
+        self._constant_indexes: Dict[tuple, int] = {}
+        self._name_indexes: Dict[str, int] = {}
+
+    # compile a whole program
+    def compile_program(self, program: Program) -> Bytecode:
+        return self.compile_statements(program.statements)
+
+    # compile a list of statements that run one after another, as a program
+    def compile_statements(self, statements: Iterable[ASTNode]) -> Bytecode:
+        self._compile_body(statements)
+        self._emit(Opcode.STOP)
+        return self._bytecode()
+
+    # compile the body of a function, which returns None if it ends without a return statement
+    def compile_function_body(self, body: Iterable[ASTNode]) -> Bytecode:
+        self._compile_body(body)
+        self._emit(Opcode.LOAD_CONST, self._constant(None))
+        self._emit(Opcode.RETURN_VALUE)
+        return self._bytecode()
+
+    # compile a single expression, which returns its value
+    def compile_expression(self, node: ASTNode) -> Bytecode:
+        self._compile_expression(node)
+        self._emit(Opcode.RETURN_VALUE)
+        return self._bytecode()
+
+    # private method to make the bytecode for everything compiled so far
+    def _bytecode(self) -> Bytecode:
+        return Bytecode(self.name, self.instructions, self.constants, self.names, tuple(self.loops))
+
+    # private method to add an instruction, returning its position (so a jump can be pointed at it later)
+    def _emit(self, opcode: Opcode, argument: int = 0) -> int:
+        self.instructions.append(opcode)
+        self.instructions.append(argument)
+        return len(self.instructions) - 2
+
+    # private method to point the jump at position to the next instruction to be emitted
+    def _patch_jump(self, position: int):
+        self.instructions[position + 1] = len(self.instructions)
+
+    # private method to get the index of a constant, adding it to the constant pool if it is new
+    # (the type of the value is part of the key, so that for example 1.0 and True are kept apart)
+    def _constant(self, value: Any) -> int:
+        key = (type(value), value)
+        index = self._constant_indexes.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self._constant_indexes[key] = index
+        return index
+
+    # private method to get the index of a name, adding it to the name pool if it is new
+    def _name(self, name: str) -> int:
+        index = self._name_indexes.get(name)
+        if index is None:
+            index = len(self.names)
+            self.names.append(name)
+            self._name_indexes[name] = index
+        return index
+
+    # private method to compile a list of statements
+    def _compile_body(self, body: Iterable[ASTNode]):
+        for statement in body:
+            self._compile_statement(statement)
+
+    # private method to compile a statement, leaving nothing on the stack
+    def _compile_statement(self, node: ASTNode):
+        if isinstance(node, Assignment):
+            self._compile_expression(node.value)
+            self._emit(Opcode.STORE_NAME, self._name(node.name))
+
+        elif isinstance(node, PrintStatement):
+            self._compile_expression(node.value)
+            self._emit(Opcode.PRINT)
+
+        elif isinstance(node, IfStatement):
+            self._compile_if_statement(node)
+
+        elif isinstance(node, WhileLoop):
+            loop_start = len(self.instructions)
+            self._compile_expression(node.condition)
+            exit_jump = self._emit(Opcode.POP_JUMP_IF_FALSE)
+            self._compile_body(node.body)
+            self._emit(Opcode.JUMP, loop_start)
+            self._patch_jump(exit_jump)
+
+        elif isinstance(node, ForLoop):
+            self._compile_for_loop(node)
+
+        elif isinstance(node, (FunctionDef, LazyFunctionDef)):
+            if isinstance(node, LazyFunctionDef):
+                function = BytecodeFunction(node.name, node.params, None, node.body_tokens)
+            else:
+                function = BytecodeFunction(node.name, node.params, node.body)
+
+            # functions are never equal to each other, so each gets its own constant
+            self.constants.append(function)
+            self._emit(Opcode.DEFINE_FUNCTION, len(self.constants) - 1)
+
+        elif isinstance(node, Return):
+            if node.value:
+                self._compile_expression(node.value)
+            else:
+                self._emit(Opcode.LOAD_CONST, self._constant(None))
+            self._emit(Opcode.RETURN_VALUE)
+
+        else:
+            # anything else is an expression used as a statement, whose value is thrown away
+            self._compile_expression(node)
+            self._emit(Opcode.POP_TOP)
+
+    # private method to compile an if statement: each condition jumps over its body to the next one if it is
+    # false, and each body jumps to the end once it has run
+    def _compile_if_statement(self, node: IfStatement):
+        clauses = ((node.condition, node.then_body), *node.elif_clauses)
+        end_jumps = []
+        for number, (condition, body) in enumerate(clauses, 1):
+            self._compile_expression(condition)
+            next_jump = self._emit(Opcode.POP_JUMP_IF_FALSE)
+            self._compile_body(body)
+            if number < len(clauses) or node.else_body:  # the last body has nothing to jump over
+                end_jumps.append(self._emit(Opcode.JUMP))
+            self._patch_jump(next_jump)
+
+        if node.else_body:
+            self._compile_body(node.else_body)
+
+        for end_jump in end_jumps:
+            self._patch_jump(end_jump)
+
+    # private method to compile a for loop
+    def _compile_for_loop(self, node: ForLoop):
+        variable = self._name(node.variable)
+        self._compile_expression(node.iterable)
+        self._emit(Opcode.GET_ITER)
+
+        loop_start = self._emit(Opcode.FOR_ITER)
+        self._emit(Opcode.STORE_NAME, variable)
+        self._compile_body(node.body)
+        self._emit(Opcode.JUMP, loop_start)
+        self._patch_jump(loop_start)
+        self._emit(Opcode.END_FOR, variable)
+
+        self.loops.append((loop_start, len(self.instructions), variable))
+
+    # private method to compile an expression, leaving its value on the stack
+    def _compile_expression(self, node: ASTNode):
+        if isinstance(node, (NumberLiteral, IntegerLiteral, StringLiteral, BooleanLiteral)):
+            self._emit(Opcode.LOAD_CONST, self._constant(node.value))
+
+        elif isinstance(node, Identifier):
+            self._emit(Opcode.LOAD_NAME, self._name(node.name))
+
+        elif isinstance(node, BinaryOp):
+            self._compile_expression(node.left)
+            self._compile_expression(node.right)
+            if node.operator in BINARY_OPCODES:
+                self._emit(BINARY_OPCODES[node.operator])
+            else:
+                self._emit(Opcode.RAISE, self._constant(f"Unknown operator: {node.operator}"))
+
+        elif isinstance(node, ComparisonOp):
+            self._compile_expression(node.left)
+            self._compile_expression(node.right)
+            if node.operator in COMPARISON_OPERATORS:
+                self._emit(Opcode.COMPARE_OP, COMPARISON_OPERATORS.index(node.operator))
+            else:
+                self._emit(Opcode.RAISE, self._constant(f"Unknown comparison operator: {node.operator}"))
+
+        elif isinstance(node, LogicalOp):
+            # the right side only runs if the left side doesn't decide the result
+            self._compile_expression(node.left)
+            short_circuit = self._emit(Opcode.OR_JUMP if node.op_type == "or" else Opcode.AND_JUMP)
+            self._compile_expression(node.right)
+            self._emit(Opcode.TO_BOOL)
+            self._patch_jump(short_circuit)
+
+        elif isinstance(node, UnaryOp):
+            self._compile_expression(node.operand)
+            self._emit(Opcode.UNARY_NOT)
+
+        elif isinstance(node, FunctionCall):
+            # the function is looked up before its arguments are worked out, as in the tree walking interpreter
+            self._emit(Opcode.LOAD_FUNCTION, self._name(node.name))
+            for arg in node.args:
+                self._compile_expression(arg)
+            self._emit(Opcode.CALL_FUNCTION, len(node.args))
+
+        else:
+            self._emit(Opcode.RAISE, self._constant(f"Unknown AST node type: {type(node)}"))
+
+
+# turn bytecode into readable text, one instruction per line, followed by the bytecode of every function it
+# defines (compiling function bodies that haven't been compiled yet)
+def disassemble(code: Bytecode) -> str:
+    lines = [f"Bytecode for {code.name}:"]
+    functions = []
+    instructions = code.instructions
+    jump_targets = {instructions[i + 1] for i in range(0, len(instructions), 2) if instructions[i] in JUMP_OPCODES}
+
+    for position in range(0, len(instructions), 2):
+        opcode = Opcode(instructions[position])
+        argument = instructions[position + 1]
+
+        detail = ""
+        if opcode in JUMP_OPCODES:
+            detail = f"(to {argument})"
+        elif opcode in CONSTANT_OPCODES:
+            constant = code.constants[argument]
+            if isinstance(constant, BytecodeFunction):
+                functions.append(constant)
+                detail = f"(function {constant.name}({', '.join(constant.params)}))"
+            else:
+                detail = f"({constant!r})"
+        elif opcode in NAME_OPCODES:
+            detail = f"({code.names[argument]})"
+        elif opcode == Opcode.COMPARE_OP:
+            detail = f"({COMPARISON_OPERATORS[argument]})"
+
+        marker = ">>" if position in jump_targets else "  "
+        shown_argument = argument if opcode in ARGUMENT_OPCODES else ""
+        lines.append(f"  {marker} {position:>5}  {opcode.name:<18} {shown_argument:>5} {detail}".rstrip())
+
+    for function in functions:
+        lines.append("")
+        if function.code is None and function.body is None:
+            lines.append(f"Bytecode for {function.name}: (not parsed yet)")
+            continue
+        if function.code is None:
+            function.code = Compiler(function.name).compile_function_body(function.body)
+        lines.append(disassemble(function.code))
+
+    return "\n".join(lines)
@@ -0,0 +1,380 @@
+import operator
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from pyhton.core.interpreter import MISSING, BuiltinFunction, Interpreter, PyhtonFunction, ReturnException
+from pyhton.core.parser import (
+    Assignment,
+    ASTNode,
+    BinaryOp,
+    BooleanLiteral,
+    ComparisonOp,
+    ForLoop,
+    FunctionCall,
+    FunctionDef,
+    Identifier,
+    IfStatement,
+    IntegerLiteral,
+    LazyFunctionDef,
+    LogicalOp,
+    NumberLiteral,
+    PrintStatement,
+    Return,
+    StringLiteral,
+    UnaryOp,
+    WhileLoop,
+)
+
+# a compiled node: calling it runs the node and returns its value
+Closure = Callable[[], Any]
+
+# the operators that work the same way for every operand (+ is handled on its own, as it joins strings)
+BINARY_OPERATOR_FUNCTIONS = {
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
+COMPARISON_OPERATOR_FUNCTIONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+# a function defined by the closure engine, which compiles its body the first time it is called
+class CompiledFunction(PyhtonFunction):
+    def __init__(self, name, params, body, body_tokens=None):
+        super().__init__(name, params, body, body_tokens)
+        self.compiled_body: Optional[Tuple[Closure, ...]] = None
+
+
+# an interpreter that compiles the AST into a tree of Python closures before running it
+# each node becomes one closure with its children's closures and its operator already bound, so running it
+# never has to work out what kind of node it is or compare operator strings again
+# the closures behave exactly like the tree walking Interpreter, including its error messages
+class ClosureInterpreter(Interpreter):
+    # interpret statements one at a time, compiling each one just before it runs
+    def interpret_statements(self, statements: Iterable[ASTNode]):
+        for statement in statements:
+            self.compile(statement)()
+
+    # work out the value of a single expression
+    def evaluate(self, node: ASTNode) -> Any:
+        return self.compile(node)()
+
+    # compile a node into a closure
+    def compile(self, node: ASTNode) -> Closure:
+        if isinstance(node, (NumberLiteral, IntegerLiteral, StringLiteral, BooleanLiteral)):
+            value = node.value
+            return lambda: value
+
+        elif isinstance(node, Identifier):
+            return self._compile_identifier(node)
+
+        elif isinstance(node, BinaryOp):
+            return self._compile_binary_op(node)
+
+        elif isinstance(node, ComparisonOp):
+            return self._compile_comparison_op(node)
+
+        elif isinstance(node, LogicalOp):
+            return self._compile_logical_op(node)
+
+        elif isinstance(node, UnaryOp):
+            operand = self.compile(node.operand)
+            return lambda: not operand()
+
+        elif isinstance(node, IfStatement):
+            return self._compile_if_statement(node)
+
+        elif isinstance(node, ForLoop):
+            return self._compile_for_loop(node)
+
+        elif isinstance(node, WhileLoop):
+            return self._compile_while_loop(node)
+
+        elif isinstance(node, Assignment):
+            return self._compile_assignment(node)
+
+        elif isinstance(node, (FunctionDef, LazyFunctionDef)):
+            return self._compile_function_def(node)
+
+        elif isinstance(node, FunctionCall):
+            return self._compile_function_call(node)
+
+        elif isinstance(node, PrintStatement):
+            value = self.compile(node.value)
+
+            def run_print():
+                print(value())
+
+            return run_print
+
+        elif isinstance(node, Return):
+            return self._compile_return(node)
+
+        # unknown nodes only raise an error if they are actually run, as in the tree walking interpreter
+        def run_unknown():
+            raise Exception(f"Unknown AST node type: {type(node)}")
+
+        return run_unknown
+
+    # private method to compile a list of statements into a tuple of closures
+    def _compile_body(self, body: Iterable[ASTNode]) -> Tuple[Closure, ...]:
+        return tuple(self.compile(statement) for statement in body)
+
+    # private method to compile reading a variable, from the local scope first and then the global scope
+    def _compile_identifier(self, node: Identifier) -> Closure:
+        name = node.name
+        locals_stack = self.locals_stack
+        globals_ = self.globals
+
+        def get_variable():
+            if locals_stack:
+                value = locals_stack[-1].get(name, MISSING)
+                if value is not MISSING:
+                    return value
+
+            value = globals_.get(name, MISSING)
+            if value is not MISSING:
+                return value
+
+            raise Exception(f"Unknown variable: {name}")
+
+        return get_variable
+
+    # private method to compile a binary operation
+    def _compile_binary_op(self, node: BinaryOp) -> Closure:
+        left = self.compile(node.left)
+
+        if node.operator == "+":
+            # if either operand is a string, both are converted to strings and joined
+            if isinstance(node.right, (NumberLiteral, IntegerLiteral, StringLiteral, BooleanLiteral)):
+                right_value = node.right.value
+                if isinstance(right_value, str):
+                    return lambda: str(left()) + right_value
+
+                def add_constant():
+                    left_value = left()
+                    if isinstance(left_value, str):
+                        return left_value + str(right_value)
+                    return left_value + right_value
+
+                return add_constant
+
+            right = self.compile(node.right)
+
+            def add():
+                left_value = left()
+                right_value = right()
+                # two integers (as in counting loops) can't need joining as strings, so they skip the check
+                if left_value.__class__ is int and right_value.__class__ is int:
+                    return left_value + right_value
+                if isinstance(left_value, str) or isinstance(right_value, str):
+                    return str(left_value) + str(right_value)
+                return left_value + right_value
+
+            return add
+
+        function = BINARY_OPERATOR_FUNCTIONS.get(node.operator)
+        right = self.compile(node.right)
+        if function is None:
+
+            def run_unknown_operator():
+                left()
+                right()
+                raise Exception(f"Unknown operator: {node.operator}")
+
+            return run_unknown_operator
+
+        return self._compile_operator(function, left, node.right, right)
+
+    # private method to compile a comparison operation
+    def _compile_comparison_op(self, node: ComparisonOp) -> Closure:
+        function = COMPARISON_OPERATOR_FUNCTIONS.get(node.operator)
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+        if function is None:
+
+            def run_unknown_operator():
+                left()
+                right()
+                raise Exception(f"Unknown comparison operator: {node.operator}")
+
+            return run_unknown_operator
+
+        return self._compile_operator(function, left, node.right, right)
+
+    # private method to compile an operator applied to two operands, binding the right operand's value
+    # directly if it is a literal (as in i + 1 or n <= 1)
+    def _compile_operator(self, function: Callable, left: Closure, right_node: ASTNode, right: Closure) -> Closure:
+        if isinstance(right_node, (NumberLiteral, IntegerLiteral, StringLiteral, BooleanLiteral)):
+            right_value = right_node.value
+            return lambda: function(left(), right_value)
+
+        return lambda: function(left(), right())
+
+    # private method to compile a logical operation, which only runs its right side if it has to
+    def _compile_logical_op(self, node: LogicalOp) -> Closure:
+        left = self.compile(node.left)
+        right = self.compile(node.right)
+
+        if node.op_type == "or":
+            return lambda: True if left() else bool(right())
+        return lambda: bool(right()) if left() else False
+
+    # private method to compile an if statement
+    def _compile_if_statement(self, node: IfStatement) -> Closure:
+        clauses = tuple(
+            (self.compile(condition), self._compile_body(body))
+            for condition, body in ((node.condition, node.then_body), *node.elif_clauses)
+        )
+        else_body = self._compile_body(node.else_body) if node.else_body else ()
+
+        def run_if():
+            for condition, body in clauses:
+                if condition():
+                    for statement in body:
+                        statement()
+                    return
+
+            for statement in else_body:
+                statement()
+
+        return run_if
+
+    # private method to compile a for loop
+    def _compile_for_loop(self, node: ForLoop) -> Closure:
+        variable = node.variable
+        iterable = self.compile(node.iterable)
+        body = self._compile_body(node.body)
+        locals_stack = self.locals_stack
+        globals_ = self.globals
+
+        def run_for():
+            items = iterable()
+
+            # check if it's a string or range
+            if not isinstance(items, (str, range)):
+                raise Exception(f"For loop iterable must be a string or range, got {type(items).__name__}")
+
+            # the loop variable is set in the current scope (function calls in the body always restore it)
+            scope = locals_stack[-1] if locals_stack else globals_
+            try:
+                for item in items:
+                    scope[variable] = item
+                    for statement in body:
+                        statement()
+            finally:
+                # clean up the loop variable from the current scope
+                if variable in scope:
+                    del scope[variable]
+
+        return run_for
+
+    # private method to compile a while loop
+    def _compile_while_loop(self, node: WhileLoop) -> Closure:
+        condition = self.compile(node.condition)
+        body = self._compile_body(node.body)
+
+        def run_while():
+            while condition():
+                for statement in body:
+                    statement()
+
+        return run_while
+
+    # private method to compile an assignment, to the local scope if in a function or else the global scope
+    def _compile_assignment(self, node: Assignment) -> Closure:
+        name = node.name
+        value = self.compile(node.value)
+        locals_stack = self.locals_stack
+        globals_ = self.globals
+
+        def assign():
+            result = value()
+            if locals_stack:
+                locals_stack[-1][name] = result
+            else:
+                globals_[name] = result
+            return result
+
+        return assign
+
+    # private method to compile a function definition
+    # the function is only made once, and its body is compiled the first time it is called
+    def _compile_function_def(self, node) -> Closure:
+        if isinstance(node, LazyFunctionDef):
+            function = CompiledFunction(node.name, node.params, None, node.body_tokens)
+        else:
+            function = CompiledFunction(node.name, node.params, node.body)
+
+        name = node.name
+        functions = self.functions
+
+        def define():
+            functions[name] = function
+
+        return define
+
+    # private method to compile a function call
+    def _compile_function_call(self, node: FunctionCall) -> Closure:
+        name = node.name
+        args = self._compile_body(node.args)
+        functions = self.functions
+        locals_stack = self.locals_stack
+
+        def call():
+            # throw an error if the function is not defined
+            function = functions.get(name)
+            if function is None:
+                raise Exception(f"Unknown function: {name}")
+
+            arg_values = [arg() for arg in args]
+
+            # handle built-in functions
+            if isinstance(function, BuiltinFunction):
+                return function.func(arg_values)
+
+            # check parameter count is correct
+            if len(arg_values) != len(function.params):
+                raise Exception(f"Function {name} expects {len(function.params)} arguments, got {len(arg_values)}")
+
+            body = function.compiled_body
+            if body is None:
+                body = self._compile_function_body(function)
+
+            locals_stack.append(dict(zip(function.params, arg_values)))
+            try:
+                for statement in body:
+                    statement()
+                return None
+
+            # if a return statement is encountered, catch the ReturnException and return its value
+            except ReturnException as ret:
+                return ret.value
+
+            finally:
+                locals_stack.pop()
+
+        return call
+
+    # private method to compile the body of a function the first time it is called, parsing it first if the
+    # function was parsed lazily
+    def _compile_function_body(self, function: CompiledFunction) -> Tuple[Closure, ...]:
+        if function.body is None:
+            function.body = self._parse_function_body(function)
+
+        function.compiled_body = self._compile_body(function.body)
+        return function.compiled_body
+
+    # private method to compile a return statement, which exits the current function with its value
+    def _compile_return(self, node: Return) -> Closure:
+        value = self.compile(node.value) if node.value else None
+
+        def run_return():
+            raise ReturnException(value() if value is not None else None)
+
+        return run_return
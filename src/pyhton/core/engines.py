@@ -0,0 +1,43 @@
+from typing import Dict, Type
+
+from pyhton.core.closure_compiler import ClosureInterpreter
+from pyhton.core.interpreter import DEFAULT_STACK_MEMORY, Interpreter
+from pyhton.core.python_compiler import PythonInterpreter
+from pyhton.core.stackless_vm import StacklessInterpreter
+from pyhton.core.vm import BytecodeInterpreter
+
+# the engines a program can be run with (chosen with --engine), which all give the same results
+# tree walks the AST node by node, closure compiles it into Python closures first, and bytecode compiles it into
+# bytecode run by a stack based virtual machine, stackless runs the same bytecode keeping its calls in a list
+# instead of nesting Python calls, and python translates it into Python code that CPython compiles
+ENGINES: Dict[str, Type[Interpreter]] = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "bytecode": BytecodeInterpreter,
+    "stackless": StacklessInterpreter,
+    "python": PythonInterpreter,
+}
+DEFAULT_ENGINE = "tree"
+
+
+# make an interpreter that runs programs with the given engine
+# tail_calls turns off running tail calls of a function to itself in the same frame (see Interpreter.tail_calls),
+# memoize turns on caching the results of pure functions (see Interpreter.memoize), stack_memory sets how much
+# memory, in bytes, the calls of the stackless engine may take up (see Interpreter.stack_memory), and quicken turns
+# off operations specializing themselves for the types of their operands (see Interpreter.quicken)
+def create_interpreter(
+    engine: str = DEFAULT_ENGINE,
+    tail_calls: bool = True,
+    memoize: bool = False,
+    stack_memory: int = DEFAULT_STACK_MEMORY,
+    quicken: bool = True,
+) -> Interpreter:
+    if engine not in ENGINES:
+        raise Exception(f"Unknown engine: {engine}")
+
+    interpreter = ENGINES[engine]()
+    interpreter.tail_calls = tail_calls
+    interpreter.memoize = memoize
+    interpreter.stack_memory = stack_memory
+    interpreter.quicken = quicken
+    return interpreter
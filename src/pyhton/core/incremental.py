@@ -0,0 +1,280 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from pyhton.core.lexer import Lexer, Token, TokenType
+from pyhton.core.parser import ASTNode, Parser, Program
+
+# tokens that open and close a block, so a top-level statement can carry on over several lines
+BLOCK_OPENING_TOKENS = {TokenType.DEF, TokenType.IF, TokenType.FOR, TokenType.WHILE}
+BLOCK_CLOSING_TOKENS = {TokenType.ENDFUNC, TokenType.ENDIF, TokenType.ENDFOR, TokenType.ENDWHILE}
+
+
+# split source code into lines, keeping the newline at the end of each one
+# (only \n ends a line, as in the lexer, unlike str.splitlines)
+def split_lines(code: str) -> List[str]:
+    lines = [line + "\n" for line in code.split("\n")]
+    lines[-1] = lines[-1][:-1]  # the last line has no newline after it
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+# a source file that is kept lexed and parsed while it is edited, for editor integrations
+# every line is lexed on its own, and the lines are grouped into blocks: a top-level statement, or a
+# def...endfunc / fi...endif / for / while block, together with any blank lines and comments before it
+# an edit re-lexes only the lines it changes and re-parses only the blocks around them, so the time an edit
+# takes depends on the size of the block being edited, not the size of the file
+# whenever the per-line results can't be trusted (a string running over several lines, or an error in the
+# file), the whole file is lexed and parsed again, so the result and errors are always the same as for
+# Parser(Lexer(code).tokenize()).parse()
+# (apart from the lines recorded in the nodes, which are not compared: a block that is not parsed again keeps the
+# lines it was parsed with, even if an edit above it has moved it)
+class IncrementalDocument:
+    def __init__(self, code: str = ""):
+        # the intern table is shared by every line, so each identifier is only classified once
+        self.identifier_table: Dict[str, Tuple[str, TokenType, Optional[str]]] = {}
+
+        # one entry per line: its text, its tokens (None if it could not be lexed), how much it changes the
+        # block nesting depth, and whether a string is still open at the end of it
+        self.lines: List[str] = []
+        self.line_tokens: List[Optional[List[Token]]] = []
+        self.depth_changes: List[int] = []
+        self.open_strings: List[bool] = []
+        self.unlexed_line_count = 0
+        self.open_string_count = 0
+
+        # one entry per block: the line it starts on, and its statements (or the error it could not be parsed with)
+        self.block_starts: List[int] = []
+        self.block_results: List[object] = []
+        self.failed_block_count = 0
+
+        # the result of the last full parse, used while the blocks can't be trusted
+        self.error: Optional[Exception] = None
+        self._full_program: Optional[Program] = None
+
+        self._load(code)
+
+    # the current source code
+    @property
+    def code(self) -> str:
+        return "".join(self.lines)
+
+    # replace the text between two positions, as an editor would
+    # positions are (line, character) pairs counted from 0, and the end position is not included
+    def edit(self, start_line: int, start_character: int, end_line: int, end_character: int, text: str):
+        if (end_line, end_character) < (start_line, start_character):
+            raise Exception("The end of an edit cannot be before its start")
+
+        for line, character in ((start_line, start_character), (end_line, end_character)):
+            if not 0 <= character <= len(self._line_text(line).rstrip("\n")):
+                raise Exception(f"Character {character} is outside line {line}")
+
+        prefix = self._line_text(start_line)[:start_character]
+        suffix = self._line_text(end_line)[end_character:]
+
+        # replace the edited lines, lexing each new line on its own
+        old_stop = min(end_line + 1, len(self.lines))
+        new_lines = split_lines(prefix + text + suffix)
+        self._replace_lines(start_line, old_stop, new_lines)
+
+        self._reparse_blocks(start_line, old_stop, start_line + len(new_lines))
+        self._check_document()
+
+    # the program for the current source code, raising the same error a full parse would if it has one
+    def program(self) -> Program:
+        if self.error is not None:
+            raise self.error
+
+        if self._full_program is not None:
+            return self._full_program
+
+        return Program(tuple(statement for statements in self.block_results for statement in statements))
+
+    # the tokens for the current source code, the same as Lexer(code).tokenize() would make
+    def tokens(self) -> List[Token]:
+        if self.unlexed_line_count or self.open_string_count:
+            return Lexer(self.code).tokenize()
+
+        tokens = []
+        for line, line_tokens in enumerate(self.line_tokens, 1):
+            for token in line_tokens:
+                token.line = line  # the line may have moved since its tokens were made
+            tokens.extend(line_tokens)
+
+        # the EOF token goes after the last line
+        if not self.lines:
+            tokens.append(Token(TokenType.EOF, "", 1, 1))
+        elif self.lines[-1].endswith("\n"):
+            tokens.append(Token(TokenType.EOF, "", len(self.lines) + 1, 1))
+        else:
+            tokens.append(self._lex_line(self.lines[-1], len(self.lines))[-1])
+
+        return tokens
+
+    # private method to lex and parse a whole file
+    def _load(self, code: str):
+        lines = split_lines(code)
+
+        # lex the whole file at once and share the tokens out between the lines, which is much faster than
+        # lexing each line on its own (but only gives the same tokens if no string runs over several lines)
+        try:
+            lexer = Lexer(code)
+            lexer.identifier_table = self.identifier_table
+            tokens = lexer.tokenize()
+        except Exception:
+            tokens = None
+
+        if tokens is None or any(token.type == TokenType.STRING and "\n" in token.value for token in tokens):
+            self._replace_lines(0, 0, lines)
+        else:
+            self.lines = lines
+            self.line_tokens = [[] for _ in lines]
+            for token in tokens[:-1]:  # the EOF token is made again when it is needed
+                self.line_tokens[token.line - 1].append(token)
+
+            self.depth_changes = [self._depth_change(line_tokens) for line_tokens in self.line_tokens]
+            self.open_strings = [False] * len(lines)
+
+        self._reparse_blocks(0, 0, len(self.lines))
+        self._check_document()
+
+    # private method to get the text of a line
+    # (if the last line ends with a newline, there is an empty line after it that can be edited too)
+    def _line_text(self, line: int) -> str:
+        if line == len(self.lines) and (not self.lines or self.lines[-1].endswith("\n")):
+            return ""
+        if not 0 <= line < len(self.lines):
+            raise Exception(f"Line {line} is outside the document")
+        return self.lines[line]
+
+    # private method to lex a single line, returning its tokens with the EOF token at the end
+    def _lex_line(self, text: str, line: int) -> List[Token]:
+        lexer = Lexer(text)
+        lexer.identifier_table = self.identifier_table
+        lexer.line = line
+        return lexer.tokenize()
+
+    # private method to replace the lines from start up to stop with new lines, lexing each of them
+    def _replace_lines(self, start: int, stop: int, new_lines: List[str]):
+        line_tokens = []
+        depth_changes = []
+        open_strings = []
+        for offset, text in enumerate(new_lines):
+            try:
+                tokens = self._lex_line(text, start + offset + 1)[:-1]
+            except Exception:
+                tokens = None
+
+            # a line that ends with a newline always ends with a NEWLINE token, unless a string swallowed it
+            open_string = tokens is not None and text.endswith("\n") and tokens[-1].type != TokenType.NEWLINE
+            line_tokens.append(tokens)
+            depth_changes.append(self._depth_change(tokens))
+            open_strings.append(open_string)
+
+        # keep count of the lines that stop the blocks from being trusted
+        self.unlexed_line_count = self.unlexed_line_count + line_tokens.count(None)
+        self.unlexed_line_count = self.unlexed_line_count - self.line_tokens[start:stop].count(None)
+        self.open_string_count = self.open_string_count + sum(open_strings) - sum(self.open_strings[start:stop])
+
+        self.lines[start:stop] = new_lines
+        self.line_tokens[start:stop] = line_tokens
+        self.depth_changes[start:stop] = depth_changes
+        self.open_strings[start:stop] = open_strings
+
+    # private method to work out how much a line changes the block nesting depth
+    def _depth_change(self, tokens: Optional[List[Token]]) -> int:
+        if tokens is None:
+            return 0
+
+        change = 0
+        for token in tokens:
+            if token.type in BLOCK_OPENING_TOKENS:
+                change = change + 1
+            elif token.type in BLOCK_CLOSING_TOKENS:
+                change = change - 1
+        return change
+
+    # private method to find the blocks again around edited lines, and parse the blocks that changed
+    # the lines from start up to old_stop were replaced by the lines from start up to new_stop
+    def _reparse_blocks(self, start: int, old_stop: int, new_stop: int):
+        shift = new_stop - old_stop
+
+        # the edit starts in this block, and everything before it is unchanged
+        first_block = max(bisect_right(self.block_starts, start) - 1, 0)
+        block_start = self.block_starts[first_block] if self.block_starts else 0
+
+        # the first old block after the edited lines: once a new block boundary lines up with one of these,
+        # every block from there on is unchanged
+        next_old_block = bisect_left(self.block_starts, old_stop)
+
+        # a new block starts after every line that brings the nesting depth back to 0
+        new_starts = [block_start] if block_start < len(self.lines) else []
+        depth = 0
+        line = block_start
+        while line < len(self.lines):
+            depth = max(depth + self.depth_changes[line], 0)  # a stray closing keyword is a parse error anyway
+            line = line + 1
+            if depth != 0 or line == len(self.lines):
+                continue
+
+            if line >= new_stop:
+                while next_old_block < len(self.block_starts) and self.block_starts[next_old_block] + shift < line:
+                    next_old_block = next_old_block + 1
+                if next_old_block < len(self.block_starts) and self.block_starts[next_old_block] + shift == line:
+                    break
+
+            new_starts.append(line)
+        else:
+            next_old_block = len(self.block_starts)
+
+        # parse the new blocks
+        new_results = []
+        block_ends = new_starts[1:] + [line]
+        for block_start, block_end in zip(new_starts, block_ends):
+            new_results.append(self._parse_block(block_start, block_end))
+
+        self.failed_block_count = self.failed_block_count + sum(isinstance(result, Exception) for result in new_results)
+        self.failed_block_count = self.failed_block_count - sum(
+            isinstance(result, Exception) for result in self.block_results[first_block:next_old_block]
+        )
+
+        # the blocks after the edit are unchanged, but the lines they start on move
+        if shift:
+            self.block_starts[next_old_block:] = [
+                block_start + shift for block_start in self.block_starts[next_old_block:]
+            ]
+        self.block_starts[first_block:next_old_block] = new_starts
+        self.block_results[first_block:next_old_block] = new_results
+
+    # private method to parse the lines from start up to stop, returning the statements or the parse error
+    def _parse_block(self, start: int, stop: int) -> object:
+        tokens = []
+        for line in range(start, stop):
+            line_tokens = self.line_tokens[line]
+            if line_tokens is None:
+                return Exception(f"Line {line + 1} could not be lexed")
+
+            # the lines above may have moved since the tokens were made
+            for token in line_tokens:
+                token.line = line + 1
+            tokens.extend(line_tokens)
+        tokens.append(Token(TokenType.EOF, "", stop + 1, 1))
+
+        try:
+            statements: Tuple[ASTNode, ...] = Parser(tokens).parse().statements
+        except Exception as e:
+            return e
+        return statements
+
+    # private method to parse the whole file when the blocks can't be trusted, to get the same result and error
+    # as a full parse
+    def _check_document(self):
+        self.error = None
+        self._full_program = None
+        if not (self.unlexed_line_count or self.open_string_count or self.failed_block_count):
+            return
+
+        try:
+            self._full_program = Parser(Lexer(self.code).tokenize()).parse()
+        except Exception as e:
+            self.error = e
@@ -1,6 +1,8 @@
-from typing import Any, Dict, List
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from blessed import Terminal
 
+from pyhton.core.lexer import Token
 from pyhton.core.parser import (
     Assignment,
     ASTNode,
@@ -12,25 +14,56 @@ from pyhton.core.parser import (
     FunctionDef,
     Identifier,
     IfStatement,
+    IntegerLiteral,
+    LazyFunctionDef,
     LogicalOp,
     NumberLiteral,
     StringLiteral,
     PrintStatement,
+    Parser,
     Program,
     Return,
     UnaryOp,
     WhileLoop,
 )
+from pyhton.core.memoize import PurityAnalyzer, ResultCache, result_key
+from pyhton.core.quickening import AdaptiveOperation
+from pyhton.core.resolver import LocalAssignment, LocalForLoop, LocalIdentifier, Resolver, TailCall
 
 term = Terminal()
 
+# the value of a frame slot whose variable has not been set, and the default the engines pass to dict.get for a
+# variable that is not in a scope (None is a valid value for a variable); every engine uses this one sentinel
+MISSING = object()
+
+# what executing a statement gives back when it ran a return statement inside a function, so the bodies it is in
+# stop, up to the function call, which picks up the value being returned from Interpreter.return_value (or, for a
+# tail call, the function and arguments to call from Interpreter.tail_function and Interpreter.tail_args)
+RETURNED = object()
+
+# the default for Interpreter.stack_memory
+DEFAULT_STACK_MEMORY = 256 * 2**20
+
 
 # class to represent a Python function in the interpreter
+# a lazily parsed function has no body until it is first called, only the tokens to parse it from
+# the tree walking interpreter resolves the body into resolved_body when the function is first called, and keeps
+# the frames of calls that have returned in free_frames, to be used again by later calls
+# with memoize set, a function found to be pure when it is first called has a result_cache
 class PyhtonFunction:
-    def __init__(self, name: str, params: List[str], body: List[ASTNode]):
+    def __init__(
+        self, name: str, params: List[str], body: Optional[List[ASTNode]], body_tokens: Optional[List[Token]] = None
+    ):
         self.name = name
         self.params = params
         self.body = body
+        self.body_tokens = body_tokens
+
+        self.resolved_body: Optional[Tuple[ASTNode, ...]] = None
+        self.empty_frame: List[Any] = []
+        self.free_frames: List[List[Any]] = []
+
+        self.result_cache: Optional[ResultCache] = None
 
 
 # class to represent a built-in function
@@ -40,7 +73,8 @@ class BuiltinFunction:
         self.func = func
 
 
-# class to represent a return exception
+# class to represent a return exception, raised by a return statement outside of any function to end the program
+# (and by the engines that return from functions with it)
 class ReturnException(Exception):
     def __init__(self, value: Any):
         self.value = value
@@ -51,6 +85,41 @@ class Interpreter:
     def __init__(self):
         self.globals: Dict[str, Any] = {}
         self.functions: Dict[str, PyhtonFunction] = {}
+
+        # whether a function that returns a call to itself runs that call in its own frame (only the tree walker
+        # does this), so recursion in tail position is not limited by Python's recursion limit
+        self.tail_calls = True
+
+        # whether pure functions (see PurityAnalyzer) cache their results, so calls with the same arguments are only
+        # worked out once (only the tree walker does this), and the caches that have been made, for statistics
+        self.memoize = False
+        self.memoized_functions: List[PyhtonFunction] = []
+        self.result_caches: List[ResultCache] = []
+
+        # whether binary and comparison operations in functions and top-level loops specialize themselves for the
+        # types of their operands as they run (see AdaptiveOperation; only the tree walker does this), and how many
+        # times each specialization (such as num+num) has been made, and undone because its guard failed
+        self.quicken = True
+        self.specialization_counts: Counter[str] = Counter()
+        self.deoptimization_counts: Counter[str] = Counter()
+
+        # the most memory, in bytes, that the calls waiting for others to return may take up (only the stackless
+        # engine keeps them in memory it can count, the others are limited by Python's recursion limit instead)
+        self.stack_memory = DEFAULT_STACK_MEMORY
+
+        # the variables of the running function call, in the slots the resolver gave them (None outside of
+        # any function)
+        self.frame: Optional[List[Any]] = None
+
+        # the value of the return statement that has just run, on its way back to the function call
+        self.return_value: Any = None
+
+        # the function and arguments of the tail call that has just been made, on their way back to the call of
+        # the function it was made from
+        self.tail_function: Optional[PyhtonFunction] = None
+        self.tail_args: Optional[List[Any]] = None
+
+        # the local scopes of the running function calls, for the engines that keep them in dicts
         self.locals_stack: List[Dict[str, Any]] = []
 
         self._register_builtins()
@@ -66,12 +135,13 @@ class Interpreter:
         if not all(isinstance(arg, (int, float)) for arg in args):
             raise Exception("range() expects numeric arguments")
 
-        # convert all arguments to integers
-        args = [int(arg) for arg in args]
+        # convert any other numbers to integers (integers, the usual case, are used as they are)
+        if not all(arg.__class__ is int for arg in args):
+            args = [int(arg) for arg in args]
 
         # handle different number of arguments
         if len(args) == 1:
-            return range(0, args[0])  # range(n) -> 0 to n-1
+            return range(args[0])  # range(n) -> 0 to n-1
         elif len(args) == 2:
             return range(args[0], args[1])
         else:
@@ -79,14 +149,28 @@ class Interpreter:
 
     # main entry point to interpret a program by executing its statements
     def interpret(self, program: Program):
-        for statement in program.statements:
+        self.interpret_statements(program.statements)
+
+    # interpret statements one at a time, as they are handed over (for example by a streaming parser)
+    def interpret_statements(self, statements: Iterable[ASTNode]):
+        for statement in statements:
+            # outside of functions, only the operations in loops run more than once, so only loops are quickened
+            if self.quicken and isinstance(statement, (WhileLoop, ForLoop)):
+                statement = Resolver(quicken=True).resolve_statement(statement)
             self._execute(statement)
 
+    # work out the value of a single expression
+    def evaluate(self, node: ASTNode) -> Any:
+        return self._execute(node)
+
     # private method to execute a single AST node
     def _execute(self, node: ASTNode) -> Any:
-        # if the node is a number,  string or boolean simply return its value
+        # if the node is an integer, number, string or boolean simply return its value
+
+        if isinstance(node, IntegerLiteral):
+            return node.value
 
-        if isinstance(node, NumberLiteral):
+        elif isinstance(node, NumberLiteral):
             return node.value
 
         elif isinstance(node, StringLiteral):
@@ -95,6 +179,23 @@ class Interpreter:
         elif isinstance(node, BooleanLiteral):
             return node.value
 
+        # if the node is a variable of the running function, read it from its slot, falling back to the global
+        # variable if it has not been set
+        elif isinstance(node, LocalIdentifier):
+            value = self.frame[node.slot]
+            if value is MISSING:
+                return self._get_variable(node.name)
+            return value
+
+        # if the node is an operation that adapts to its operands, run its specialization if they have the types it
+        # was specialized for (the guard), and run it the generic way otherwise
+        elif isinstance(node, AdaptiveOperation):
+            left = self._execute(node.left)
+            right = self._execute(node.right)
+            if left.__class__ is node.left_type and right.__class__ is node.right_type:
+                return node.function(left, right)
+            return self._execute_generic_operation(node, left, right)
+
         # if the node is a comparison operation, execute it
         elif isinstance(node, ComparisonOp):
             return self._execute_comparison_op(node)
@@ -119,6 +220,10 @@ class Interpreter:
         elif isinstance(node, ForLoop):
             return self._execute_for_loop(node)
 
+        # if the node is a for loop over a variable of the running function, execute it
+        elif isinstance(node, LocalForLoop):
+            return self._execute_local_for_loop(node)
+
         # if the node is a while loop, execute it
         elif isinstance(node, WhileLoop):
             return self._execute_while_loop(node)
@@ -133,9 +238,19 @@ class Interpreter:
             self._set_variable(node.name, value)
             return value
 
+        # if the node is an assignment to a variable of the running function, set its slot
+        elif isinstance(node, LocalAssignment):
+            value = self._execute(node.value)
+            self.frame[node.slot] = value
+            return value
+
         # if the node is a function definition, store it in the functions dictionary
         elif isinstance(node, FunctionDef):
-            self.functions[node.name] = PyhtonFunction(node.name, node.params, node.body)
+            self._define_function(PyhtonFunction(node.name, node.params, node.body))
+
+        # if the node is a lazily parsed function definition, store it without a body until it is called
+        elif isinstance(node, LazyFunctionDef):
+            self._define_function(PyhtonFunction(node.name, node.params, None, node.body_tokens))
 
         # if the node is a function call, execute it
         elif isinstance(node, FunctionCall):
@@ -146,13 +261,31 @@ class Interpreter:
             value = self._execute(node.value)
             print(value)
 
-        # if the node is a return statement, raise a ReturnException
+        # if the node is a return statement, hand its value back to the function call
         elif isinstance(node, Return):
             value = None
             if node.value:
                 value = self._execute(node.value)
 
-            raise ReturnException(value)  # exit the current function and return the value
+            if self.frame is None:
+                raise ReturnException(value)  # a return outside of a function ends the program
+
+            self.return_value = value
+            return RETURNED  # exit the current function and return the value
+
+        # if the node is a return of a call to the function it is in, hand the call back to be made in its place
+        elif isinstance(node, TailCall):
+            call = node.call
+            if call.name not in self.functions:
+                raise Exception(f"Unknown function: {call.name}")
+
+            function = self.functions[call.name]
+            args = [self._execute(arg) for arg in call.args]
+
+            # (only set once the arguments have been worked out, as they can make calls of their own)
+            self.tail_function = function
+            self.tail_args = args
+            return RETURNED
 
         else:
             raise Exception(f"Unknown AST node type: {type(node)}")  # raise an error if the node type is not recognized
@@ -161,42 +294,72 @@ class Interpreter:
     def _execute_binary_op(self, node: BinaryOp) -> Any:
         left = self._execute(node.left)  # evaluate the left side of the operator
         right = self._execute(node.right)  # evaluate the right side of the operator
+        return self._binary_operation(node.operator, left, right)
 
+    # private method to apply a binary operator to the values of its operands
+    def _binary_operation(self, operator: str, left: Any, right: Any) -> Any:
         # peform the operation based on the operator type
-        if node.operator == "+":
+        if operator == "+":
+            # two integers (as in counting loops) can't need joining as strings, so they skip the check
+            if left.__class__ is int and right.__class__ is int:
+                return left + right
             # if either operand is a string, convert both to strings for concatenation
             if isinstance(left, str) or isinstance(right, str):
                 return str(left) + str(right)
             else:
                 return left + right
-        elif node.operator == "-":
+        elif operator == "-":
             return left - right
-        elif node.operator == "*":
+        elif operator == "*":
             return left * right
-        elif node.operator == "/":
+        elif operator == "/":
             return left / right
         else:
-            raise Exception(f"Unknown operator: {node.operator}")
+            raise Exception(f"Unknown operator: {operator}")
 
     # private method to execute a comparison operation
     def _execute_comparison_op(self, node: ComparisonOp) -> bool:
         left = self._execute(node.left)
         right = self._execute(node.right)
+        return self._comparison_operation(node.operator, left, right)
 
-        if node.operator == "==":
+    # private method to apply a comparison operator to the values of its operands
+    def _comparison_operation(self, operator: str, left: Any, right: Any) -> bool:
+        if operator == "==":
             return left == right
-        elif node.operator == "!=":
+        elif operator == "!=":
             return left != right
-        elif node.operator == "<":
+        elif operator == "<":
             return left < right
-        elif node.operator == "<=":
+        elif operator == "<=":
             return left <= right
-        elif node.operator == ">":
+        elif operator == ">":
             return left > right
-        elif node.operator == ">=":
+        elif operator == ">=":
             return left >= right
         else:
-            raise Exception(f"Unknown comparison operator: {node.operator}")
+            raise Exception(f"Unknown comparison operator: {operator}")
+
+    # private method to run an adaptive operation the generic way, with the values of its operands
+    # a specialized operation whose guard has failed is deoptimized first, and once an operation has run the
+    # generic way enough times in a row, it is specialized for the types of the operands it last ran with
+    def _execute_generic_operation(self, node: AdaptiveOperation, left: Any, right: Any) -> Any:
+        if node.function is not None:
+            self.deoptimization_counts[node.variant] += 1
+            node.deoptimize()
+
+        if node.is_comparison:
+            result = self._comparison_operation(node.operator, left, right)
+        else:
+            result = self._binary_operation(node.operator, left, right)
+
+        # (only specialized once the operation has worked, so an error keeps being raised the generic way)
+        node.countdown = node.countdown - 1
+        if node.countdown <= 0:
+            variant = node.specialize(left, right)
+            if variant is not None:
+                self.specialization_counts[variant] += 1
+        return result
 
     # private method to execute a logical operation
     def _execute_logical_op(self, node: LogicalOp) -> bool:
@@ -224,50 +387,64 @@ class Interpreter:
 
         if condition:
             # execute the body
-            for statement in node.then_body:
-                self._execute(statement)
-            return
+            return self._execute_body(node.then_body)
 
         # check elif clauses
         for elif_condition, elif_body in node.elif_clauses:
             if self._execute(elif_condition):
-                for statement in elif_body:
-                    self._execute(statement)
-                return
+                return self._execute_body(elif_body)
 
         # if no conditions matched, execute the else body if it exists
         if node.else_body:
-            for statement in node.else_body:
-                self._execute(statement)
+            return self._execute_body(node.else_body)
 
-    # private method to execute a for loop
-    def _execute_for_loop(self, node: ForLoop) -> Any:
-        # evaluate the iterable expression
-        iterable = self._execute(node.iterable)
+    # private method to execute the statements of a body, stopping at a return statement
+    # (returns RETURNED if it stopped at one, None if it ran to the end)
+    def _execute_body(self, body: Tuple[ASTNode, ...]) -> Any:
+        for statement in body:
+            if self._execute(statement) is RETURNED:
+                return RETURNED
 
-        # check if it's a string or range
-        if not isinstance(iterable, (str, range)):
-            raise Exception(f"For loop iterable must be a string or range, got {type(iterable).__name__}")
+    # private method to execute a for loop outside of any function, whose variable is global
+    def _execute_for_loop(self, node: ForLoop) -> Any:
+        iterable = self._execute_iterable(node.iterable)
 
         try:
             for item in iterable:
-                # set the loop variable in the current scope (don't create a new scope)
-                if self.locals_stack:
-                    self.locals_stack[-1][node.variable] = item
-                else:
-                    self.globals[node.variable] = item
+                # set the loop variable in the global scope (don't create a new scope)
+                self.globals[node.variable] = item
 
-                # execute each statement in the loop body
+                # execute each statement in the loop body (a return can't stop it here, as it ends the program)
                 for statement in node.body:
                     self._execute(statement)
         finally:
-            # clean up the loop variable from the current scope
-            if self.locals_stack:
-                if node.variable in self.locals_stack[-1]:
-                    del self.locals_stack[-1][node.variable]
-            else:
-                if node.variable in self.globals:
-                    del self.globals[node.variable]
+            # clean up the loop variable from the global scope
+            if node.variable in self.globals:
+                del self.globals[node.variable]
+
+    # private method to execute a for loop inside a function, whose variable has a slot in the frame
+    def _execute_local_for_loop(self, node: LocalForLoop) -> Any:
+        iterable = self._execute_iterable(node.iterable)
+        frame = self.frame
+
+        try:
+            for item in iterable:
+                frame[node.slot] = item
+                for statement in node.body:
+                    if self._execute(statement) is RETURNED:
+                        return RETURNED
+        finally:
+            # clean up the loop variable, so reading it falls back to the global variable again
+            frame[node.slot] = MISSING
+
+    # private method to evaluate the iterable of a for loop
+    def _execute_iterable(self, node: ASTNode) -> Any:
+        iterable = self._execute(node)
+
+        # check if it's a string or range
+        if not isinstance(iterable, (str, range)):
+            raise Exception(f"For loop iterable must be a string or range, got {type(iterable).__name__}")
+        return iterable
 
     # private method to execute a while loop
     def _execute_while_loop(self, node: WhileLoop) -> Any:
@@ -275,7 +452,8 @@ class Interpreter:
         while self._execute(node.condition):
             # execute each statement in the loop body
             for statement in node.body:
-                self._execute(statement)
+                if self._execute(statement) is RETURNED:
+                    return RETURNED
 
     # private method to execute a function call
     def _execute_function_call(self, node: FunctionCall) -> Any:
@@ -285,55 +463,157 @@ class Interpreter:
 
         function = self.functions[node.name]  # retrieve the function definition from the functions dictionary
 
-        # evaluate all its arguments
-        args = [self._execute(arg) for arg in node.args]
-
+        # built-in functions, calls with the wrong number of arguments, and the first call to a function (before
+        # its body is resolved) take the general path
+        if (
+            isinstance(function, BuiltinFunction)
+            or function.resolved_body is None
+            or len(node.args) != len(function.params)
+        ):
+            return self._call_function(function, [self._execute(arg) for arg in node.args])
+
+        # evaluate the arguments straight into the slots of the parameters, in a frame left by an earlier call
+        free_frames = function.free_frames
+        frame = free_frames.pop() if free_frames else function.empty_frame.copy()
+        for slot, arg in enumerate(node.args):
+            frame[slot] = self._execute(arg)
+
+        return self._run_function(function, frame)
+
+    # private method to call a function with the values of its arguments
+    def _call_function(self, function: PyhtonFunction, args: List[Any]) -> Any:
         # handle built-in functions
         if isinstance(function, BuiltinFunction):
             return function.func(args)
 
         # check parameter count is corerct
         if len(args) != len(function.params):
-            raise Exception(f"Function {node.name} expects {len(function.params)} arguments, got {len(args)}")
+            raise Exception(f"Function {function.name} expects {len(function.params)} arguments, got {len(args)}")
+
+        # parse the body of a lazily parsed function the first time it is called
+        if function.body is None:
+            function.body = self._parse_function_body(function)
+
+        # give the variables of the function their slots the first time it is called
+        if function.resolved_body is None:
+            resolver = Resolver(tail_calls=self.tail_calls, quicken=self.quicken)
+            function.resolved_body, frame_size = resolver.resolve_function(
+                function.name, function.params, function.body
+            )
+            function.empty_frame = [MISSING] * frame_size
 
-        # create a new local variable scope for the function call
-        local_vars = {}
-        for param, arg in zip(function.params, args):
-            local_vars[param] = arg
+            if self.memoize:
+                self._check_purity(function)
 
-        self.locals_stack.append(local_vars)  # push the local variables onto the stack
+        frame = function.free_frames.pop() if function.free_frames else function.empty_frame.copy()
+        frame[: len(args)] = args
+        return self._run_function(function, frame)
 
+    # private method to work out whether a function is pure, giving it an empty result cache if it is
+    def _check_purity(self, function: PyhtonFunction):
         try:
-            # execute each statement in the function body
-            for statement in function.body:
-                self._execute(statement)
-            return None
+            pure = PurityAnalyzer(self.functions).is_pure(function)
+        except RecursionError:
+            pure = False  # too deeply nested to check, so it is never memoized
 
-        # if a return statement is encountered, catch the ReturnException and return its value
-        except ReturnException as ret:
-            return ret.value
+        if not pure:
+            function.result_cache = None
+            return
 
-        finally:
-            self.locals_stack.pop()  # pop the local variables off the stack after execution
+        if function.result_cache is None:
+            function.result_cache = ResultCache(function.name)
+            self.result_caches.append(function.result_cache)
+        else:
+            function.result_cache.clear()  # the functions it calls have been defined again since it was checked
+        self.memoized_functions.append(function)
+
+    # private method to store a function under its name
+    def _define_function(self, function: PyhtonFunction):
+        redefined = function.name in self.functions
+        self.functions[function.name] = function
+
+        # defining a function again can change what the memoized functions that call it return, or make them
+        # impure, so they are all checked again (a function that has itself been replaced can no longer be called)
+        if redefined and self.memoized_functions:
+            memoized_functions = self.memoized_functions
+            self.memoized_functions = []
+            for memoized in memoized_functions:
+                if self.functions.get(memoized.name) is memoized:
+                    self._check_purity(memoized)
+                else:
+                    memoized.result_cache = None
+
+    # private method to run the body of a function in a frame that holds its arguments
+    def _run_function(self, function: PyhtonFunction, frame: List[Any]) -> Any:
+        # a memoized function may already have worked out its result for these arguments
+        result_cache = function.result_cache
+        if result_cache is not None:
+            key = result_key(frame[: len(function.params)])
+            result = result_cache.get(key, MISSING)
+            if result is not MISSING:
+                frame[:] = function.empty_frame
+                function.free_frames.append(frame)
+                return result
+
+        caller_frame = self.frame
+        self.frame = frame
 
-    # private method to get a variable's value from the local or global scope
-    def _get_variable(self, name: str) -> Any:
-        # if the variable is in the local scope, return it
-        if self.locals_stack:
-            local_vars = self.locals_stack[-1]
-            if name in local_vars:
-                return local_vars[name]
+        try:
+            while True:
+                # execute each statement in the function body, until a return statement hands back its value
+                for statement in function.resolved_body:
+                    if self._execute(statement) is RETURNED:
+                        break
+                else:
+                    result = None
+                    break
+
+                tail_function = self.tail_function
+                if tail_function is None:
+                    result = self.return_value
+                    break
+
+                args = self.tail_args
+                self.tail_function = self.tail_args = None
+
+                # a tail call to anything but this function (which has been defined again since the call was
+                # resolved) is an ordinary call, as is one with the wrong number of arguments (to report it)
+                if tail_function is not function or len(args) != len(function.params):
+                    result = self._call_function(tail_function, args)
+                    break
 
-        # if the variable is not in the local scope, check the global scope
+                # otherwise the body runs again, in this frame
+                frame[:] = function.empty_frame
+                frame[: len(args)] = args
+
+        finally:
+            # clear the frame and keep it for the next call
+            self.frame = caller_frame
+            frame[:] = function.empty_frame
+            function.free_frames.append(frame)
+
+        if result_cache is not None:
+            result_cache.store(key, result)
+        return result
+
+    # private method to parse and optimize the body of a lazily parsed function
+    # (syntax errors in it are only found here, when the function is first called)
+    def _parse_function_body(self, function: PyhtonFunction) -> Tuple[ASTNode, ...]:
+        from pyhton.core.optimizer import Optimizer  # imported here, as the optimizer itself uses the interpreter
+
+        body = Parser(function.body_tokens, lazy_functions=True).parse_function_body()
+        function.body_tokens = None  # the tokens are no longer needed
+        return Optimizer().optimize(Program(body)).statements
+
+    # private method to get a global variable's value
+    # (the variables of a function are read from its frame, and only fall back to here if they are not set)
+    def _get_variable(self, name: str) -> Any:
         if name in self.globals:
             return self.globals[name]
 
-        raise Exception(f"Unknown variable: {name}")  # raise an error if the variable is not found in either scope
+        raise Exception(f"Unknown variable: {name}")  # raise an error if there is no such global variable
 
-    # private method to set a variable's value in the local or global scope
+    # private method to set a global variable's value
+    # (assignments inside a function set a slot of its frame instead)
     def _set_variable(self, name: str, value: Any):
-        # set in local scope if in function, otherwise use global scope
-        if self.locals_stack:
-            self.locals_stack[-1][name] = value
-        else:
-            self.globals[name] = value
+        self.globals[name] = value
@@ -1,6 +1,9 @@
+import mmap
+import re
+from array import array
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
 
 from pyhton.language.typo_engine import TypoEngine
 
@@ -63,6 +66,133 @@ class TokenType(Enum):
     EOF = "EOF"
 
 
+# the token type for each keyword and builtin, looked up by the correctly spelled word
+KEYWORD_TOKEN_TYPES = {
+    "def": TokenType.DEF,
+    "endfunc": TokenType.ENDFUNC,
+    "return": TokenType.RETURN,
+    "print": TokenType.PRINT,
+    "range": TokenType.RANGE,
+    "if": TokenType.IF,
+    "elif": TokenType.ELIF,
+    "else": TokenType.ELSE,
+    "endif": TokenType.ENDIF,
+    "for": TokenType.FOR,
+    "in": TokenType.IN,
+    "endfor": TokenType.ENDFOR,
+    "while": TokenType.WHILE,
+    "endwhile": TokenType.ENDWHILE,
+    "and": TokenType.AND,
+    "or": TokenType.OR,
+    "not": TokenType.NOT,
+    "True": TokenType.BOOLEAN,
+    "False": TokenType.BOOLEAN,
+}
+
+
+# the token type for each single character token
+SINGLE_CHAR_TOKENS = {
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.MULTIPLY,
+    "/": TokenType.DIVIDE,
+    "=": TokenType.ASSIGN,
+    "(": TokenType.LPAREN,
+    ")": TokenType.RPAREN,
+    ":": TokenType.COLON,
+    ",": TokenType.COMMA,
+    "\n": TokenType.NEWLINE,
+}
+
+# one master regex for the regex scanner, with a named group for each kind of token
+# each match skips the whitespace before a token, then tries the alternatives, most common tokens first
+# (the only alternatives whose order matters are the two character operators, which must come before
+# their one character prefixes)
+# only ascii is matched here: anything else falls through to OTHER and is read by the character scanner,
+# which knows the exact rules str.isdigit and str.isalpha use for unicode
+# (the same pattern is compiled for str and for bytes, see BYTES_TOKEN_PATTERN)
+TOKEN_PATTERN_SOURCE = r"""
+    [ \t\r]*+
+    (?:
+        (?P<IDENTIFIER>[A-Za-z_]\w*+(?![^\x00-\x7f]))
+        | (?P<NEWLINE>\n)
+        | (?P<LPAREN>\()
+        | (?P<RPAREN>\))
+        | (?P<COLON>:)
+        | (?P<COMMA>,)
+        | (?P<PLUS>\+)
+        | (?P<MINUS>-)
+        | (?P<MULTIPLY>\*)
+        | (?P<DIVIDE>/)
+        | (?P<EQUALS>==)
+        | (?P<ASSIGN>=)
+        | (?P<NUMBER>[0-9][0-9.]*+(?![^\x00-\x7f]))
+        | (?P<STRING>"[^"]*"?)
+        | (?P<NOT_EQUALS>!=)
+        | (?P<LESS_EQUAL><=)
+        | (?P<LESS_THAN><)
+        | (?P<GREATER_EQUAL>>=)
+        | (?P<GREATER_THAN>>)
+        | (?P<COMMENT>\#[^\n]*)
+        | (?P<OTHER>.)
+    )
+"""
+TOKEN_PATTERN = re.compile(TOKEN_PATTERN_SOURCE, re.VERBOSE | re.DOTALL)
+
+# the master regex for source code in a bytes buffer, such as a memory mapped file
+# \w only matches ascii in a bytes pattern, which is why identifiers and numbers must not run into a non-ascii
+# character: those are read by the character scanner instead
+BYTES_TOKEN_PATTERN = re.compile(TOKEN_PATTERN_SOURCE.encode("ascii"), re.VERBOSE | re.DOTALL)
+
+# the text the character scanner needs to read a token that falls through to OTHER in a bytes buffer:
+# any token it reads is made of word characters, dots and non-ascii characters
+BYTES_FALLBACK_PATTERN = re.compile(rb"[\w.\x80-\xff]*+")
+
+# group numbers of the master regex that need extra handling
+IDENTIFIER_GROUP = TOKEN_PATTERN.groupindex["IDENTIFIER"]
+NEWLINE_GROUP = TOKEN_PATTERN.groupindex["NEWLINE"]
+STRING_GROUP = TOKEN_PATTERN.groupindex["STRING"]
+COMMENT_GROUP = TOKEN_PATTERN.groupindex["COMMENT"]
+NUMBER_GROUP = TOKEN_PATTERN.groupindex["NUMBER"]
+OTHER_GROUP = TOKEN_PATTERN.groupindex["OTHER"]
+
+# token type for each group number of the master regex (the value of these tokens is just the matched text)
+GROUP_TOKEN_TYPES = [None] * (TOKEN_PATTERN.groups + 1)
+for name, group in TOKEN_PATTERN.groupindex.items():
+    if name in TokenType.__members__:
+        GROUP_TOKEN_TYPES[group] = TokenType[name]
+
+# the text of each operator and punctuation token, by group number of the master regex
+# (the bytes scanner uses these so it does not have to decode them)
+GROUP_TOKEN_VALUES = [None] * (TOKEN_PATTERN.groups + 1)
+OPERATOR_TOKENS = {
+    "==": TokenType.EQUALS,
+    "!=": TokenType.NOT_EQUALS,
+    "<=": TokenType.LESS_EQUAL,
+    "<": TokenType.LESS_THAN,
+    ">=": TokenType.GREATER_EQUAL,
+    ">": TokenType.GREATER_THAN,
+}
+for value, token_type in [*SINGLE_CHAR_TOKENS.items(), *OPERATOR_TOKENS.items()]:
+    GROUP_TOKEN_VALUES[TOKEN_PATTERN.groupindex[token_type.name]] = value
+
+# every token type gets a small number, so compact token streams can store it in a single byte
+TOKEN_KINDS = list(TokenType)
+TOKEN_KIND_CODES = {token_type: code for code, token_type in enumerate(TOKEN_KINDS)}
+
+# token kind code for each group number of the master regex
+GROUP_TOKEN_KINDS = [None if token_type is None else TOKEN_KIND_CODES[token_type] for token_type in GROUP_TOKEN_TYPES]
+
+# token types that are read as identifiers, and so have an entry in the lexer's intern table
+IDENTIFIER_TOKEN_TYPES = {TokenType.IDENTIFIER, *KEYWORD_TOKEN_TYPES.values()}
+
+# the available scanners: "regex" matches whole tokens with TOKEN_PATTERN, "char" reads one character at a time
+SCANNERS = ("regex", "char")
+
+# how much of a source file the regex scanner reads at a time
+CHUNK_SIZE = 1 << 16
+
+
 # the Token class represents a single token in the source code
 @dataclass
 class Token:
@@ -73,26 +203,340 @@ class Token:
     original_word: Optional[str] = None
 
 
+# a compact list of tokens, stored as one array per field instead of one object per token
+# each token takes a byte for its type and four 32 bit ints for the start and end of its value in the source code,
+# its line and its column (so sources must be under 4 GiB), and Token objects are only made when a token is read
+class TokenStream:
+    def __init__(self, code: str, identifier_table: Dict[str, Tuple[str, TokenType, Optional[str]]]):
+        self.code = code
+        self.identifier_table = identifier_table  # the lexer's intern table, to share identifier strings
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.lines = array("I")
+        self.columns = array("I")
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    # make the Token at a position, slicing its value out of the source code
+    def __getitem__(self, index: int) -> Token:
+        token_type = TOKEN_KINDS[self.kinds[index]]
+        value = self.code[self.starts[index] : self.ends[index]]
+
+        original_word = None
+        if token_type in IDENTIFIER_TOKEN_TYPES:
+            value, _, original_word = self.identifier_table[value]
+
+        return Token(token_type, value, self.lines[index], self.columns[index], original_word)
+
+    # make the Tokens one at a time, in order
+    def __iter__(self) -> Iterator[Token]:
+        code = self.code
+        identifier_table = self.identifier_table
+        for kind, start, end, line, column in zip(self.kinds, self.starts, self.ends, self.lines, self.columns):
+            token_type = TOKEN_KINDS[kind]
+            if token_type in IDENTIFIER_TOKEN_TYPES:
+                value, _, original_word = identifier_table[code[start:end]]
+                yield Token(token_type, value, line, column, original_word)
+            else:
+                yield Token(token_type, code[start:end], line, column)
+
+    # the type of the token at a position, without making the Token
+    def token_type(self, index: int) -> TokenType:
+        return TOKEN_KINDS[self.kinds[index]]
+
+    # add a token, given where its value is in the source code
+    def append(self, kind: int, start: int, end: int, line: int, column: int):
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+        self.columns.append(column)
+
+
 # the lexer tokenizes the source code into a list of tokens
 class Lexer:
-    def __init__(self, code: str):
+    def __init__(
+        self, code: Union[str, bytes, mmap.mmap, TextIO], scanner: str = "regex", chunk_size: int = CHUNK_SIZE
+    ):
+        if scanner not in SCANNERS:
+            raise Exception(f"Unknown scanner: {scanner}")
+
         self.code = code
+        self.scanner = scanner
+        self.chunk_size = chunk_size
         self.pos = 0
         self.line = 1
         self.column = 1
         self.typo_engine = TypoEngine()
 
+        # intern table for identifiers: each distinct spelling is classified once, and every token
+        # with that spelling shares the same string, token type and original word
+        self.identifier_table: Dict[str, Tuple[str, TokenType, Optional[str]]] = {}
+        self.identifier_count = 0  # number of identifiers read, to work out the intern table hit rate
+
+    # fraction of identifiers that were found in the intern table instead of being classified
+    def identifier_hit_rate(self) -> float:
+        if self.identifier_count == 0:
+            return 0.0
+        return (self.identifier_count - len(self.identifier_table)) / self.identifier_count
+
     # main method to tokenize the source code
     def tokenize(self) -> List[Token]:
-        tokens = []  # initialize an empty list to hold tokens
+        return list(self.iter_tokens())
+
+    # tokenize the source code into a compact TokenStream instead of a list of Token objects
+    # (this scans the same way as the regex scanner, but records where each token is instead of making it)
+    def tokenize_compact(self) -> TokenStream:
+        if not isinstance(self.code, str):
+            raise Exception("Compact token streams can only be made from source code in a string")
+
+        code = self.code
+        stream = TokenStream(code, self.identifier_table)
+        append = stream.append
+        identifier_table = self.identifier_table
+
+        line = self.line
+        line_start = self.pos - (self.column - 1)
+        tab_columns = 0
+        has_tabs = "\t" in code
+
+        end = self.pos
+        next_match = TOKEN_PATTERN.scanner(code, end).match
+        while match := next_match():
+            group = match.lastindex
+            whitespace_start = end
+            start, end = match.span(group)
+
+            if has_tabs:
+                tab_columns = tab_columns + 3 * code.count("\t", whitespace_start, start)
+            column = start - line_start + 1 + tab_columns
+
+            if group == IDENTIFIER_GROUP:
+                # classify the identifier the first time it is seen, the same way _identifier_token does
+                self.identifier_count = self.identifier_count + 1
+                value = code[start:end]
+                entry = identifier_table.get(value)
+                if entry is None:
+                    entry = self._classify_identifier(value)
+                    identifier_table[value] = entry
+                append(TOKEN_KIND_CODES[entry[1]], start, end, line, column)
+            elif group == NEWLINE_GROUP:
+                append(GROUP_TOKEN_KINDS[group], start, end, line, column)
+                line = line + 1
+                line_start = end
+                tab_columns = 0
+            elif group == STRING_GROUP:
+                # only the text between the quotes is the value
+                value_end = end - 1 if end - start > 1 and code[end - 1] == '"' else end
+                append(GROUP_TOKEN_KINDS[group], start + 1, value_end, line, column)
+            elif group == OTHER_GROUP:
+                # let the character scanner read anything the regex does not cover, then carry on after it
+                self.pos, self.line, self.column = start, line, column
+                token = self._next_token()
+                if token:
+                    append(TOKEN_KIND_CODES[token.type], start, self.pos, line, column)
+
+                end = self.pos
+                tab_columns = self.column - (end - line_start) - 1
+                next_match = TOKEN_PATTERN.scanner(code, end).match
+            elif group != COMMENT_GROUP:
+                append(GROUP_TOKEN_KINDS[group], start, end, line, column)
+
+        # only whitespace is left after the last token
+        if has_tabs:
+            tab_columns = tab_columns + 3 * code.count("\t", end)
+
+        self.pos = len(code)
+        self.line = line
+        self.column = len(code) - line_start + 1 + tab_columns
+        append(TOKEN_KIND_CODES[TokenType.EOF], self.pos, self.pos, self.line, self.column)  # the EOF token
+
+        return stream
+
+    # generate the tokens one at a time, ending with an EOF token
+    # with the regex scanner the source can be a file object, which is read in chunks so it never has to
+    # fit in memory all at once, or utf-8 encoded bytes such as a memory mapped file, which are scanned in place
+    def iter_tokens(self) -> Iterator[Token]:
+        if self.scanner == "regex":
+            if isinstance(self.code, (bytes, mmap.mmap)):
+                yield from self._buffer_tokens()
+            else:
+                yield from self._regex_tokens()
+            return
+
+        if not isinstance(self.code, str):
+            raise Exception("The char scanner can only read source code from a string")
 
         while self.pos < len(self.code):  # repeat until the end of the code
             token = self._next_token()  # get the next token
             if token:
-                tokens.append(token)  # if a token is found, append it to the list
-        tokens.append(Token(TokenType.EOF, "", self.line, self.column))  # add an EOF token to mark the end of the input
+                yield token
+        yield Token(TokenType.EOF, "", self.line, self.column)  # add an EOF token to mark the end of the input
+
+    # private method to split the source code into chunks
+    def _source_chunks(self) -> Iterator[str]:
+        if isinstance(self.code, str):
+            yield self.code
+            return
+
+        while chunk := self.code.read(self.chunk_size):
+            yield chunk
+
+    # private method to tokenize the source code by matching whole tokens with the master regex
+    def _regex_tokens(self) -> Iterator[Token]:
+        source = self.code
+        chunks = self._source_chunks()
+        chunk = next(chunks, "")
+
+        # the text being scanned: the current chunk, plus anything left over from the previous one
+        code = ""
+        offset = self.pos  # position of the start of code in the whole source
+
+        # the column is worked out from the position of each token: it is the distance from the start of
+        # the line, plus 3 extra columns for every tab skipped as whitespace on this line (a tab is 4 spaces)
+        line = self.line
+        line_start = -(self.column - 1)
+        tab_columns = 0
+
+        final = False
+        while not final:
+            next_chunk = next(chunks, None)
+            final = next_chunk is None  # the last chunk can be scanned right to the end
+
+            # keep the unfinished text from the previous chunk, as the last token might continue in this one
+            end = 0
+            code = code + chunk
+            length = len(code)
+            has_tabs = "\t" in code
+
+            next_match = TOKEN_PATTERN.scanner(code).match
+            while match := next_match():
+                group = match.lastindex
+                whitespace_start = end
+                start, end = match.span(group)
+
+                # a token that reaches the end of the chunk might carry on in the next one, so scan it again then
+                # (only the character scanner's tokens can end without reaching the end of the line)
+                if not final and (end == length or (group == OTHER_GROUP and code.find("\n", start) == -1)):
+                    end = whitespace_start
+                    break
+
+                if has_tabs:
+                    tab_columns = tab_columns + 3 * code.count("\t", whitespace_start, start)
+                column = start - line_start + 1 + tab_columns
+
+                if group == IDENTIFIER_GROUP:
+                    yield self._identifier_token(code[start:end], line, column)
+                elif group == NEWLINE_GROUP:
+                    yield Token(TokenType.NEWLINE, "\n", line, column)
+                    line = line + 1
+                    line_start = end
+                    tab_columns = 0
+                elif group == STRING_GROUP:
+                    # strip the quotes (an unterminated string runs to the end of the code)
+                    value_end = end - 1 if end - start > 1 and code[end - 1] == '"' else end
+                    yield Token(TokenType.STRING, code[start + 1 : value_end], line, column)
+                elif group == OTHER_GROUP:
+                    # let the character scanner read anything the regex does not cover, then carry on after it
+                    self.code, self.pos, self.line, self.column = code, start, line, column
+                    token = self._next_token()
+                    self.code = source
+                    if token:
+                        yield token
+
+                    end = self.pos
+                    tab_columns = self.column - (end - line_start) - 1
+                    next_match = TOKEN_PATTERN.scanner(code, end).match
+                elif group != COMMENT_GROUP:
+                    yield Token(GROUP_TOKEN_TYPES[group], code[start:end], line, column)
+
+            if not final:
+                # drop the text that has been scanned
+                code = code[end:]
+                offset = offset + end
+                line_start = line_start - end
+                chunk = next_chunk
+
+        # only whitespace is left after the last token
+        if has_tabs:
+            tab_columns = tab_columns + 3 * code.count("\t", end)
+
+        self.pos = offset + len(code)
+        self.line = line
+        self.column = len(code) - line_start + 1 + tab_columns
+        yield Token(TokenType.EOF, "", self.line, self.column)  # add an EOF token to mark the end of the input
+
+    # private method to tokenize utf-8 encoded source code in a bytes buffer without decoding all of it
+    # only the text of identifiers, numbers and strings is decoded, when their tokens are made
+    def _buffer_tokens(self) -> Iterator[Token]:
+        buffer = self.code
+        length = len(buffer)
+
+        # the column is worked out the same way as in _regex_tokens, except that positions count bytes:
+        # extra_columns makes up for tabs (4 columns) and for characters that take more than one byte (1 column)
+        line = self.line
+        line_start = self.pos - (self.column - 1)
+        extra_columns = 0
+        has_tabs = buffer.find(b"\t") != -1
+
+        end = self.pos
+        next_match = BYTES_TOKEN_PATTERN.scanner(buffer, end).match
+        while match := next_match():
+            group = match.lastindex
+            whitespace_start = end
+            start, end = match.span(group)
+
+            if has_tabs and start > whitespace_start:
+                extra_columns = extra_columns + 3 * buffer[whitespace_start:start].count(b"\t")
+            column = start - line_start + 1 + extra_columns
+
+            if group == IDENTIFIER_GROUP:
+                yield self._identifier_token(buffer[start:end].decode("ascii"), line, column)
+            elif group == NEWLINE_GROUP:
+                yield Token(TokenType.NEWLINE, "\n", line, column)
+                line = line + 1
+                line_start = end
+                extra_columns = 0
+            elif group == STRING_GROUP:
+                # strip the quotes (an unterminated string runs to the end of the code)
+                value_end = end - 1 if end - start > 1 and buffer[end - 1] == 34 else end  # 34 is '"'
+                raw_value = buffer[start + 1 : value_end]
+                value = raw_value.decode("utf-8")
+                extra_columns = extra_columns + len(value) - len(raw_value)
+                yield Token(TokenType.STRING, value, line, column)
+            elif group == OTHER_GROUP:
+                # decode just the text the character scanner needs, let it read the token, then carry on after it
+                text_end = BYTES_FALLBACK_PATTERN.match(buffer, start + 1).end()
+                text = buffer[start:text_end].decode("utf-8")
+                self.code, self.pos, self.line, self.column = text, 0, line, column
+                token = self._next_token()
+                self.code = buffer
+                if token:
+                    yield token
+
+                end = start + len(text[: self.pos].encode("utf-8"))
+                extra_columns = self.column - (end - line_start) - 1
+                next_match = BYTES_TOKEN_PATTERN.scanner(buffer, end).match
+            elif group == COMMENT_GROUP:
+                # comments are skipped, but the newline after them still needs the right column
+                comment = buffer[start:end]
+                if not comment.isascii():
+                    extra_columns = extra_columns + len(comment.decode("utf-8")) - len(comment)
+            elif group == NUMBER_GROUP:
+                yield Token(TokenType.NUMBER, buffer[start:end].decode("ascii"), line, column)
+            else:
+                yield Token(GROUP_TOKEN_TYPES[group], GROUP_TOKEN_VALUES[group], line, column)
 
-        return tokens  # return the list of tokens
+        # only whitespace is left after the last token
+        if has_tabs:
+            extra_columns = extra_columns + 3 * buffer[end:length].count(b"\t")
+
+        self.pos = length
+        self.line = line
+        self.column = length - line_start + 1 + extra_columns
+        yield Token(TokenType.EOF, "", self.line, self.column)  # add an EOF token to mark the end of the input
 
     # private method to get the next token from the source code
     def _next_token(self) -> Optional[Token]:
@@ -155,21 +599,8 @@ class Lexer:
             return self._read_identifier()
 
         # handle single-character tokens
-        single_char_tokens = {
-            "+": TokenType.PLUS,
-            "-": TokenType.MINUS,
-            "*": TokenType.MULTIPLY,
-            "/": TokenType.DIVIDE,
-            "=": TokenType.ASSIGN,
-            "(": TokenType.LPAREN,
-            ")": TokenType.RPAREN,
-            ":": TokenType.COLON,
-            ",": TokenType.COMMA,
-            "\n": TokenType.NEWLINE,
-        }
-
-        if current_char in single_char_tokens:
-            token_type = single_char_tokens[current_char]  # get the token type for the current character
+        if current_char in SINGLE_CHAR_TOKENS:
+            token_type = SINGLE_CHAR_TOKENS[current_char]  # get the token type for the current character
             token = Token(token_type, current_char, self.line, self.column)  # create a new token
             self._advance()  # advance to the next character
 
@@ -223,12 +654,14 @@ class Lexer:
         start_column = self.column
         self._advance()  # skip opening quote
 
-        value = ""
+        # the string runs until the closing quote, or the end of the code if there is none
+        end = self.code.find('"', self.pos)
+        if end == -1:
+            end = len(self.code)
 
-        # repeat until the end of the code or a closing quote is found
-        while self.pos < len(self.code) and self.code[self.pos] != '"':
-            value = value + self.code[self.pos]  # append the current character to the value
-            self._advance()  # advance to the next character
+        value = self.code[self.pos : end]  # slice the whole string out at once
+        self.pos = end
+        self.column = self.column + len(value)
 
         if self.pos < len(self.code):
             self._advance()  # skip closing quote
@@ -245,53 +678,33 @@ class Lexer:
             self._advance()
 
         value = self.code[start_pos : self.pos]  # get the substring from start_pos to current position
+        return self._identifier_token(value, self.line, start_column)
 
+    # private method to create the token for an identifier or keyword
+    def _identifier_token(self, value: str, line: int, column: int) -> Token:
+        self.identifier_count = self.identifier_count + 1
+
+        # look the identifier up in the intern table, classifying it the first time it is seen
+        entry = self.identifier_table.get(value)
+        if entry is None:
+            entry = self._classify_identifier(value)
+            self.identifier_table[value] = entry
+
+        value, token_type, original_word = entry
+        return Token(token_type, value, line, column, original_word)
+
+    # private method to work out the token type of an identifier or keyword
+    def _classify_identifier(self, value: str) -> Tuple[str, TokenType, Optional[str]]:
         # raise an exception if the identifier is a correct word
         if self.typo_engine.is_correct_word(value):
             raise Exception(f"'{value}' is spelled correctly. It must be a typo.")
 
         correct_word = self.typo_engine.find_original_word(value)  # find the original word if it is a typo
 
-        # if the correct word is one of the keywords, return the corresponding token type
-        if correct_word == "def":
-            return Token(TokenType.DEF, value, self.line, start_column)
-        elif correct_word == "endfunc":
-            return Token(TokenType.ENDFUNC, value, self.line, start_column)
-        elif correct_word == "return":
-            return Token(TokenType.RETURN, value, self.line, start_column)
-        elif correct_word == "print":
-            return Token(TokenType.PRINT, value, self.line, start_column)
-        elif correct_word == "range":
-            return Token(TokenType.RANGE, value, self.line, start_column)
-        elif correct_word == "if":
-            return Token(TokenType.IF, value, self.line, start_column)
-        elif correct_word == "elif":
-            return Token(TokenType.ELIF, value, self.line, start_column)
-        elif correct_word == "else":
-            return Token(TokenType.ELSE, value, self.line, start_column)
-        elif correct_word == "endif":
-            return Token(TokenType.ENDIF, value, self.line, start_column)
-        elif correct_word == "for":
-            return Token(TokenType.FOR, value, self.line, start_column)
-        elif correct_word == "in":
-            return Token(TokenType.IN, value, self.line, start_column)
-        elif correct_word == "endfor":
-            return Token(TokenType.ENDFOR, value, self.line, start_column)
-        elif correct_word == "while":
-            return Token(TokenType.WHILE, value, self.line, start_column)
-        elif correct_word == "endwhile":
-            return Token(TokenType.ENDWHILE, value, self.line, start_column)
-        elif correct_word == "and":
-            return Token(TokenType.AND, value, self.line, start_column)
-        elif correct_word == "or":
-            return Token(TokenType.OR, value, self.line, start_column)
-        elif correct_word == "not":
-            return Token(TokenType.NOT, value, self.line, start_column)
-        elif correct_word == "True":
-            return Token(TokenType.BOOLEAN, value, self.line, start_column, correct_word)
-        elif correct_word == "False":
-            return Token(TokenType.BOOLEAN, value, self.line, start_column, correct_word)
-        else:
-            return Token(
-                TokenType.IDENTIFIER, value, self.line, start_column
-            )  # return an identifier token if it is not a keyword
+        # if the correct word is a keyword, use its token type, otherwise it is an identifier
+        token_type = KEYWORD_TOKEN_TYPES.get(correct_word, TokenType.IDENTIFIER)
+
+        # booleans keep the correctly spelled word, so the parser knows which value they are
+        original_word = correct_word if token_type == TokenType.BOOLEAN else None
+
+        return value, token_type, original_word
@@ -0,0 +1,196 @@
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from pyhton.core.parser import (
+    Assignment,
+    ASTNode,
+    BinaryOp,
+    ComparisonOp,
+    ForLoop,
+    FunctionCall,
+    FunctionDef,
+    Identifier,
+    IfStatement,
+    LazyFunctionDef,
+    LogicalOp,
+    PrintStatement,
+    Return,
+    UnaryOp,
+    WhileLoop,
+)
+
+# the most results kept for each memoized function, after which the least recently used ones are dropped
+RESULT_CACHE_SIZE = 4096
+
+# the built-in functions whose result only depends on their arguments
+PURE_BUILTINS = {"range"}
+
+
+# the key a call's result is cached under
+# arguments that are equal but can give different results (1 and True, or 0.0 and -0.0) get different keys
+def result_key(args: Iterable[Any]) -> Tuple[Any, ...]:
+    return tuple((arg.__class__, repr(arg) if arg.__class__ is float and arg == 0 else arg) for arg in args)
+
+
+# the results of a memoized function, keyed by its arguments, keeping only the most recently used ones
+class ResultCache:
+    def __init__(self, name: str, max_size: int = RESULT_CACHE_SIZE):
+        self.name = name
+        self.max_size = max_size
+        self.results: OrderedDict[Tuple[Any, ...], Any] = OrderedDict()
+
+        # statistics, for --debug
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # the cached result for a key, or default if there is none (None is a valid result, so it can't be the default)
+    def get(self, key: Tuple[Any, ...], default: Any) -> Any:
+        result = self.results.get(key, default)
+        if result is default:
+            self.misses = self.misses + 1
+        else:
+            self.hits = self.hits + 1
+            self.results.move_to_end(key)
+        return result
+
+    # cache a result, dropping the least recently used one if the cache is full
+    def store(self, key: Tuple[Any, ...], result: Any):
+        self.results[key] = result
+        if len(self.results) > self.max_size:
+            self.results.popitem(last=False)
+            self.evictions = self.evictions + 1
+
+    # drop every cached result (when a function it may call has been defined again)
+    def clear(self):
+        self.results.clear()
+
+    # the share of lookups that found a result
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+# works out whether functions are pure: whether a call's result only depends on its arguments, and the call has
+# no effects apart from working it out, so calls with the same arguments can share one result
+# a function is pure if its body
+# - never prints and never defines a function
+# - only reads its parameters and local variables that are certain to have been set (any other name may be a
+#   global variable, which can change between calls; functions never write to global variables)
+# - only calls pure functions, including itself (a function whose body has not been parsed yet counts as impure)
+class PurityAnalyzer:
+    def __init__(self, functions: Dict[str, Any]):
+        self.functions = functions
+        self.verdicts: Dict[int, bool] = {}  # by id of the function object, assumed pure while it is checked
+
+    # check whether a function is pure
+    def is_pure(self, function: Any) -> bool:
+        if id(function) in self.verdicts:
+            return self.verdicts[id(function)]
+
+        if function.body is None:
+            return False
+
+        self.verdicts[id(function)] = True
+        pure = self._check_body(function.body, frozenset(function.params)) is not None
+        self.verdicts[id(function)] = pure
+        return pure
+
+    # private method to check the statements of a body, given the variables that are certain to be set before it
+    # returns the variables that are certain to be set after it, or None if it is impure
+    def _check_body(self, body: Iterable[ASTNode], assigned: FrozenSet[str]) -> Optional[FrozenSet[str]]:
+        for statement in body:
+            assigned = self._check_statement(statement, assigned)
+            if assigned is None:
+                return None
+        return assigned
+
+    # private method to check a single statement, in the same way as _check_body
+    def _check_statement(self, node: ASTNode, assigned: FrozenSet[str]) -> Optional[FrozenSet[str]]:
+        if isinstance(node, (PrintStatement, FunctionDef, LazyFunctionDef)):
+            return None
+
+        elif isinstance(node, Assignment):
+            return assigned | {node.name} if self._check_expression(node.value, assigned) else None
+
+        elif isinstance(node, Return):
+            return assigned if node.value is None or self._check_expression(node.value, assigned) else None
+
+        elif isinstance(node, IfStatement):
+            return self._check_if_statement(node, assigned)
+
+        elif isinstance(node, WhileLoop):
+            # a variable is only certain to be set at the start of an iteration if it is set before the loop and
+            # after every iteration, so check it again until that settles
+            while True:
+                if not self._check_expression(node.condition, assigned):
+                    return None
+                after_body = self._check_body(node.body, assigned)
+                if after_body is None:
+                    return None
+                if assigned <= after_body:
+                    return assigned
+                assigned = assigned & after_body
+
+        elif isinstance(node, ForLoop):
+            if not self._check_expression(node.iterable, assigned):
+                return None
+
+            # the same as a while loop, with the loop variable set during the body and unset after the loop
+            while True:
+                after_body = self._check_body(node.body, assigned | {node.variable})
+                if after_body is None:
+                    return None
+                if assigned <= after_body:
+                    return assigned - {node.variable}
+                assigned = assigned & after_body
+
+        # anything else is an expression used as a statement
+        return assigned if self._check_expression(node, assigned) else None
+
+    # private method to check an if statement: a variable is only certain to be set after it if it is set after
+    # every branch (including not taking any, without an else branch)
+    def _check_if_statement(self, node: IfStatement, assigned: FrozenSet[str]) -> Optional[FrozenSet[str]]:
+        after = None if node.else_body is not None else assigned
+
+        for condition, body in [(node.condition, node.then_body), *node.elif_clauses]:
+            if not self._check_expression(condition, assigned):
+                return None
+            after_branch = self._check_body(body, assigned)
+            if after_branch is None:
+                return None
+            after = after_branch if after is None else after & after_branch
+
+        if node.else_body is not None:
+            after_else = self._check_body(node.else_body, assigned)
+            if after_else is None:
+                return None
+            after = after & after_else
+
+        return after
+
+    # private method to check whether an expression is pure
+    def _check_expression(self, node: ASTNode, assigned: FrozenSet[str]) -> bool:
+        if isinstance(node, Identifier):
+            return node.name in assigned
+
+        elif isinstance(node, (BinaryOp, ComparisonOp, LogicalOp)):
+            return self._check_expression(node.left, assigned) and self._check_expression(node.right, assigned)
+
+        elif isinstance(node, UnaryOp):
+            return self._check_expression(node.operand, assigned)
+
+        elif isinstance(node, FunctionCall):
+            if not all(self._check_expression(arg, assigned) for arg in node.args):
+                return False
+
+            from pyhton.core.interpreter import BuiltinFunction  # imported here, as the interpreter uses this module
+
+            function = self.functions.get(node.name)
+            if function is None:
+                return False
+            if isinstance(function, BuiltinFunction):
+                return function.name in PURE_BUILTINS
+            return self.is_pure(function)
+
+        return True  # literals
@@ -0,0 +1,206 @@
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from pyhton.core.interpreter import Interpreter
+from pyhton.core.parser import (
+    Assignment,
+    ASTNode,
+    BinaryOp,
+    BooleanLiteral,
+    ComparisonOp,
+    ForLoop,
+    FunctionCall,
+    FunctionDef,
+    IfStatement,
+    IntegerLiteral,
+    LazyFunctionDef,
+    LogicalOp,
+    NumberLiteral,
+    PrintStatement,
+    Program,
+    Return,
+    StringLiteral,
+    UnaryOp,
+    WhileLoop,
+)
+
+# folded strings longer than this are left to be built at runtime, so they don't bloat the AST and .ypc files
+MAX_FOLDED_STRING_LENGTH = 1024
+
+
+# the optimizer rewrites an AST into a simpler one that behaves exactly the same when it is run:
+# - operators whose operands are all constants are worked out once, here, instead of every time they run
+# - if statements with constant conditions are replaced by the branch that is always taken
+# - while loops that never run are removed
+# - statements after a return in the same body are removed, as they can never run
+class Optimizer:
+    def __init__(self):
+        # constant expressions are worked out by the interpreter itself, so they give exactly the same
+        # value (or error) as they would at runtime
+        self.evaluator = Interpreter()
+
+    # optimize a whole program
+    def optimize(self, program: Program) -> Program:
+        return Program(tuple(self.optimize_statements(program.statements)))
+
+    # optimize statements one at a time, as they are handed over (for example by a streaming parser)
+    def optimize_statements(self, statements: Iterable[ASTNode]) -> Iterator[ASTNode]:
+        for statement in statements:
+            try:
+                optimized = self._optimize_statement(statement)
+            except RecursionError:
+                optimized = [statement]  # too deeply nested to optimize, so run it as it is
+
+            yield from optimized
+
+            # nothing after a return can run
+            if optimized and isinstance(optimized[-1], Return):
+                return
+
+    # private method to optimize a body, stopping after the first return
+    def _optimize_body(self, body: Iterable[ASTNode]) -> Tuple[ASTNode, ...]:
+        return tuple(self.optimize_statements(body))
+
+    # private method to optimize a single statement, which can become any number of statements
+    # (an if statement with a constant condition becomes the statements of the branch that is taken)
+    def _optimize_statement(self, node: ASTNode) -> List[ASTNode]:
+        if isinstance(node, IfStatement):
+            return self._optimize_if_statement(node)
+
+        elif isinstance(node, WhileLoop):
+            condition = self._optimize_expression(node.condition)
+            is_constant, value = self._constant_value(condition)
+            if is_constant and not value:
+                return []  # the loop never runs
+
+            return [WhileLoop(condition, self._optimize_body(node.body), line=node.line)]
+
+        elif isinstance(node, ForLoop):
+            iterable = self._optimize_expression(node.iterable)
+            return [ForLoop(node.variable, iterable, self._optimize_body(node.body), line=node.line)]
+
+        elif isinstance(node, FunctionDef):
+            return [FunctionDef(node.name, node.params, self._optimize_body(node.body), line=node.line)]
+
+        elif isinstance(node, LazyFunctionDef):
+            return [node]  # its body is optimized once it has been parsed, when it is first called
+
+        elif isinstance(node, Assignment):
+            return [Assignment(node.name, self._optimize_expression(node.value), line=node.line)]
+
+        elif isinstance(node, PrintStatement):
+            return [PrintStatement(self._optimize_expression(node.value), line=node.line)]
+
+        elif isinstance(node, Return):
+            return [Return(self._optimize_expression(node.value) if node.value else node.value, line=node.line)]
+
+        # anything else is an expression used as a statement
+        return [self._optimize_expression(node)]
+
+    # private method to optimize an if statement, dropping branches that can never be taken
+    def _optimize_if_statement(self, node: IfStatement) -> List[ASTNode]:
+        clauses = [(node.condition, node.then_body), *node.elif_clauses]
+        else_body = node.else_body
+
+        kept_clauses = []
+        for condition, body in clauses:
+            condition = self._optimize_expression(condition)
+            is_constant, value = self._constant_value(condition)
+
+            if not is_constant:
+                kept_clauses.append((condition, self._optimize_body(body)))
+            elif value:
+                # this branch is always taken if it is reached, so it acts as the else branch
+                else_body = body
+                break
+            # a branch whose condition is always false is never taken, so it is dropped
+
+        if else_body is not None:
+            else_body = self._optimize_body(else_body)
+
+        # if no branch is left to choose between, the else branch (if there is one) is always run
+        if not kept_clauses:
+            return list(else_body or ())
+
+        (condition, then_body), *elif_clauses = kept_clauses
+        return [IfStatement(condition, then_body, tuple(elif_clauses), else_body, line=node.line)]
+
+    # private method to optimize an expression, folding parts of it that are constant
+    def _optimize_expression(self, node: ASTNode) -> ASTNode:
+        if isinstance(node, (BinaryOp, ComparisonOp)):
+            node = type(node)(
+                self._optimize_expression(node.left),
+                node.operator,
+                self._optimize_expression(node.right),
+                line=node.line,
+            )
+            if self._is_constant(node.left) and self._is_constant(node.right) and not self._is_long_repetition(node):
+                return self._fold(node)
+            return node
+
+        elif isinstance(node, LogicalOp):
+            left = self._optimize_expression(node.left)
+            right = self._optimize_expression(node.right)
+            node = LogicalOp(left, node.operator, right, node.op_type, line=node.line)
+
+            # the right side is only worth folding in if it is constant, or never runs
+            is_constant, value = self._constant_value(left)
+            if is_constant and (self._is_constant(right) or bool(value) == (node.op_type == "or")):
+                return self._fold(node)
+            return node
+
+        elif isinstance(node, UnaryOp):
+            node = UnaryOp(node.operator, self._optimize_expression(node.operand), line=node.line)
+            if self._is_constant(node.operand):
+                return self._fold(node)
+            return node
+
+        elif isinstance(node, FunctionCall):
+            return FunctionCall(node.name, tuple(self._optimize_expression(arg) for arg in node.args), line=node.line)
+
+        return node  # literals and identifiers can't be made any simpler
+
+    # private method to work out a constant expression, returning a literal with its value
+    # (expressions that raise an error are left alone, so the error still happens at runtime)
+    def _fold(self, node: ASTNode) -> ASTNode:
+        try:
+            value = self.evaluator.evaluate(node)
+        except Exception:
+            return node
+
+        literal = self._literal(value)
+        return node if literal is None else literal
+
+    # private method to make the literal node for a value, or None if it has no literal
+    def _literal(self, value: Any) -> Optional[ASTNode]:
+        if isinstance(value, bool):  # (bool is a subclass of int, so it is checked first)
+            return BooleanLiteral(value)
+        if isinstance(value, int):
+            return IntegerLiteral(value)
+        if isinstance(value, float):
+            return NumberLiteral(value)
+        if isinstance(value, str) and len(value) <= MAX_FOLDED_STRING_LENGTH:
+            return StringLiteral(value)
+        return None
+
+    # private method to check if a constant operation repeats a string into one too long to fold (working it out
+    # could take a lot of time and memory, for a string that would be left to be built at runtime anyway)
+    def _is_long_repetition(self, node: ASTNode) -> bool:
+        if node.operator != "*":
+            return False
+
+        left, right = node.left.value, node.right.value
+        if isinstance(left, str) and isinstance(right, int):
+            return len(left) * right > MAX_FOLDED_STRING_LENGTH
+        if isinstance(right, str) and isinstance(left, int):
+            return len(right) * left > MAX_FOLDED_STRING_LENGTH
+        return False
+
+    # private method to check if a node is a literal
+    def _is_constant(self, node: ASTNode) -> bool:
+        return isinstance(node, (NumberLiteral, IntegerLiteral, StringLiteral, BooleanLiteral))
+
+    # private method to get the value of a node if it is a literal, as an (is constant, value) pair
+    def _constant_value(self, node: ASTNode) -> Tuple[bool, Any]:
+        if self._is_constant(node):
+            return True, node.value
+        return False, None
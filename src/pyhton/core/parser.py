@@ -1,5 +1,6 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
 from blessed import Terminal
 
 from pyhton.core.lexer import Token, TokenType
@@ -8,127 +9,194 @@ term = Terminal()
 
 
 # base node
-@dataclass
+# nodes are immutable and have slots instead of a __dict__, which makes them smaller and faster to read,
+# and lets the parser share a single node between every occurrence of the same leaf (see Parser._leaf)
+# every node except the shared leaves records the source line it is on, for error messages; the line is not
+# compared, so the same code parsed from different places still gives equal trees
+@dataclass(frozen=True, slots=True)
 class ASTNode:
     pass
 
 
 # expresions (things that evaluate to values)
 # comparisons can have left and right operands which are recursively ASTNodes
-@dataclass
+# a number written with a decimal point is a float, and one without is an integer, which is exact however big it gets
+@dataclass(frozen=True, slots=True)
 class NumberLiteral(ASTNode):
     value: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class IntegerLiteral(ASTNode):
+    value: int
+
+
+@dataclass(frozen=True, slots=True)
 class StringLiteral(ASTNode):
     value: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BooleanLiteral(ASTNode):
     value: bool
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Identifier(ASTNode):
     name: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BinaryOp(ASTNode):
     left: ASTNode
     operator: str
     right: ASTNode
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ComparisonOp(ASTNode):
     left: ASTNode
     operator: str
     right: ASTNode
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LogicalOp(ASTNode):
     left: ASTNode
     operator: str
     right: ASTNode
     op_type: str  # "and" or "or"
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class UnaryOp(ASTNode):
     operator: str
     operand: ASTNode
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class IfStatement(ASTNode):
     condition: ASTNode
-    then_body: List[ASTNode]
-    elif_clauses: List[tuple[ASTNode, List[ASTNode]]]  # (condition, body) pairs
-    else_body: Optional[List[ASTNode]]
+    then_body: Tuple[ASTNode, ...]
+    elif_clauses: Tuple[Tuple[ASTNode, Tuple[ASTNode, ...]], ...]  # (condition, body) pairs
+    else_body: Optional[Tuple[ASTNode, ...]]
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ForLoop(ASTNode):
     variable: str
     iterable: ASTNode
-    body: List[ASTNode]
+    body: Tuple[ASTNode, ...]
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WhileLoop(ASTNode):
     condition: ASTNode
-    body: List[ASTNode]
+    body: Tuple[ASTNode, ...]
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FunctionCall(ASTNode):
     name: str
-    args: List[ASTNode]
+    args: Tuple[ASTNode, ...]
+    line: int = field(default=0, compare=False, repr=False)
 
 
 # statements (things that do actions)
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Assignment(ASTNode):
     name: str
     value: ASTNode
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FunctionDef(ASTNode):
     name: str
-    params: List[str]
-    body: List[ASTNode]
+    params: Tuple[str, ...]
+    body: Tuple[ASTNode, ...]
+    line: int = field(default=0, compare=False, repr=False)
+
+
+# a function whose body has only been skipped over, by a parser with lazy_functions set
+# the body is parsed from its tokens (which end with the closing endfunc) the first time the function is called
+@dataclass(frozen=True, slots=True)
+class LazyFunctionDef(ASTNode):
+    name: str
+    params: Tuple[str, ...]
+    body_tokens: Tuple[Token, ...] = field(repr=False)
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Return(ASTNode):
     value: Optional[ASTNode]
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PrintStatement(ASTNode):
     value: ASTNode
+    line: int = field(default=0, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Program(ASTNode):
-    statements: List[ASTNode]
+    statements: Tuple[ASTNode, ...]
+
+
+# binary operators, with their precedence (higher binds tighter) and how to make their node
+# logical or binds loosest, then and, equality, comparisons, addition and multiplication
+BINARY_OPERATORS: Dict[TokenType, Tuple[int, Callable[[ASTNode, str, ASTNode], ASTNode]]] = {
+    TokenType.OR: (1, partial(LogicalOp, op_type="or")),
+    TokenType.AND: (2, partial(LogicalOp, op_type="and")),
+    TokenType.EQUALS: (3, ComparisonOp),
+    TokenType.NOT_EQUALS: (3, ComparisonOp),
+    TokenType.GREATER_THAN: (4, ComparisonOp),
+    TokenType.GREATER_EQUAL: (4, ComparisonOp),
+    TokenType.LESS_THAN: (4, ComparisonOp),
+    TokenType.LESS_EQUAL: (4, ComparisonOp),
+    TokenType.PLUS: (5, BinaryOp),
+    TokenType.MINUS: (5, BinaryOp),
+    TokenType.MULTIPLY: (6, BinaryOp),
+    TokenType.DIVIDE: (6, BinaryOp),
+}
 
 
 # the parser takes a list of tokens and produces an AST (Abstract Syntax Tree)
+# the tokens can also come from a generator: the parser only ever looks at the current and previous token,
+# so it never needs the whole token list in memory
+# with lazy_functions set, function bodies are only scanned for their closing endfunc and kept as tokens, so a
+# large library only pays for parsing the functions that are actually called (see LazyFunctionDef)
 class Parser:
-    def __init__(self, tokens: List[Token]):
-        self.tokens = tokens
-        self.pos = 0
+    def __init__(self, tokens: Iterable[Token], lazy_functions: bool = False):
+        self.tokens = iter(tokens)
+        self.pos = 0  # number of tokens consumed so far
+        self.lazy_functions = lazy_functions
+
+        self._current: Token = next(self.tokens, None) or Token(TokenType.EOF, "", 1, 1)
+        self._previous_token: Optional[Token] = None
+
+        # leaf nodes made so far, so each distinct leaf is only made once
+        self._leaves: Dict[tuple, ASTNode] = {}
 
     # parse the tokens into an AST
     def parse(self) -> Program:
-        statements = []
+        return Program(tuple(self.iter_statements()))  # return the program with all statements
+
+    # parse the body of a lazily parsed function, from the tokens of a LazyFunctionDef
+    def parse_function_body(self) -> Tuple[ASTNode, ...]:
+        return self._function_body()
 
+    # parse the tokens one top-level statement at a time, so each can be used as soon as it is parsed
+    def iter_statements(self) -> Iterator[ASTNode]:
         # loop through the tokens until the end is reached
         while not self._is_at_end():
             # skip newlines
@@ -139,31 +207,32 @@ class Parser:
             stmt = self._statement()  # parse a single statement
 
             if stmt:
-                statements.append(stmt)  # if a statement is found, append it to the list
-
-        return Program(statements)  # return the program with all statements
+                yield stmt  # if a statement is found, hand it over
 
-    # private method to determine if the end of the tokens list is reached
+    # private method to determine if the end of the tokens is reached
     def _is_at_end(self) -> bool:
-        return self.pos >= len(self.tokens) or self._current_token().type == TokenType.EOF
+        return self._current.type == TokenType.EOF
 
     # private method to get the current token
     def _current_token(self) -> Token:
-        if self.pos >= len(self.tokens):
-            return self.tokens[-1]  # return EOF token if the position is out of bounds
-
-        return self.tokens[self.pos]  # return the current token
+        return self._current
 
     # private method to advance to the next token
     def _advance(self) -> Token:
         if not self._is_at_end():
-            self.pos = self.pos + 1  # if not at the end, move to the next token
+            # if not at the end, move to the next token
+            # (if the tokens run out without an EOF token, act as if there was one after the last token)
+            self._previous_token = self._current
+            self._current = next(self.tokens, None) or Token(
+                TokenType.EOF, "", self._current.line, self._current.column
+            )
+            self.pos = self.pos + 1
 
         return self._previous()  # return the previous token (as there is no next token)
 
     # private method to get the previous token
     def _previous(self) -> Token:
-        return self.tokens[self.pos - 1]
+        return self._previous_token
 
     # private method to check if the current token matches a specific type
     def _check(self, token_type: TokenType) -> bool:
@@ -182,22 +251,24 @@ class Parser:
 
     # private method to parse a statement
     def _statement(self) -> Optional[ASTNode]:
+        line = self._current.line  # the line the statement starts on
+
         if self._match(TokenType.IF):
-            return self._if_statement()
+            return self._if_statement(line)
         if self._match(TokenType.FOR):
-            return self._for_loop()
+            return self._for_loop(line)
         elif self._match(TokenType.WHILE):
-            return self._while_loop()
+            return self._while_loop(line)
         elif self._match(TokenType.DEF):
-            return self._function_def()
+            return self._function_def(line)
         elif self._match(TokenType.RETURN):
-            return self._return_statement()
+            return self._return_statement(line)
         elif self._match(TokenType.PRINT):
-            return self._print_statement()
+            return self._print_statement(line)
         else:
-            return self._assignment_or_expression()
+            return self._assignment_or_expression(line)
 
-    def _if_statement(self) -> IfStatement:
+    def _if_statement(self, line: int) -> IfStatement:
         condition = self._expression()
         self._advance()  # skip the :
 
@@ -244,7 +315,7 @@ class Parser:
                 if stmt:
                     elif_body.append(stmt)
 
-            elif_clauses.append((elif_condition, elif_body))
+            elif_clauses.append((elif_condition, tuple(elif_body)))
 
         # parse else clause
         else_body = None
@@ -267,10 +338,13 @@ class Parser:
         # expect and consume the endif token
         self._consume(TokenType.ENDIF, "Expected 'endif' to close if statement")
 
-        return IfStatement(condition, then_body, elif_clauses, else_body)
+        if else_body is not None:
+            else_body = tuple(else_body)
+
+        return IfStatement(condition, tuple(then_body), tuple(elif_clauses), else_body, line=line)
 
     # private method to parse a for loop
-    def _for_loop(self) -> ForLoop:
+    def _for_loop(self, line: int) -> ForLoop:
         variable_token = self._consume(TokenType.IDENTIFIER, "Expected variable name after 'for'")
         variable = variable_token.value  # extract the variable name
 
@@ -296,10 +370,12 @@ class Parser:
         # parse the ENDFOR token
         self._consume(TokenType.ENDFOR, "Expected 'endfor' to close for loop")
 
-        return ForLoop(variable, iterable, body)  # return the for loop with its variable, iterable, and body
+        return ForLoop(
+            variable, iterable, tuple(body), line=line
+        )  # return the for loop with its variable, iterable, and body
 
     # private method to parse a while loop
-    def _while_loop(self) -> WhileLoop:
+    def _while_loop(self, line: int) -> WhileLoop:
         condition = self._expression()
 
         self._consume(TokenType.COLON, "Expected ':' after while loop condition")
@@ -321,7 +397,7 @@ class Parser:
         # parse the ENDWHILE token
         self._consume(TokenType.ENDWHILE, "Expected 'endwhile' to close while loop")
 
-        return WhileLoop(condition, body)  # return the while loop with its condition and body
+        return WhileLoop(condition, tuple(body), line=line)  # return the while loop with its condition and body
 
     # private method to consume a token of a specific type, raising an error if it doesn't match
     def _consume(self, token_type: TokenType, error_message: str) -> Token:
@@ -331,7 +407,7 @@ class Parser:
         raise Exception(f"{error_message}, got {self._current_token()}")  # raise an error if the token doesn't match
 
     # private method to parse a function definition
-    def _function_def(self) -> FunctionDef:
+    def _function_def(self, line: int) -> Union[FunctionDef, LazyFunctionDef]:
         name = self._current_token().value  # extract the function name
         self._consume(TokenType.IDENTIFIER, "Expected function name after 'def'")
         self._consume(TokenType.LPAREN, "Expected '(' after function name")
@@ -348,6 +424,15 @@ class Parser:
         self._consume(TokenType.RPAREN, "Expected ')' after function parameters")
         self._consume(TokenType.COLON, "Expected ':' after function parameters")
 
+        if self.lazy_functions:
+            return LazyFunctionDef(name, tuple(params), self._skip_function_body(), line=line)
+
+        return FunctionDef(
+            name, tuple(params), self._function_body(), line=line
+        )  # return the function definition with its name, parameters, and body statements
+
+    # private method to parse the statements of a function body, up to and including its endfunc
+    def _function_body(self) -> Tuple[ASTNode, ...]:
         while self._match(TokenType.NEWLINE):
             pass
 
@@ -366,138 +451,116 @@ class Parser:
         # consume the endfunc token
         self._consume(TokenType.ENDFUNC, "Expected 'endfunc' to close function definition")
 
-        return FunctionDef(
-            name, params, body
-        )  # return the function definition with its name, parameters, and body statements
+        return tuple(body)
+
+    # private method to skip over a function body without parsing it, returning its tokens up to and including
+    # the matching endfunc (functions defined inside it are counted, so their endfuncs are skipped too)
+    def _skip_function_body(self) -> Tuple[Token, ...]:
+        tokens = []
+        depth = 0
+        while not self._is_at_end():
+            token = self._advance()
+            tokens.append(token)
+
+            if token.type == TokenType.DEF:
+                depth = depth + 1
+            elif token.type == TokenType.ENDFUNC:
+                if depth == 0:
+                    return tuple(tokens)
+                depth = depth - 1
+
+        # the file ended before the function did, which is the same error a full parse reports
+        self._consume(TokenType.ENDFUNC, "Expected 'endfunc' to close function definition")
 
     # private method to parse a return statement
-    def _return_statement(self) -> Return:
+    def _return_statement(self, line: int) -> Return:
         value = None
 
         # skip the return keyword
         if not self._check(TokenType.NEWLINE) and not self._is_at_end():
             value = self._expression()
 
-        return Return(value)  # return a return statement with the value (if any)
+        return Return(value, line=line)  # return a return statement with the value (if any)
 
     # private method to parse a print statement
-    def _print_statement(self) -> PrintStatement:
+    def _print_statement(self, line: int) -> PrintStatement:
         self._consume(TokenType.LPAREN, "Expected '(' after print")
         value = self._expression()
         self._consume(TokenType.RPAREN, "Expected ')' after print argument")
 
-        return PrintStatement(value)  # return a print statement with the value to be printed
+        return PrintStatement(value, line=line)  # return a print statement with the value to be printed
 
     # private method to parse an assignment or an expression
-    def _assignment_or_expression(self) -> Optional[ASTNode]:
+    def _assignment_or_expression(self, line: int) -> Optional[ASTNode]:
         expr = self._expression()
 
         # if the next token is an assignment operator, create an Assignment node
         if self._match(TokenType.ASSIGN):
             if isinstance(expr, Identifier):
                 value = self._expression()
-                return Assignment(expr.name, value)
+                return Assignment(expr.name, value, line=line)
 
         return expr  # else, return the expression as is
 
-    # private method to parse an expression
-    def _expression(self) -> ASTNode:
-        return self._logical_or()  # start with logical OR, which has the lowest precedence
-
-    # private method to handle local OR expressions
-    def _logical_or(self) -> ASTNode:
-        expr = self._logical_and()
-
-        # while the next token is an OR, create a LogicalOp node
-        while self._match(TokenType.OR):
-            operator = self._previous().value
-            right = self._logical_and()
-            expr = LogicalOp(expr, operator, right, "or")
-
-        return expr
-
-    # private method to handle logical AND expressions
-    def _logical_and(self) -> ASTNode:
-        expr = self._equality()
-
-        # while the next token is an AND, create a LogicalOp node
-        while self._match(TokenType.AND):
-            operator = self._previous().value
-            right = self._equality()
-            expr = LogicalOp(expr, operator, right, "and")
-
-        return expr
-
-    # private method to handle equality comparisons
-    def _equality(self) -> ASTNode:
-        expr = self._comparison()
-
-        # while the next token is an EQUALS or NOT_EQUALS, create a ComparisonOp node
-        while self._match(TokenType.EQUALS, TokenType.NOT_EQUALS):
-            operator = self._previous().value
-            right = self._comparison()
-            expr = ComparisonOp(expr, operator, right)
-
-        return expr
-
-    # private method to handle numerical comparisons
-    def _comparison(self) -> ASTNode:
-        expr = self._addition()
+    # private method to parse an expression, using precedence climbing
+    # operands are joined by operators in a loop, and the right operand of an operator is parsed with a higher
+    # minimum precedence so tighter operators are grouped into it first, which makes every operator left
+    # associative and means the recursion depth depends on the number of precedence levels, not the expression
+    def _expression(self, min_precedence: int = 1) -> ASTNode:
+        expr = self._unary()
+
+        # while the next token is an operator that binds at least as tightly as min_precedence, apply it
+        while True:
+            operator_entry = BINARY_OPERATORS.get(self._current.type)
+            if operator_entry is None or operator_entry[0] < min_precedence:
+                return expr
+
+            precedence, make_node = operator_entry
+            operator = self._advance()
+            right = self._expression(precedence + 1)
+            expr = make_node(expr, operator.value, right, line=operator.line)
+
+    # private method to handle unary expressions
+    # (a run of nots is collected in a loop and applied afterwards, so it never recurses)
+    def _unary(self) -> ASTNode:
+        operators = []
+        while self._match(TokenType.NOT):
+            operators.append(self._previous())
 
-        # while the next token is a comparison operator, create a ComparisonOp node
-        while self._match(TokenType.GREATER_THAN, TokenType.GREATER_EQUAL, TokenType.LESS_THAN, TokenType.LESS_EQUAL):
-            operator = self._previous().value
-            right = self._addition()
-            expr = ComparisonOp(expr, operator, right)
+        expr = self._primary()
+        for operator in reversed(operators):
+            expr = UnaryOp(operator.value, expr, line=operator.line)
 
         return expr
 
-    # private methods to handle different levels of precedence in expressions
-    def _addition(self) -> ASTNode:
-        expr = self._multiplication()  # start with multiplication, which has higher precedence
-
-        # if the next token is a + or -, create a BinaryOp node
-        while self._match(TokenType.PLUS, TokenType.MINUS):
-            operator = self._previous().value
-            right = self._multiplication()
-            expr = BinaryOp(expr, operator, right)
-
-        return expr  # return the expression with all additions and subtractions applied
-
-    def _multiplication(self) -> ASTNode:
-        expr = self._unary()  # start with the primary expression (literals, identifiers, etc.)
-
-        # if the next token is a * or /, create a BinaryOp node
-        while self._match(TokenType.MULTIPLY, TokenType.DIVIDE):
-            operator = self._previous().value
-            right = self._unary()
-            expr = BinaryOp(expr, operator, right)
-
-        return expr  # return the expression with all multiplications and divisions applied
-
-    def _unary(self) -> ASTNode:
-        if self._match(TokenType.NOT):
-            operator = self._previous().value
-            operand = self._unary()
-            return UnaryOp(operator, operand)
-
-        return self._primary()
+    # private method to make a leaf node, sharing one node between every occurrence of the same leaf
+    # (the type of the value is part of the key, so that for example 1.0 and True never share a node)
+    def _leaf(self, node_type: type, value) -> ASTNode:
+        key = (node_type, type(value), value)
+        node = self._leaves.get(key)
+        if node is None:
+            node = node_type(value)
+            self._leaves[key] = node
+        return node
 
     # private method to handle primary expressions (literals, identifiers, function calls, etc.)
     def _primary(self) -> ASTNode:
         if self._match(TokenType.NUMBER):
-            return NumberLiteral(float(self._previous().value))
+            text = self._previous().value
+            if "." in text:
+                return self._leaf(NumberLiteral, float(text))
+            return self._leaf(IntegerLiteral, int(text))
 
         if self._match(TokenType.STRING):
-            return StringLiteral(self._previous().value)
+            return self._leaf(StringLiteral, self._previous().value)
 
         if self._match(TokenType.BOOLEAN):
             token = self._previous()
             is_true = token.original_word == "True"
-            return BooleanLiteral(is_true)
+            return self._leaf(BooleanLiteral, is_true)
 
         if self._match(TokenType.RANGE):
-            name = self._previous().value
+            line = self._previous().line
 
             # range must be followed by parentheses
             if self._match(TokenType.LPAREN):
@@ -510,12 +573,13 @@ class Parser:
                         break
 
                 self._consume(TokenType.RPAREN, "Expected ')' after range arguments")
-                return FunctionCall("range", args)  # return a function call node with name "range"
+                return FunctionCall("range", tuple(args), line=line)  # return a function call node with name "range"
 
             raise Exception("Expected '(' after range")
 
         if self._match(TokenType.IDENTIFIER):
             name = self._previous().value
+            line = self._previous().line
 
             # check if it is a function call
             if self._match(TokenType.LPAREN):
@@ -528,9 +592,11 @@ class Parser:
                         break
 
                 self._consume(TokenType.RPAREN, "Expected ')' after function arguments")
-                return FunctionCall(name, args)  # return a function call node with the name and arguments
+                return FunctionCall(
+                    name, tuple(args), line=line
+                )  # return a function call node with the name and arguments
 
-            return Identifier(name)  # if it is just an identifier, return it
+            return self._leaf(Identifier, name)  # if it is just an identifier, return it
 
         # if the next token is a (, parse the expression inside parentheses
         if self._match(TokenType.LPAREN):
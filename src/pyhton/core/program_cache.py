@@ -0,0 +1,90 @@
+import contextlib
+import hashlib
+import mmap
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Optional, Union
+
+from pyhton import __version__
+from pyhton.core.parser import Program
+from pyhton.language.python_words import ALL_WORDS
+from pyhton.language.typo_cache import typo_tables_fingerprint
+from pyhton.language.typo_trie import TYPO_RULES
+
+# bump this whenever the lexer, the parser, the optimizer or the AST classes change, so programs cached by an
+# older version are parsed again
+PROGRAM_CACHE_FORMAT_VERSION = 4
+
+# the first bytes of every .ypc file
+PROGRAM_CACHE_MAGIC = b"YPC\x00"
+
+# everything apart from the source code that a parsed program depends on, worked out once per process
+_environment_key: Optional[bytes] = None
+
+
+# the .ypc file a program is cached in: in a __pycache__ directory next to the source file, like a .pyc file
+def cache_file_path(filename: str) -> Path:
+    path = Path(filename)
+    return path.parent / "__pycache__" / f"{path.stem}.pyhton-{__version__}.ypc"
+
+
+# key for the parsed program of some source code, which changes whenever the source code changes or the
+# program would be parsed differently: a new interpreter or python version, or a different typo vocabulary
+def program_cache_key(source: Union[str, bytes, mmap.mmap]) -> bytes:
+    global _environment_key
+    if _environment_key is None:
+        environment = (
+            PROGRAM_CACHE_FORMAT_VERSION,
+            __version__,
+            sys.implementation.cache_tag,
+            typo_tables_fingerprint(ALL_WORDS, "index", TYPO_RULES),
+        )
+        _environment_key = repr(environment).encode("utf-8")
+
+    if isinstance(source, str):
+        source = source.encode("utf-8", "surrogatepass")
+
+    key = hashlib.sha256(_environment_key)
+    key.update(source)
+    return key.digest()
+
+
+# load the program cached for a source file, returning None if there is none or it is stale
+def load_cached_program(filename: str, key: bytes) -> Optional[Program]:
+    try:
+        data = cache_file_path(filename).read_bytes()
+    except OSError:
+        return None
+
+    header = PROGRAM_CACHE_MAGIC + key
+    if not data.startswith(header):
+        return None  # not a .ypc file, or made from different source code or by a different interpreter
+
+    try:
+        program = pickle.loads(memoryview(data)[len(header) :])
+    except Exception:
+        return None  # a corrupt cache file can fail to unpickle in many ways, and is simply rebuilt
+
+    return program if isinstance(program, Program) else None
+
+
+# save the parsed program of a source file, so later runs can skip lexing and parsing it
+def store_cached_program(filename: str, key: bytes, program: Program):
+    cache_file = cache_file_path(filename)
+    temporary_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+
+    try:
+        data = pickle.dumps(program, protocol=pickle.HIGHEST_PROTOCOL)
+    except RecursionError:
+        return  # very deeply nested expressions can't be pickled, so they are parsed on every run
+
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temporary_file.write_bytes(PROGRAM_CACHE_MAGIC + key + data)
+        os.replace(temporary_file, cache_file)  # atomic, so other processes never see a half written file
+    except OSError:
+        # the cache is only an optimisation, so an unwritable directory is not an error
+        with contextlib.suppress(OSError):
+            temporary_file.unlink(missing_ok=True)
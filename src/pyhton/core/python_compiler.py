@@ -0,0 +1,554 @@
+import ast
+from types import FunctionType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from pyhton.core.interpreter import MISSING, Interpreter, PyhtonFunction, ReturnException
+from pyhton.core.parser import (
+    Assignment,
+    ASTNode,
+    BinaryOp,
+    BooleanLiteral,
+    ComparisonOp,
+    ForLoop,
+    FunctionCall,
+    FunctionDef,
+    Identifier,
+    IfStatement,
+    IntegerLiteral,
+    LazyFunctionDef,
+    LogicalOp,
+    NumberLiteral,
+    PrintStatement,
+    Program,
+    Return,
+    StringLiteral,
+    UnaryOp,
+    WhileLoop,
+)
+
+# the file name generated code is compiled with, so its frames can be picked out of a traceback
+SOURCE_NAME = "<pyhton>"
+
+# the name of the Python function that runs the compiled statements
+ENTRY_NAME = "_program"
+
+# the Python operator for each operator (+ is handled on its own, as it joins strings)
+BINARY_OPERATOR_NODES = {
+    "-": ast.Sub,
+    "*": ast.Mult,
+    "/": ast.Div,
+}
+COMPARISON_OPERATOR_NODES = {
+    "==": ast.Eq,
+    "!=": ast.NotEq,
+    "<": ast.Lt,
+    "<=": ast.LtE,
+    ">": ast.Gt,
+    ">=": ast.GtE,
+}
+
+
+# the global variables, which raise the interpreter's error when a variable that is not set is read
+class VariableTable(dict):
+    def __missing__(self, name: str):
+        raise Exception(f"Unknown variable: {name}")
+
+
+# the functions, by name, which raise the interpreter's error when a function that is not defined is called
+class FunctionTable(dict):
+    def __missing__(self, name: str):
+        raise Exception(f"Unknown function: {name}")
+
+
+# a lazily parsed function, which has its body parsed and compiled by compile_body the first time it is called
+class LazyFunction(PyhtonFunction):
+    def __init__(self, node: LazyFunctionDef, compile_body: Callable[["LazyFunction"], Callable]):
+        super().__init__(node.name, node.params, None, node.body_tokens)
+        self.line = node.line
+        self.compile_body = compile_body
+        self.compiled: Optional[Callable] = None
+
+    def __call__(self, *args):
+        if self.compiled is None:
+            self.compiled = self.compile_body(self)
+        return self.compiled(*args)
+
+
+# the functions to call for each function name and number of arguments (as "name/count", the key generated code
+# uses), looked up from the functions the first time, so each call only has to look up its key
+# a function that takes a different number of arguments is replaced by one that raises the interpreter's error,
+# which is only called once the arguments have been worked out, as in the tree walker
+class CallTable(dict):
+    def __init__(self, functions: FunctionTable):
+        super().__init__()
+        self.functions = functions
+
+    def __missing__(self, key: str) -> Callable:
+        name, count = key.rsplit("/", 1)
+        function = self.functions[name]
+
+        if isinstance(function, FunctionType):
+            param_count = function.__code__.co_argcount
+        elif isinstance(function, PyhtonFunction):
+            param_count = len(function.params)
+        else:
+            param_count = None  # built-in functions check their own arguments
+
+        if param_count is not None and param_count != int(count):
+
+            def wrong_argument_count(*args):
+                raise Exception(f"Function {name} expects {param_count} arguments, got {len(args)}")
+
+            return wrong_argument_count
+
+        self[key] = function
+        return function
+
+
+# check that a for loop can loop over a value, called by generated code
+def check_iterable(value: Any) -> Any:
+    if not isinstance(value, (str, range)):
+        raise Exception(f"For loop iterable must be a string or range, got {type(value).__name__}")
+    return value
+
+
+# raise an error once the operands it is about have been worked out, called by generated code
+def raise_error(message: str, *operands: Any):
+    raise Exception(message)
+
+
+# the line of the program an error happened on, from the innermost frame of generated code in its traceback
+# (None if the error did not happen in generated code, or on a line that is not known)
+def error_line(error: BaseException) -> Optional[int]:
+    line = None
+    traceback = error.__traceback__
+    while traceback is not None:
+        if traceback.tb_frame.f_code.co_filename == SOURCE_NAME and traceback.tb_lineno:
+            line = traceback.tb_lineno
+        traceback = traceback.tb_next
+    return line
+
+
+# lowers pyhton AST into a Python ast.Module, to be compiled into CPython bytecode
+# every pyhton function becomes a Python function at the top of the module, and the statements being run
+# become the body of one more function, so that everything runs on Python's fast locals:
+# - global variables are items of _G, which raises pyhton's error when one is missing
+# - functions are defined with _define, and called through _C, which checks their argument count once instead
+#   of on every call, so they are plain Python functions that take exactly their parameters
+# - a variable that a function sets is a Python local, which holds MISSING while it is not set, so reading it
+#   falls back to the global variable just like the tree walker does
+# - + is only joined as strings if either side is a string, and everything else is a plain Python operator
+# every statement and operator keeps the line of the .yp file it came from, so tracebacks point at the program
+class PythonCompiler:
+    def __init__(self):
+        self.function_defs: List[ast.stmt] = []  # the Python functions made from pyhton functions
+        self.lazy_functions: Dict[str, LazyFunctionDef] = {}  # lazily parsed functions, by the name code uses
+
+        self._function_count = 0
+        self._temporary_count = 0
+
+        # the names of the variables of the function being compiled (None at the top level), and those of
+        # them that are always set (parameters that are never loop variables)
+        self._local_names: Optional[Set[str]] = None
+        self._bound_names: Set[str] = set()
+
+    # compile a program into a module that defines a function called ENTRY_NAME, which runs it
+    def compile_program(self, program: Program) -> ast.Module:
+        return self.compile_statements(program.statements)
+
+    # compile statements into a module that defines a function called ENTRY_NAME, which runs them
+    def compile_statements(self, statements: Iterable[ASTNode]) -> ast.Module:
+        body = self._compile_body(statements)
+        entry = ast.FunctionDef(ENTRY_NAME, ast.arguments(), body, [], lineno=1)
+        return self._module([*self.function_defs, entry])
+
+    # compile a function definition into a module that defines it, returning the module and the name of the
+    # Python function it defines
+    def compile_function(self, node: FunctionDef) -> Tuple[ast.Module, str]:
+        name = self._compile_function_def(node)
+        return self._module(self.function_defs), name
+
+    # compile a single expression, as run at the top level
+    def compile_expression(self, node: ASTNode) -> ast.Expression:
+        return ast.fix_missing_locations(ast.Expression(self._compile_expression(node)))
+
+    # private method to make a module, filling in the locations of nodes that have no line of their own
+    def _module(self, body: List[ast.stmt]) -> ast.Module:
+        return ast.fix_missing_locations(ast.Module(body, []))
+
+    # private method to give a Python node the line of the pyhton node it was made from
+    # (statements without a line of their own are given line 0, so errors in them are not put on a wrong line)
+    def _locate(self, python_node: ast.AST, node: ASTNode, is_statement: bool = False) -> ast.AST:
+        line = getattr(node, "line", 0)  # shared leaves have no line
+        if line or is_statement:
+            python_node.lineno = python_node.end_lineno = line
+            python_node.col_offset = python_node.end_col_offset = 0
+        return python_node
+
+    # private method to make a new temporary variable, local to the function being compiled
+    def _temporary(self) -> str:
+        self._temporary_count = self._temporary_count + 1
+        return f"_t{self._temporary_count}"
+
+    # private method to compile a list of statements (Python needs at least one statement in a block)
+    def _compile_body(self, body: Iterable[ASTNode]) -> List[ast.stmt]:
+        statements = [statement for node in body for statement in self._compile_statement(node)]
+        return statements or [ast.Pass()]
+
+    # private method to compile a statement into the Python statements that run it
+    def _compile_statement(self, node: ASTNode) -> List[ast.stmt]:
+        if isinstance(node, IfStatement):
+            statements = self._compile_if_statement(node)
+
+        elif isinstance(node, ForLoop):
+            statements = self._compile_for_loop(node)
+
+        elif isinstance(node, WhileLoop):
+            statements = [ast.While(self._compile_expression(node.condition), self._compile_body(node.body), [])]
+
+        elif isinstance(node, Assignment):
+            statements = [ast.Assign([self._variable(node.name, ast.Store())], self._compile_expression(node.value))]
+
+        elif isinstance(node, FunctionDef):
+            function = _name(self._compile_function_def(node))
+            statements = [ast.Expr(_call("_define", ast.Constant(node.name), function))]
+
+        elif isinstance(node, LazyFunctionDef):
+            name = f"_lazy{len(self.lazy_functions) + 1}_{node.name}"
+            self.lazy_functions[name] = node
+            statements = [ast.Expr(_call("_define", ast.Constant(node.name), _name(name)))]
+
+        elif isinstance(node, PrintStatement):
+            statements = [ast.Expr(_call("_print", self._compile_expression(node.value)))]
+
+        elif isinstance(node, Return):
+            value = self._compile_expression(node.value) if node.value else ast.Constant(None)
+            if self._local_names is None:
+                # a return outside of a function ends the program
+                statements = [ast.Raise(_call("_ReturnException", value))]
+            else:
+                statements = [ast.Return(value)]
+
+        else:
+            # anything else is an expression used as a statement
+            statements = [ast.Expr(self._compile_expression(node))]
+
+        for statement in statements:
+            self._locate(statement, node, is_statement=True)
+        return statements
+
+    # private method to compile an if statement, with its elif clauses as nested ifs in the else branch
+    def _compile_if_statement(self, node: IfStatement) -> List[ast.stmt]:
+        statements = self._compile_body(node.else_body) if node.else_body else []
+        for condition, body in reversed(((node.condition, node.then_body), *node.elif_clauses)):
+            statements = [ast.If(self._compile_expression(condition), self._compile_body(body), statements)]
+        return statements
+
+    # private method to compile a for loop, which removes its loop variable once it is finished
+    def _compile_for_loop(self, node: ForLoop) -> List[ast.stmt]:
+        iterable = _call("_check_iterable", self._compile_expression(node.iterable))
+        body = self._compile_body(node.body)
+
+        if self._local_names is not None:
+            # a function's variables are gone once it returns or fails, so the variable only needs removing
+            # when the loop finishes
+            variable = _name(_local_name(node.variable), ast.Store())
+            return [ast.For(variable, iterable, body, []), ast.Assign([variable], _name("_M"))]
+
+        # a global loop variable is also removed if the program fails, by the interpreter, from the list of the
+        # loops that are running (the iterable is checked before the loop counts as running)
+        temporary = self._temporary()
+        variable = ast.Constant(node.variable)
+        return [
+            ast.Assign([_name(temporary, ast.Store())], iterable),
+            ast.Expr(_call_method("_loops", "append", variable)),
+            ast.For(self._variable(node.variable, ast.Store()), _name(temporary), body, []),
+            ast.Expr(_call_method("_loops", "pop")),
+            ast.Expr(_call_method("_G", "pop", variable, ast.Constant(None))),
+        ]
+
+    # private method to compile a function definition into a Python function, returning its name
+    def _compile_function_def(self, node: FunctionDef) -> str:
+        self._function_count = self._function_count + 1
+        name = f"_def{self._function_count}_{node.name}"
+
+        # a repeated parameter takes the last of its arguments, so the earlier ones are never read
+        params = []
+        for index, param in enumerate(node.params):
+            is_last = param not in node.params[index + 1 :]
+            params.append(_local_name(param) if is_last and _local_name(param).isidentifier() else f"_param{index}")
+
+        assigned_names: Set[str] = set()
+        loop_variables: Set[str] = set()
+        _collect_assigned_names(node.body, assigned_names, loop_variables)
+        param_names = {param for param in node.params if _local_name(param) in params}
+
+        saved_state = (self._local_names, self._bound_names, self._temporary_count)
+        self._local_names = param_names | assigned_names
+        self._bound_names = param_names - loop_variables
+        self._temporary_count = 0
+        try:
+            body = self._compile_body(node.body)
+        finally:
+            self._local_names, self._bound_names, self._temporary_count = saved_state
+
+        # every variable that is not a parameter starts off as not set
+        unset_names = sorted(assigned_names - param_names)
+        if unset_names:
+            targets = [_name(_local_name(variable), ast.Store()) for variable in unset_names]
+            body.insert(0, self._locate(ast.Assign(targets, _name("_M")), node))
+
+        signature = ast.arguments(args=[ast.arg(param) for param in params])
+        function_def = ast.FunctionDef(name, signature, body, [])
+        self.function_defs.append(self._locate(function_def, node, is_statement=True))
+        return name
+
+    # private method to read or set a variable: a local one if the function being compiled sets it, and
+    # otherwise a global one (read, unless another context is given)
+    def _variable(self, name: str, context: Optional[ast.expr_context] = None) -> ast.expr:
+        if context is None:
+            context = ast.Load()
+
+        if self._local_names is None or name not in self._local_names:
+            return ast.Subscript(_name("_G"), ast.Constant(name), context)
+
+        local = _name(_local_name(name), context)
+        if isinstance(context, ast.Store) or name in self._bound_names:
+            return local
+
+        # a local variable that may not be set yet falls back to the global one
+        is_set = ast.Compare(_name(_local_name(name)), [ast.IsNot()], [_name("_M")])
+        return ast.IfExp(is_set, local, ast.Subscript(_name("_G"), ast.Constant(name), ast.Load()))
+
+    # private method to compile an expression
+    def _compile_expression(self, node: ASTNode) -> ast.expr:
+        if isinstance(node, (NumberLiteral, IntegerLiteral, StringLiteral, BooleanLiteral)):
+            return ast.Constant(node.value)
+
+        elif isinstance(node, Identifier):
+            return self._variable(node.name)
+
+        elif isinstance(node, BinaryOp):
+            expression = self._compile_binary_op(node)
+
+        elif isinstance(node, ComparisonOp):
+            left = self._compile_expression(node.left)
+            right = self._compile_expression(node.right)
+            operator = COMPARISON_OPERATOR_NODES.get(node.operator)
+            if operator is None:
+                expression = _call("_raise_error", ast.Constant(f"Unknown comparison operator: {node.operator}"))
+                expression.args.extend((left, right))
+            else:
+                expression = ast.Compare(left, [operator()], [right])
+
+        elif isinstance(node, LogicalOp):
+            left = self._compile_expression(node.left)
+            right = _call("_bool", self._compile_expression(node.right))
+            if node.op_type == "or":
+                expression = ast.IfExp(left, ast.Constant(True), right)
+            else:
+                expression = ast.IfExp(left, right, ast.Constant(False))
+
+        elif isinstance(node, UnaryOp):
+            expression = ast.UnaryOp(ast.Not(), self._compile_expression(node.operand))
+
+        elif isinstance(node, FunctionCall):
+            args = [self._compile_expression(arg) for arg in node.args]
+            function = ast.Subscript(_name("_C"), ast.Constant(f"{node.name}/{len(args)}"), ast.Load())
+            expression = ast.Call(function, args, [])
+
+        else:
+            # unknown nodes only raise an error if they are actually run, as in the tree walking interpreter
+            expression = _call("_raise_error", ast.Constant(f"Unknown AST node type: {type(node)}"))
+
+        return self._locate(expression, node)
+
+    # private method to compile a binary operation
+    def _compile_binary_op(self, node: BinaryOp) -> ast.expr:
+        left = self._compile_expression(node.left)
+        right = self._compile_expression(node.right)
+
+        if node.operator == "+":
+            return self._compile_add(node, left, right)
+
+        operator = BINARY_OPERATOR_NODES.get(node.operator)
+        if operator is None:
+            return _call("_raise_error", ast.Constant(f"Unknown operator: {node.operator}"), left, right)
+
+        return ast.BinOp(left, operator(), right)
+
+    # private method to compile +, which joins its operands as strings if either of them is a string
+    # each operand is only worked out once, into a temporary variable, before its type is checked; a literal
+    # operand's type is already known, so only the other one is checked
+    def _compile_add(self, node: BinaryOp, left: ast.expr, right: ast.expr) -> ast.expr:
+        if isinstance(node.left, StringLiteral):
+            return ast.BinOp(left, ast.Add(), _call("_str", right))
+        if isinstance(node.right, StringLiteral):
+            return ast.BinOp(_call("_str", left), ast.Add(), right)
+
+        if isinstance(node.left, (NumberLiteral, IntegerLiteral, BooleanLiteral)):
+            other = self._temporary()
+            as_strings = ast.BinOp(ast.Constant(str(node.left.value)), ast.Add(), _name(other))
+            is_string = _is_string(ast.NamedExpr(_name(other, ast.Store()), right))
+            return ast.IfExp(is_string, as_strings, ast.BinOp(left, ast.Add(), _name(other)))
+
+        if isinstance(node.right, (NumberLiteral, IntegerLiteral, BooleanLiteral)):
+            other = self._temporary()
+            as_strings = ast.BinOp(_call("_str", _name(other)), ast.Add(), ast.Constant(str(node.right.value)))
+            is_string = _is_string(ast.NamedExpr(_name(other, ast.Store()), left))
+            return ast.IfExp(is_string, as_strings, ast.BinOp(_name(other), ast.Add(), right))
+
+        # both operands are worked out (in order) before either is checked, so | is used instead of or
+        left_value = self._temporary()
+        right_value = self._temporary()
+        is_string = ast.BinOp(
+            _is_string(ast.NamedExpr(_name(left_value, ast.Store()), left)),
+            ast.BitOr(),
+            _is_string(ast.NamedExpr(_name(right_value, ast.Store()), right)),
+        )
+        as_strings = ast.BinOp(_call("_str", _name(left_value)), ast.Add(), _call("_str", _name(right_value)))
+        return ast.IfExp(is_string, as_strings, ast.BinOp(_name(left_value), ast.Add(), _name(right_value)))
+
+
+# the Python name of a pyhton local variable (prefixed, so it can't clash with the names generated code uses
+# or with Python keywords)
+def _local_name(name: str) -> str:
+    return f"v_{name}"
+
+
+# a Python name node, read unless another context is given
+def _name(name: str, context: Optional[ast.expr_context] = None) -> ast.Name:
+    return ast.Name(name, ast.Load() if context is None else context)
+
+
+# a Python call of a name
+def _call(function: str, *args: ast.expr) -> ast.Call:
+    return ast.Call(_name(function), list(args), [])
+
+
+# a Python call of a method of a name
+def _call_method(owner: str, method: str, *args: ast.expr) -> ast.Call:
+    return ast.Call(ast.Attribute(_name(owner), method, ast.Load()), list(args), [])
+
+
+# a Python check of whether a value is a string
+def _is_string(value: ast.expr) -> ast.expr:
+    return ast.Compare(ast.Attribute(value, "__class__", ast.Load()), [ast.Is()], [_name("_str")])
+
+
+# collect the names of the variables set in a function body, and which of them are loop variables
+# (functions defined inside it have their own variables, so their bodies are not looked at)
+def _collect_assigned_names(body: Iterable[ASTNode], names: Set[str], loop_variables: Set[str]):
+    for node in body:
+        if isinstance(node, Assignment):
+            names.add(node.name)
+        elif isinstance(node, ForLoop):
+            names.add(node.variable)
+            loop_variables.add(node.variable)
+            _collect_assigned_names(node.body, names, loop_variables)
+        elif isinstance(node, WhileLoop):
+            _collect_assigned_names(node.body, names, loop_variables)
+        elif isinstance(node, IfStatement):
+            _collect_assigned_names(node.then_body, names, loop_variables)
+            for _, elif_body in node.elif_clauses:
+                _collect_assigned_names(elif_body, names, loop_variables)
+            _collect_assigned_names(node.else_body or (), names, loop_variables)
+
+
+# an interpreter that translates the AST into Python code (see PythonCompiler), which CPython compiles and runs
+# natively, so pure numeric code runs at close to the speed of the same code written in Python
+# it gives the same results and error messages as the tree walking Interpreter, and errors also record the line
+# of the program they happened on (as pyhton_line)
+# its functions are the Python functions they were compiled into, and local variables live in Python frames
+# instead of locals_stack
+class PythonInterpreter(Interpreter):
+    def __init__(self):
+        super().__init__()
+        self.globals = VariableTable()
+        self.functions = FunctionTable(range=self._call_range)
+        self._calls = CallTable(self.functions)
+
+        # the global variables of the for loops that are running, from the outermost loop in
+        self._loop_variables: List[str] = []
+
+        # the names generated code uses, apart from the functions it defines
+        self._namespace: Dict[str, Any] = {
+            "_G": self.globals,
+            "_C": self._calls,
+            "_M": MISSING,
+            "_loops": self._loop_variables,
+            "_str": str,
+            "_bool": bool,
+            "_print": print,
+            "_define": self._define_function,
+            "_check_iterable": check_iterable,
+            "_raise_error": raise_error,
+            "_ReturnException": ReturnException,
+        }
+
+    # main entry point to interpret a program, compiled as a whole
+    def interpret(self, program: Program):
+        compiler = PythonCompiler()
+        self._run(compiler, compiler.compile_program(program))
+
+    # interpret statements one at a time, compiling each one just before it runs
+    def interpret_statements(self, statements: Iterable[ASTNode]):
+        for statement in statements:
+            compiler = PythonCompiler()
+            self._run(compiler, compiler.compile_statements((statement,)))
+
+    # work out the value of a single expression
+    def evaluate(self, node: ASTNode) -> Any:
+        compiler = PythonCompiler()
+        code = compile(compiler.compile_expression(node), SOURCE_NAME, "eval")
+        return eval(code, self._load(compiler), {})
+
+    # private method to run a module compiled by a compiler
+    def _run(self, compiler: PythonCompiler, module: ast.Module):
+        namespace = self._load(compiler, module)
+        try:
+            namespace[ENTRY_NAME]()
+        except BaseException as error:
+            # the loop variables of the loops that were running are removed, from the innermost loop out
+            while self._loop_variables:
+                self.globals.pop(self._loop_variables.pop(), None)
+
+            if isinstance(error, Exception) and not hasattr(error, "pyhton_line"):
+                error.pyhton_line = error_line(error)
+            raise
+
+    # private method to make the namespace compiled code runs in, running the module (if any) that defines its
+    # functions
+    def _load(self, compiler: PythonCompiler, module: Optional[ast.Module] = None) -> Dict[str, Any]:
+        namespace = dict(self._namespace)
+        for name, node in compiler.lazy_functions.items():
+            namespace[name] = LazyFunction(node, self._compile_lazy_function)
+        if module is not None:
+            exec(compile(module, SOURCE_NAME, "exec"), namespace)
+        return namespace
+
+    # private method to define a function, called by generated code
+    # (a lazily parsed function whose body has already been compiled is defined as the compiled function)
+    def _define_function(self, name: str, function: Callable):
+        if isinstance(function, LazyFunction) and function.compiled is not None:
+            function = function.compiled
+
+        self.functions[name] = function
+        self._calls.clear()  # calls looked up before may now be of a different function
+
+    # private method to parse and compile the body of a lazily parsed function the first time it is called
+    # from then on the compiled function is called directly, as long as the function has not been redefined
+    def _compile_lazy_function(self, function: LazyFunction) -> Callable:
+        body = self._parse_function_body(function)
+
+        compiler = PythonCompiler()
+        module, name = compiler.compile_function(FunctionDef(function.name, function.params, body, line=function.line))
+        compiled = self._load(compiler, module)[name]
+
+        if self.functions.get(function.name) is function:
+            self._define_function(function.name, compiled)
+        return compiled
+
+    # the built-in range function, called with its arguments as Python arguments
+    def _call_range(self, *args):
+        return self._builtin_range(list(args))
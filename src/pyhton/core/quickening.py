@@ -0,0 +1,113 @@
+import operator
+from typing import Any, Callable, Optional
+
+from pyhton.core.parser import ASTNode
+
+# how many times an operation runs the generic way before it is specialized for the types of its operands
+WARMUP = 4
+
+# the most runs an operation waits before specializing again, after its specializations keep failing their guard
+# (the wait doubles each time, so operations whose operand types keep changing soon stay generic)
+MAX_BACKOFF = 1024
+
+# the functions operations are specialized to, for operands whose types don't change what the operator does
+# (+ is the exception: it joins its operands as strings if either is a string, see AdaptiveOperation.specialize)
+OPERATOR_FUNCTIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+# how the types of operands are named in the names of specializations
+TYPE_NAMES = {int: "num", float: "num", str: "str", bool: "bool", type(None): "none"}
+
+
+# join two values as strings, as + does if either of them is a string
+def join_as_strings(left: Any, right: Any) -> str:
+    return str(left) + str(right)
+
+
+# a binary or comparison operation that adapts to the types of its operands while the program runs (like the
+# specializing instructions of PEP 659): after running the generic way a few times, it specializes itself for the
+# types of its operands, keeping the function that works out the result for them, guarded by a check that the
+# operands still have those types, which sends it back to the generic way if they don't
+# the resolver makes these in place of the BinaryOp and ComparisonOp nodes of the code it resolves, and unlike the
+# rest of the AST they change as they run, so each one belongs to a single function body or top-level loop
+class AdaptiveOperation(ASTNode):
+    __slots__ = (
+        "left",
+        "operator",
+        "right",
+        "is_comparison",
+        "line",
+        "left_type",
+        "right_type",
+        "function",
+        "variant",
+        "countdown",
+        "backoff",
+    )
+
+    # changed as it runs, unlike the frozen nodes of the rest of the AST, and compared by identity, as every node
+    # keeps its own specialization
+    __setattr__ = object.__setattr__
+    __delattr__ = object.__delattr__
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __init__(self, left: ASTNode, operator: str, right: ASTNode, is_comparison: bool, line: int = 0):
+        self.left = left
+        self.operator = operator
+        self.right = right
+        self.is_comparison = is_comparison
+        self.line = line
+
+        # the types the operation is specialized for, the function that works it out for them, and the name of the
+        # specialization (such as num+num, for statistics), all None while it runs the generic way
+        self.left_type: Optional[type] = None
+        self.right_type: Optional[type] = None
+        self.function: Optional[Callable[[Any, Any], Any]] = None
+        self.variant: Optional[str] = None
+
+        # how many more generic runs until it specializes, and how many to wait after its next deoptimization
+        self.countdown = WARMUP
+        self.backoff = WARMUP
+
+    def __repr__(self) -> str:
+        return f"AdaptiveOperation({self.left!r}, {self.operator!r}, {self.right!r}, variant={self.variant!r})"
+
+    # specialize the operation for the types of the operands it has just run with, returning the name of the
+    # specialization (or None if the operator is not one it can specialize)
+    def specialize(self, left: Any, right: Any) -> Optional[str]:
+        function = OPERATOR_FUNCTIONS.get(self.operator)
+        if function is None:
+            return None
+
+        left_name = TYPE_NAMES.get(left.__class__, left.__class__.__name__)
+        right_name = TYPE_NAMES.get(right.__class__, right.__class__.__name__)
+        variant = f"{left_name}{self.operator}{right_name}"
+
+        # adding a string to anything else joins them as strings (two strings are simply added)
+        if self.operator == "+" and (left_name == "str") != (right_name == "str"):
+            function = join_as_strings
+            variant = "str+any"
+
+        self.left_type = left.__class__
+        self.right_type = right.__class__
+        self.function = function
+        self.variant = variant
+        return variant
+
+    # go back to running the generic way, after an operand has not had the type it was specialized for, and wait
+    # longer than last time before specializing again
+    def deoptimize(self):
+        self.left_type = self.right_type = self.function = self.variant = None
+        self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+        self.countdown = self.backoff
@@ -0,0 +1,183 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Tuple
+
+from pyhton.core.parser import (
+    Assignment,
+    ASTNode,
+    BinaryOp,
+    ComparisonOp,
+    ForLoop,
+    FunctionCall,
+    Identifier,
+    IfStatement,
+    LogicalOp,
+    PrintStatement,
+    Return,
+    UnaryOp,
+    WhileLoop,
+)
+from pyhton.core.quickening import AdaptiveOperation
+
+
+# nodes for the variables of a function, which the resolver has given a slot in the function's frame
+# a slot that has not been set yet (or whose for loop has finished) holds MISSING, and reading it falls back to
+# the global variable with the same name, as reading a name that is not in a function's local scope does
+@dataclass(frozen=True, slots=True)
+class LocalIdentifier(ASTNode):
+    name: str
+    slot: int
+
+
+@dataclass(frozen=True, slots=True)
+class LocalAssignment(ASTNode):
+    name: str
+    slot: int
+    value: ASTNode
+    line: int = field(default=0, compare=False, repr=False)
+
+
+@dataclass(frozen=True, slots=True)
+class LocalForLoop(ASTNode):
+    variable: str
+    slot: int
+    iterable: ASTNode
+    body: Tuple[ASTNode, ...]
+    line: int = field(default=0, compare=False, repr=False)
+
+
+# a return statement whose value is a call to the function it is in (a tail call), which the interpreter runs in
+# the caller's frame instead of nesting a new call, as long as the name still refers to the same function
+@dataclass(frozen=True, slots=True)
+class TailCall(ASTNode):
+    call: FunctionCall
+    line: int = field(default=0, compare=False, repr=False)
+
+
+# the resolver gives every local variable of a function a fixed slot in its frame, so the interpreter can keep a
+# call's variables in a list instead of a dict
+# the parameters come first, in order, then every other name the body assigns to or loops over (not counting
+# the bodies of functions defined inside it, which have frames of their own); other names are always global
+# with tail_calls set, returns of a call to the function itself become TailCall nodes, and with quicken set,
+# binary and comparison operations become AdaptiveOperation nodes
+class Resolver:
+    def __init__(self, tail_calls: bool = False, quicken: bool = False):
+        self.tail_calls = tail_calls
+        self.quicken = quicken
+        self.slots: Dict[str, int] = {}
+        self.function_name = ""
+
+    # resolve the body of a function, returning the new body and the number of slots its frame needs
+    def resolve_function(
+        self, name: str, params: Tuple[str, ...], body: Iterable[ASTNode]
+    ) -> Tuple[Tuple[ASTNode, ...], int]:
+        self.function_name = name
+
+        # a repeated parameter is given the slot of its last occurrence, so it is the argument that is read,
+        # as it would be in a dict
+        self.slots = {param: index for index, param in enumerate(params)}
+        frame_size = len(params)
+
+        body = tuple(body)
+        for variable in self._assigned_names(body):
+            if variable not in self.slots:
+                self.slots[variable] = frame_size
+                frame_size = frame_size + 1
+
+        return self._resolve_body(body), frame_size
+
+    # resolve a statement outside of any function, whose variables are all global (so this only makes a difference
+    # with quicken set)
+    def resolve_statement(self, node: ASTNode) -> ASTNode:
+        self.function_name = ""
+        self.slots = {}
+        return self._resolve_statement(node)
+
+    # private method to find the names a body assigns to or loops over
+    def _assigned_names(self, body: Iterable[ASTNode]) -> Iterable[str]:
+        for node in body:
+            if isinstance(node, Assignment):
+                yield node.name
+
+            elif isinstance(node, ForLoop):
+                yield node.variable
+                yield from self._assigned_names(node.body)
+
+            elif isinstance(node, WhileLoop):
+                yield from self._assigned_names(node.body)
+
+            elif isinstance(node, IfStatement):
+                yield from self._assigned_names(node.then_body)
+                for _, elif_body in node.elif_clauses:
+                    yield from self._assigned_names(elif_body)
+                if node.else_body:
+                    yield from self._assigned_names(node.else_body)
+
+    # private method to resolve the statements of a body
+    def _resolve_body(self, body: Iterable[ASTNode]) -> Tuple[ASTNode, ...]:
+        return tuple(self._resolve_statement(statement) for statement in body)
+
+    # private method to resolve a single statement
+    def _resolve_statement(self, node: ASTNode) -> ASTNode:
+        if isinstance(node, Assignment):
+            slot = self.slots.get(node.name)
+            if slot is None:
+                return Assignment(node.name, self._resolve(node.value), line=node.line)  # a global variable
+            return LocalAssignment(node.name, slot, self._resolve(node.value), line=node.line)
+
+        elif isinstance(node, ForLoop):
+            iterable = self._resolve(node.iterable)
+            body = self._resolve_body(node.body)
+            slot = self.slots.get(node.variable)
+            if slot is None:
+                return ForLoop(node.variable, iterable, body, line=node.line)  # a global loop variable
+            return LocalForLoop(node.variable, slot, iterable, body, line=node.line)
+
+        elif isinstance(node, WhileLoop):
+            return WhileLoop(self._resolve(node.condition), self._resolve_body(node.body), line=node.line)
+
+        elif isinstance(node, IfStatement):
+            condition = self._resolve(node.condition)
+            then_body = self._resolve_body(node.then_body)
+            elif_clauses = tuple(
+                (self._resolve(clause), self._resolve_body(body)) for clause, body in node.elif_clauses
+            )
+            else_body = self._resolve_body(node.else_body) if node.else_body is not None else None
+            return IfStatement(condition, then_body, elif_clauses, else_body, line=node.line)
+
+        elif isinstance(node, PrintStatement):
+            return PrintStatement(self._resolve(node.value), line=node.line)
+
+        elif isinstance(node, Return):
+            value = self._resolve(node.value) if node.value else node.value
+            if self.tail_calls and isinstance(value, FunctionCall) and value.name == self.function_name:
+                return TailCall(value, line=node.line)
+            return Return(value, line=node.line)
+
+        # function definitions are left alone, and anything else is an expression used as a statement
+        return self._resolve(node)
+
+    # private method to resolve the identifiers in an expression
+    def _resolve(self, node: ASTNode) -> ASTNode:
+        if isinstance(node, Identifier):
+            slot = self.slots.get(node.name)
+            return node if slot is None else LocalIdentifier(node.name, slot)
+
+        elif isinstance(node, (BinaryOp, ComparisonOp)):
+            left = self._resolve(node.left)
+            right = self._resolve(node.right)
+            if self.quicken:
+                return AdaptiveOperation(left, node.operator, right, isinstance(node, ComparisonOp), line=node.line)
+            return type(node)(left, node.operator, right, line=node.line)
+
+        elif isinstance(node, LogicalOp):
+            left = self._resolve(node.left)
+            right = self._resolve(node.right)
+            return LogicalOp(left, node.operator, right, node.op_type, line=node.line)
+
+        elif isinstance(node, UnaryOp):
+            return UnaryOp(node.operator, self._resolve(node.operand), line=node.line)
+
+        elif isinstance(node, FunctionCall):
+            return FunctionCall(node.name, tuple(self._resolve(arg) for arg in node.args), line=node.line)
+
+        return node  # literals have nothing to resolve
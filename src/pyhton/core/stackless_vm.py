@@ -0,0 +1,252 @@
+from typing import Any, Dict, Optional
+
+from pyhton.core.bytecode import Bytecode
+from pyhton.core.interpreter import MISSING, BuiltinFunction, ReturnException
+from pyhton.core.vm import (
+    AND_JUMP,
+    BINARY_ADD,
+    BINARY_DIVIDE,
+    BINARY_MULTIPLY,
+    BINARY_SUBTRACT,
+    CALL_FUNCTION,
+    COMPARE_OP,
+    DEFINE_FUNCTION,
+    END_FOR,
+    FOR_ITER,
+    GET_ITER,
+    JUMP,
+    LOAD_CONST,
+    LOAD_FUNCTION,
+    LOAD_NAME,
+    OR_JUMP,
+    POP_JUMP_IF_FALSE,
+    POP_TOP,
+    PRINT,
+    RAISE,
+    RETURN_VALUE,
+    STOP,
+    STORE_NAME,
+    TO_BOOL,
+    UNARY_NOT,
+    BytecodeInterpreter,
+)
+
+# roughly how much memory a suspended call takes: its saved state, value stack and local scope (measured with
+# tracemalloc by benchmarks/stackless.py, for calls with a couple of arguments)
+FRAME_SIZE = 512
+
+
+# a bytecode interpreter that never nests Python calls to run pyhton calls: a call saves the state of the caller
+# on a list of frames and carries on in the same loop with the function's code, and a return picks the caller
+# back up, so recursion is not limited by Python's recursion limit, only by Interpreter.stack_memory
+class StacklessInterpreter(BytecodeInterpreter):
+    # private method to run the instructions of some bytecode until it returns or stops, with the local scope
+    # of the function it belongs to (None for a program), running the functions it calls in the same loop
+    def _run_bytecode(self, code: Bytecode, local_vars: Optional[Dict[str, Any]]) -> Any:
+        instructions = code.instruction_list
+        constants = code.constants
+        names = code.names
+        globals_ = self.globals
+        functions = self.functions
+        scope = local_vars if local_vars is not None else globals_
+
+        # the calls waiting for the running one to return, as (code, value stack, local scope, scope, position)
+        frames = []
+        max_frames = self.stack_memory // FRAME_SIZE
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        position = 0
+
+        try:
+            while True:
+                opcode = instructions[position]
+                argument = instructions[position + 1]
+                position = position + 2
+
+                if opcode == LOAD_NAME:
+                    name = names[argument]
+                    if local_vars is not None:
+                        value = local_vars.get(name, MISSING)
+                        if value is not MISSING:
+                            push(value)
+                            continue
+                    value = globals_.get(name, MISSING)
+                    if value is MISSING:
+                        raise Exception(f"Unknown variable: {name}")
+                    push(value)
+
+                elif opcode == LOAD_CONST:
+                    push(constants[argument])
+
+                elif opcode == STORE_NAME:
+                    scope[names[argument]] = pop()
+
+                elif opcode == BINARY_ADD:
+                    right = pop()
+                    left = stack[-1]
+                    # two integers (as in counting loops) can't need joining as strings, so they skip the check
+                    if left.__class__ is int and right.__class__ is int:
+                        stack[-1] = left + right
+                    # if either operand is a string, convert both to strings for concatenation
+                    elif isinstance(left, str) or isinstance(right, str):
+                        stack[-1] = str(left) + str(right)
+                    else:
+                        stack[-1] = left + right
+
+                elif opcode == POP_JUMP_IF_FALSE:
+                    if not pop():
+                        position = argument
+
+                elif opcode == COMPARE_OP:
+                    right = pop()
+                    left = stack[-1]
+                    if argument == 0:
+                        stack[-1] = left == right
+                    elif argument == 1:
+                        stack[-1] = left != right
+                    elif argument == 2:
+                        stack[-1] = left < right
+                    elif argument == 3:
+                        stack[-1] = left <= right
+                    elif argument == 4:
+                        stack[-1] = left > right
+                    else:
+                        stack[-1] = left >= right
+
+                elif opcode == JUMP:
+                    position = argument
+
+                elif opcode == FOR_ITER:
+                    item = next(stack[-1], MISSING)
+                    if item is MISSING:
+                        pop()
+                        position = argument
+                    else:
+                        push(item)
+
+                elif opcode == BINARY_SUBTRACT:
+                    right = pop()
+                    stack[-1] = stack[-1] - right
+
+                elif opcode == BINARY_MULTIPLY:
+                    right = pop()
+                    stack[-1] = stack[-1] * right
+
+                elif opcode == BINARY_DIVIDE:
+                    right = pop()
+                    stack[-1] = stack[-1] / right
+
+                elif opcode == LOAD_FUNCTION:
+                    function = functions.get(names[argument])
+                    if function is None:
+                        raise Exception(f"Unknown function: {names[argument]}")
+                    push(function)
+
+                elif opcode == CALL_FUNCTION:
+                    args = stack[len(stack) - argument :]
+                    del stack[len(stack) - argument :]
+                    function = stack[-1]
+
+                    # handle built-in functions
+                    if isinstance(function, BuiltinFunction):
+                        stack[-1] = function.func(args)
+                        continue
+
+                    # check parameter count is correct
+                    if len(args) != len(function.params):
+                        raise Exception(
+                            f"Function {function.name} expects {len(function.params)} arguments, got {len(args)}"
+                        )
+
+                    if len(frames) >= max_frames:
+                        raise RecursionError(
+                            f"maximum recursion depth exceeded ({len(frames)} calls use up the call stack's memory "
+                            f"budget of {self.stack_memory // 2**20} MB)"
+                        )
+
+                    function_code = function.code
+                    if function_code is None:
+                        function_code = self._compile_function(function)
+
+                    # save the caller, which gets the result in place of the function once the call returns
+                    frames.append((code, stack, local_vars, scope, position))
+
+                    code = function_code
+                    instructions = code.instruction_list
+                    constants = code.constants
+                    names = code.names
+                    local_vars = scope = dict(zip(function.params, args))
+                    stack = []
+                    push = stack.append
+                    pop = stack.pop
+                    position = 0
+
+                elif opcode == RETURN_VALUE:
+                    value = pop()
+                    if not frames:
+                        if local_vars is None:
+                            raise ReturnException(value)  # a return outside of a function ends the program
+                        return value
+
+                    # pick the caller back up where it left off
+                    code, stack, local_vars, scope, position = frames.pop()
+                    instructions = code.instruction_list
+                    constants = code.constants
+                    names = code.names
+                    push = stack.append
+                    pop = stack.pop
+                    stack[-1] = value
+
+                elif opcode == POP_TOP:
+                    pop()
+
+                elif opcode == UNARY_NOT:
+                    stack[-1] = not stack[-1]
+
+                elif opcode == OR_JUMP:
+                    if pop():
+                        push(True)
+                        position = argument
+
+                elif opcode == AND_JUMP:
+                    if not pop():
+                        push(False)
+                        position = argument
+
+                elif opcode == TO_BOOL:
+                    stack[-1] = bool(stack[-1])
+
+                elif opcode == GET_ITER:
+                    iterable = stack[-1]
+                    if not isinstance(iterable, (str, range)):
+                        raise Exception(f"For loop iterable must be a string or range, got {type(iterable).__name__}")
+                    stack[-1] = iter(iterable)
+
+                elif opcode == END_FOR:
+                    scope.pop(names[argument], None)
+
+                elif opcode == PRINT:
+                    print(pop())
+
+                elif opcode == DEFINE_FUNCTION:
+                    function = constants[argument]
+                    functions[function.name] = function
+
+                elif opcode == RAISE:
+                    raise Exception(constants[argument])
+
+                elif opcode == STOP:
+                    return None
+
+                else:
+                    raise Exception(f"Unknown opcode: {opcode}")
+
+        except BaseException:
+            # an error that leaves for loops early still removes their loop variables, in the running call and
+            # in every call waiting for it, as the tree walker does
+            self._clean_up_loops(code, scope, position - 2)
+            for code, _, _, scope, position in reversed(frames):
+                self._clean_up_loops(code, scope, position - 2)
+            raise
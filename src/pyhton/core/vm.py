@@ -0,0 +1,253 @@
+from typing import Any, Dict, Iterable, Optional
+
+from pyhton.core.bytecode import Bytecode, BytecodeFunction, Compiler, Opcode
+from pyhton.core.interpreter import MISSING, BuiltinFunction, Interpreter, ReturnException
+from pyhton.core.parser import ASTNode, Program
+
+# the opcodes as plain ints, so the dispatch loop compares ints instead of enum members
+LOAD_CONST = int(Opcode.LOAD_CONST)
+LOAD_NAME = int(Opcode.LOAD_NAME)
+STORE_NAME = int(Opcode.STORE_NAME)
+BINARY_ADD = int(Opcode.BINARY_ADD)
+BINARY_SUBTRACT = int(Opcode.BINARY_SUBTRACT)
+BINARY_MULTIPLY = int(Opcode.BINARY_MULTIPLY)
+BINARY_DIVIDE = int(Opcode.BINARY_DIVIDE)
+COMPARE_OP = int(Opcode.COMPARE_OP)
+UNARY_NOT = int(Opcode.UNARY_NOT)
+TO_BOOL = int(Opcode.TO_BOOL)
+OR_JUMP = int(Opcode.OR_JUMP)
+AND_JUMP = int(Opcode.AND_JUMP)
+POP_JUMP_IF_FALSE = int(Opcode.POP_JUMP_IF_FALSE)
+JUMP = int(Opcode.JUMP)
+GET_ITER = int(Opcode.GET_ITER)
+FOR_ITER = int(Opcode.FOR_ITER)
+END_FOR = int(Opcode.END_FOR)
+DEFINE_FUNCTION = int(Opcode.DEFINE_FUNCTION)
+LOAD_FUNCTION = int(Opcode.LOAD_FUNCTION)
+CALL_FUNCTION = int(Opcode.CALL_FUNCTION)
+PRINT = int(Opcode.PRINT)
+POP_TOP = int(Opcode.POP_TOP)
+RETURN_VALUE = int(Opcode.RETURN_VALUE)
+RAISE = int(Opcode.RAISE)
+STOP = int(Opcode.STOP)
+
+
+# an interpreter that compiles the AST into bytecode and runs it on a stack based virtual machine
+# it gives the same results and error messages as the tree walking Interpreter, and shares its scopes, so
+# every call to a pyhton function is a single call to _run_bytecode
+class BytecodeInterpreter(Interpreter):
+    # main entry point to interpret a program, compiled as a whole
+    def interpret(self, program: Program):
+        self.run_bytecode(Compiler().compile_program(program))
+
+    # interpret statements one at a time, compiling each one just before it runs
+    def interpret_statements(self, statements: Iterable[ASTNode]):
+        for statement in statements:
+            self.run_bytecode(Compiler().compile_statements((statement,)))
+
+    # work out the value of a single expression
+    def evaluate(self, node: ASTNode) -> Any:
+        return self._run_bytecode(Compiler("<expression>").compile_expression(node), {})
+
+    # run compiled program code, at the top level (outside of any function)
+    def run_bytecode(self, code: Bytecode):
+        self._run_bytecode(code, None)
+
+    # private method to run the instructions of some bytecode until it returns or stops, with the local scope
+    # of the function it belongs to (None for a program)
+    def _run_bytecode(self, code: Bytecode, local_vars: Optional[Dict[str, Any]]) -> Any:
+        instructions = code.instruction_list
+        constants = code.constants
+        names = code.names
+        globals_ = self.globals
+        functions = self.functions
+        locals_stack = self.locals_stack
+        scope = local_vars if local_vars is not None else globals_
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        position = 0
+
+        try:
+            while True:
+                opcode = instructions[position]
+                argument = instructions[position + 1]
+                position = position + 2
+
+                if opcode == LOAD_NAME:
+                    name = names[argument]
+                    if local_vars is not None:
+                        value = local_vars.get(name, MISSING)
+                        if value is not MISSING:
+                            push(value)
+                            continue
+                    value = globals_.get(name, MISSING)
+                    if value is MISSING:
+                        raise Exception(f"Unknown variable: {name}")
+                    push(value)
+
+                elif opcode == LOAD_CONST:
+                    push(constants[argument])
+
+                elif opcode == STORE_NAME:
+                    scope[names[argument]] = pop()
+
+                elif opcode == BINARY_ADD:
+                    right = pop()
+                    left = stack[-1]
+                    # two integers (as in counting loops) can't need joining as strings, so they skip the check
+                    if left.__class__ is int and right.__class__ is int:
+                        stack[-1] = left + right
+                    # if either operand is a string, convert both to strings for concatenation
+                    elif isinstance(left, str) or isinstance(right, str):
+                        stack[-1] = str(left) + str(right)
+                    else:
+                        stack[-1] = left + right
+
+                elif opcode == POP_JUMP_IF_FALSE:
+                    if not pop():
+                        position = argument
+
+                elif opcode == COMPARE_OP:
+                    right = pop()
+                    left = stack[-1]
+                    if argument == 0:
+                        stack[-1] = left == right
+                    elif argument == 1:
+                        stack[-1] = left != right
+                    elif argument == 2:
+                        stack[-1] = left < right
+                    elif argument == 3:
+                        stack[-1] = left <= right
+                    elif argument == 4:
+                        stack[-1] = left > right
+                    else:
+                        stack[-1] = left >= right
+
+                elif opcode == JUMP:
+                    position = argument
+
+                elif opcode == FOR_ITER:
+                    item = next(stack[-1], MISSING)
+                    if item is MISSING:
+                        pop()
+                        position = argument
+                    else:
+                        push(item)
+
+                elif opcode == BINARY_SUBTRACT:
+                    right = pop()
+                    stack[-1] = stack[-1] - right
+
+                elif opcode == BINARY_MULTIPLY:
+                    right = pop()
+                    stack[-1] = stack[-1] * right
+
+                elif opcode == BINARY_DIVIDE:
+                    right = pop()
+                    stack[-1] = stack[-1] / right
+
+                elif opcode == LOAD_FUNCTION:
+                    function = functions.get(names[argument])
+                    if function is None:
+                        raise Exception(f"Unknown function: {names[argument]}")
+                    push(function)
+
+                elif opcode == CALL_FUNCTION:
+                    args = stack[len(stack) - argument :]
+                    del stack[len(stack) - argument :]
+                    function = stack[-1]
+
+                    # handle built-in functions
+                    if isinstance(function, BuiltinFunction):
+                        stack[-1] = function.func(args)
+                        continue
+
+                    # check parameter count is correct
+                    if len(args) != len(function.params):
+                        raise Exception(
+                            f"Function {function.name} expects {len(function.params)} arguments, got {len(args)}"
+                        )
+
+                    function_code = function.code
+                    if function_code is None:
+                        function_code = self._compile_function(function)
+
+                    function_locals = dict(zip(function.params, args))
+                    locals_stack.append(function_locals)
+                    try:
+                        stack[-1] = self._run_bytecode(function_code, function_locals)
+                    finally:
+                        locals_stack.pop()
+
+                elif opcode == RETURN_VALUE:
+                    value = pop()
+                    if local_vars is None:
+                        raise ReturnException(value)  # a return outside of a function ends the program
+                    return value
+
+                elif opcode == POP_TOP:
+                    pop()
+
+                elif opcode == UNARY_NOT:
+                    stack[-1] = not stack[-1]
+
+                elif opcode == OR_JUMP:
+                    if pop():
+                        push(True)
+                        position = argument
+
+                elif opcode == AND_JUMP:
+                    if not pop():
+                        push(False)
+                        position = argument
+
+                elif opcode == TO_BOOL:
+                    stack[-1] = bool(stack[-1])
+
+                elif opcode == GET_ITER:
+                    iterable = stack[-1]
+                    if not isinstance(iterable, (str, range)):
+                        raise Exception(f"For loop iterable must be a string or range, got {type(iterable).__name__}")
+                    stack[-1] = iter(iterable)
+
+                elif opcode == END_FOR:
+                    scope.pop(names[argument], None)
+
+                elif opcode == PRINT:
+                    print(pop())
+
+                elif opcode == DEFINE_FUNCTION:
+                    function = constants[argument]
+                    functions[function.name] = function
+
+                elif opcode == RAISE:
+                    raise Exception(constants[argument])
+
+                elif opcode == STOP:
+                    return None
+
+                else:
+                    raise Exception(f"Unknown opcode: {opcode}")
+
+        except BaseException:
+            # an error that leaves for loops early still removes their loop variables, as the tree walker does
+            self._clean_up_loops(code, scope, position - 2)
+            raise
+
+    # private method to remove the variables of the for loops that were running at position, from the
+    # innermost loop out
+    def _clean_up_loops(self, code: Bytecode, scope: Dict[str, Any], position: int):
+        for start, end, variable in reversed(code.loops):
+            if start <= position < end:
+                scope.pop(code.names[variable], None)
+
+    # private method to compile the body of a function the first time it is called, parsing it first if the
+    # function was parsed lazily
+    def _compile_function(self, function: BytecodeFunction) -> Bytecode:
+        if function.body is None:
+            function.body = self._parse_function_body(function)
+
+        function.code = Compiler(function.name).compile_function_body(function.body)
+        return function.code
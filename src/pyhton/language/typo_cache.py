@@ -0,0 +1,77 @@
+import contextlib
+import hashlib
+import marshal
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+# bump this whenever the layout of the cached tables changes
+CACHE_FORMAT_VERSION = 1
+
+# tables already loaded or built by this process, keyed by fingerprint
+_loaded_tables: Dict[str, dict] = {}
+
+
+# the directory the compiled typo tables are stored in
+def cache_directory() -> Path:
+    if os.environ.get("PYHTON_CACHE_DIR"):
+        return Path(os.environ["PYHTON_CACHE_DIR"])
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "pyhton"
+
+
+# fingerprint of everything the compiled tables depend on: a hash of the vocabulary, matcher and typo rules they are
+# built from, then a hash of the format they are stored in
+# a different vocabulary or set of typo rules gives a different fingerprint, and so a different cache file
+def typo_tables_fingerprint(words: Iterable[str], matcher: str, rules: Iterable[str]) -> str:
+    vocabulary_key = repr((matcher, tuple(rules), sorted(words)))
+    format_key = repr((CACHE_FORMAT_VERSION, marshal.version))
+    vocabulary_hash = hashlib.sha256(vocabulary_key.encode("utf-8")).hexdigest()[:32]
+    format_hash = hashlib.sha256(format_key.encode("utf-8")).hexdigest()[:8]
+    return f"{vocabulary_hash}-{format_hash}"
+
+
+def _cache_file(fingerprint: str, matcher: str) -> Path:
+    return cache_directory() / f"typo-{matcher}-{fingerprint}.marshal"
+
+
+# load compiled tables with a single read, returning None if they have not been cached yet
+def load_typo_tables(fingerprint: str, matcher: str) -> Optional[dict]:
+    if fingerprint in _loaded_tables:
+        return _loaded_tables[fingerprint]
+
+    try:
+        data = _cache_file(fingerprint, matcher).read_bytes()
+        version, cached_fingerprint, tables = marshal.loads(data)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None  # missing, unreadable or corrupt cache files are simply rebuilt
+
+    if version != CACHE_FORMAT_VERSION or cached_fingerprint != fingerprint:
+        return None
+
+    _loaded_tables[fingerprint] = tables
+    return tables
+
+
+# save compiled tables, replacing any stale tables that an older format stored for the same vocabulary
+# (tables for other vocabularies are kept, as other engines or processes may still be using them)
+def store_typo_tables(fingerprint: str, matcher: str, tables: dict):
+    _loaded_tables[fingerprint] = tables
+
+    cache_file = _cache_file(fingerprint, matcher)
+    temporary_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temporary_file.write_bytes(marshal.dumps((CACHE_FORMAT_VERSION, fingerprint, tables)))
+        os.replace(temporary_file, cache_file)  # atomic, so other processes never see a half written file
+
+        vocabulary_hash = fingerprint.split("-")[0]
+        for stale_file in cache_file.parent.glob(f"typo-{matcher}-{vocabulary_hash}-*.marshal"):
+            if stale_file != cache_file:
+                stale_file.unlink(missing_ok=True)
+    except OSError:
+        # the cache is only an optimisation, so an unwritable cache directory is not an error
+        with contextlib.suppress(OSError):
+            temporary_file.unlink(missing_ok=True)
@@ -1,9 +1,110 @@
+import warnings
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
 from pyhton.language.python_words import ALL_WORDS
+from pyhton.language.typo_cache import load_typo_tables, store_typo_tables, typo_tables_fingerprint
+from pyhton.language.typo_trie import TYPO_RULES, TypoTrie
+
+# the available strategies for matching a typo to its original word
+# "index" precomputes every typo into a dict, "trie" searches a prefix tree and scales to large vocabularies
+TYPO_MATCHERS = ("index", "trie")
 
 
 class TypoEngine:
-    def __init__(self):
-        self.valid_words = ALL_WORDS
+    def __init__(
+        self,
+        words: Iterable[str] = ALL_WORDS,
+        matcher: str = "index",
+        rules: Iterable[str] = TYPO_RULES,
+        use_cache: bool = True,
+    ):
+        if matcher not in TYPO_MATCHERS:
+            raise Exception(f"Unknown typo matcher: {matcher}")
+
+        rules = set(rules)
+        for rule in rules:
+            if rule not in TYPO_RULES:
+                raise Exception(f"Unknown typo rule: {rule}")
+
+        self.valid_words = set(words)
+        self.matcher = matcher
+        self.rules = tuple(rule for rule in TYPO_RULES if rule in rules)  # keep the rules in a stable order
+
+        # load the compiled tables from the cache, only building them if the vocabulary or rules have changed
+        tables = None
+        if use_cache:
+            fingerprint = typo_tables_fingerprint(self.valid_words, self.matcher, self.rules)
+            tables = load_typo_tables(fingerprint, self.matcher)
+
+        if tables is None:
+            tables = self._build_tables()
+
+            # report typos that could stand for more than one word
+            if tables["ambiguous_typos"]:
+                details = ", ".join(
+                    f"'{typo}' -> {sorted(words)}" for typo, words in sorted(tables["ambiguous_typos"].items())
+                )
+                warnings.warn(f"Ambiguous typos in vocabulary: {details}", stacklevel=2)
+
+            if use_cache:
+                store_typo_tables(fingerprint, self.matcher, tables)
+
+        self.typo_index: Dict[str, str] = tables["typo_index"]
+        self.ambiguous_typos: Dict[str, Set[str]] = tables["ambiguous_typos"]
+
+        if matcher == "trie":
+            self.typo_trie = TypoTrie(rules=self.rules)
+            self.typo_trie.root = tables["trie"]
+            self._lookup = self.typo_trie.find_original_word
+        else:
+            self._lookup = self.typo_index.get
+
+    # build the tables used to look up typos
+    def _build_tables(self) -> dict:
+        if self.matcher == "trie":
+            # the trie is searched on every lookup, so there is nothing else to precompute
+            trie = TypoTrie(self.valid_words, self.rules)
+            return {"typo_index": {}, "ambiguous_typos": {}, "trie": trie.root}
+
+        # precompute every valid typo once, so lookups are a single dict access
+        typo_index, ambiguous_typos = self._build_typo_index()
+        return {"typo_index": typo_index, "ambiguous_typos": ambiguous_typos}
+
+    # build the typo -> original word dictionary from the typo rules
+    def _build_typo_index(self) -> Tuple[Dict[str, str], Dict[str, Set[str]]]:
+        typo_index: Dict[str, str] = {}
+        ambiguous_typos: Dict[str, Set[str]] = {}
+
+        # iterate in sorted order so the winner of an ambiguous typo is always the same word
+        for word in sorted(self.valid_words):
+            for typo in self._generate_typos(word):
+                # only consider typos that are longer than 1 character
+                if len(typo) <= 1:
+                    continue
+
+                existing = typo_index.setdefault(typo, word)
+                if existing != word:
+                    ambiguous_typos.setdefault(typo, {existing}).add(word)
+
+        return typo_index, ambiguous_typos
+
+    # generate every valid typo of a word
+    def _generate_typos(self, word: str) -> Iterator[str]:
+        for i in range(len(word)):
+            if "doubled_letter" in self.rules:
+                yield word[:i] + word[i] + word[i:]
+            if "missing_letter" in self.rules:
+                yield word[:i] + word[i + 1 :]
+
+        if "swapped_letters" not in self.rules:
+            return
+
+        for i in range(len(word) - 1):
+            swapped_version = word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+
+            # swapping two identical letters gives back the original word
+            if swapped_version != word:
+                yield swapped_version
 
     # check if if a word is a valid typo of another word
     def is_valid_typo(self, typo_word: str, original_word: str) -> bool:
@@ -11,9 +112,9 @@ class TypoEngine:
             return False
 
         return (
-            self._is_doubled_letter(typo_word, original_word)
-            or self._is_missing_letter(typo_word, original_word)
-            or self._is_swapped_letters(typo_word, original_word)
+            ("doubled_letter" in self.rules and self._is_doubled_letter(typo_word, original_word))
+            or ("missing_letter" in self.rules and self._is_missing_letter(typo_word, original_word))
+            or ("swapped_letters" in self.rules and self._is_swapped_letters(typo_word, original_word))
         )
 
     # check if a word is a doubled letter typo
@@ -79,10 +180,20 @@ class TypoEngine:
         if len(typo_word) <= 1:
             return None
 
-        for word in self.valid_words:
-            if self.is_valid_typo(typo_word, word):
-                return word
-        return None
+        return self._lookup(typo_word)
+
+    # find the original word for a whole batch of typos at once
+    def classify_many(self, words: Iterable[str]) -> List[Optional[str]]:
+        # the index never contains typos of 1 character, so the whole batch can be mapped through it directly
+        if self.matcher == "index":
+            return list(map(self.typo_index.get, words))
+
+        # otherwise look up each distinct word only once, as real programs reuse the same identifiers a lot
+        words = list(words)
+        distinct_words = [word for word in dict.fromkeys(words) if len(word) > 1]
+        original_words = dict(zip(distinct_words, map(self._lookup, distinct_words)))
+
+        return list(map(original_words.get, words))
 
     # check if a word is a valid word in the language
     def is_correct_word(self, word: str) -> bool:
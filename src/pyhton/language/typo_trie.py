@@ -0,0 +1,93 @@
+from typing import Dict, Iterable, Optional, Set
+
+# the typo rules a word can be misspelt with
+TYPO_RULES = ("doubled_letter", "missing_letter", "swapped_letters")
+
+# key used inside a trie node to store the word that ends at that node
+# (every other key is a single character, so the empty string can never clash)
+WORD_KEY = ""
+
+
+# a prefix tree over the vocabulary, searched with a budget of exactly one typo
+# the cost of a lookup depends on the length of the typo, not on the number of words
+class TypoTrie:
+    def __init__(self, words: Iterable[str] = (), rules: Iterable[str] = TYPO_RULES):
+        self.root: Dict[str, dict] = {}
+        self.rules = tuple(rules)
+
+        for word in words:
+            self.insert(word)
+
+    # add a word to the trie, one node per character
+    def insert(self, word: str):
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+
+        node[WORD_KEY] = word
+
+    # find the original word from a typo, picking the alphabetically first one if the typo is ambiguous
+    def find_original_word(self, typo: str) -> Optional[str]:
+        matches = self.find_original_words(typo)
+        if not matches:
+            return None
+
+        return min(matches)
+
+    # find every word the typo could have been made from
+    def find_original_words(self, typo: str) -> Set[str]:
+        matches: Set[str] = set()
+        length = len(typo)
+        node = self.root
+
+        doubled_letter = "doubled_letter" in self.rules
+        missing_letter = "missing_letter" in self.rules
+        swapped_letters = "swapped_letters" in self.rules
+
+        # walk down the trie along the typo, trying each typo rule at every position
+        for i in range(length + 1):
+            # missing letter: the original word has one extra letter at this position
+            if i == length:
+                if missing_letter:
+                    for char, child in node.items():
+                        if char != WORD_KEY and WORD_KEY in child:
+                            matches.add(child[WORD_KEY])
+                break
+
+            # (only children that continue with the next letter of the typo are worth following)
+            if missing_letter:
+                for char, child in node.items():
+                    if char != WORD_KEY:
+                        next_node = child.get(typo[i])
+                        if next_node is not None:
+                            self._match_rest(next_node, typo, i + 1, matches)
+
+            # doubled letter: this letter repeats the one just matched
+            if doubled_letter and i > 0 and typo[i] == typo[i - 1]:
+                self._match_rest(node, typo, i + 1, matches)
+
+            # swapped letters: the next two letters appear the other way round in the original word
+            if swapped_letters and i + 1 < length and typo[i] != typo[i + 1]:
+                child = node.get(typo[i + 1])
+                if child is not None:
+                    grandchild = child.get(typo[i])
+                    if grandchild is not None:
+                        self._match_rest(grandchild, typo, i + 2, matches)
+
+            # no typo here, so follow the letter exactly
+            node = node.get(typo[i])
+            if node is None:
+                break
+
+        return matches
+
+    # follow the rest of the typo exactly, recording the word if one ends there
+    def _match_rest(self, node: dict, typo: str, start: int, matches: Set[str]):
+        for i in range(start, len(typo)):
+            node = node.get(typo[i])
+            if node is None:
+                return
+
+        word = node.get(WORD_KEY)
+        if word is not None:
+            matches.add(word)
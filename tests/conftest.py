@@ -0,0 +1,12 @@
+import pytest
+
+from pyhton.language import typo_cache
+
+
+# keep the typo tables the tests build out of the user's cache directory, and out of the other tests' way
+@pytest.fixture(autouse=True)
+def typo_cache_directory(tmp_path_factory, monkeypatch):
+    directory = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("PYHTON_CACHE_DIR", str(directory))
+    monkeypatch.setattr(typo_cache, "_loaded_tables", {})
+    return directory
@@ -0,0 +1,76 @@
+import sys
+
+import pytest
+
+from pyhton.cli import cli
+from pyhton.cli.audit import find_identifiers, run_audit
+
+PROGRAM = """x = Tru or Fals
+fi x:
+    prrint("or fi")  # fi
+endiff
+"""
+
+LOOP = """ffor i inn rangee(3):
+    prrint(i)
+endfr
+prrint(3.5)
+"""
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    (tmp_path / "program.yp").write_text(PROGRAM)
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "loop.yp").write_text(LOOP)
+    (tmp_path / "notes.txt").write_text("fi fi fi")
+    return tmp_path
+
+
+def test_find_identifiers_skips_strings_comments_and_numbers():
+    assert find_identifiers(PROGRAM) == ["x", "Tru", "or", "Fals", "fi", "x", "prrint", "endiff"]
+    assert find_identifiers(LOOP) == ["ffor", "i", "inn", "rangee", "prrint", "i", "endfr", "prrint"]
+
+
+# or is spelled correctly, so it is reported as an error rather than as a typo of for
+def test_audit(corpus, capsys):
+    run_audit(str(corpus))
+    assert capsys.readouterr().out.splitlines() == [
+        "Audited: 2 file(s), 16 identifier(s)",
+        "",
+        "Identifiers read as keywords or builtins:",
+        "  Fals             → False      │ 1 occurrence(s) in 1 file(s)",
+        "  Tru              → True       │ 1 occurrence(s) in 1 file(s)",
+        "  endfr            → endfor     │ 1 occurrence(s) in 1 file(s)",
+        "  endiff           → endif      │ 1 occurrence(s) in 1 file(s)",
+        "  ffor             → for        │ 1 occurrence(s) in 1 file(s)",
+        "  fi               → if         │ 1 occurrence(s) in 1 file(s)",
+        "  inn              → in         │ 1 occurrence(s) in 1 file(s)",
+        "  prrint           → print      │ 3 occurrence(s) in 2 file(s)",
+        "  rangee           → range      │ 1 occurrence(s) in 1 file(s)",
+        "",
+        "Correctly spelled keywords (these are errors):",
+        "  or │ 1 occurrence(s)",
+    ]
+
+
+def test_audit_without_typos(tmp_path, capsys):
+    (tmp_path / "empty.yp").write_text("x = 1\n")
+    run_audit(str(tmp_path))
+    assert capsys.readouterr().out.splitlines() == [
+        "Audited: 1 file(s), 1 identifier(s)",
+        "",
+        "Identifiers read as keywords or builtins:",
+        "  none",
+    ]
+
+
+def test_audit_of_missing_directory(tmp_path, capsys):
+    run_audit(str(tmp_path / "missing"))
+    assert capsys.readouterr().out == f"Error: Directory '{tmp_path / 'missing'}' not found\n"
+
+
+def test_audit_command(corpus, capsys, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["pyhton", "audit", str(corpus)])
+    cli.main()
+    assert capsys.readouterr().out.startswith("Audited: 2 file(s), 16 identifier(s)\n")
@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from pyhton.cli import cli
+
+PROGRAM = """deff total(n, acc):
+    fi n == 0:
+        retrn acc
+    endiff
+    retrn total(n - 1, acc + n)
+endfnc
+prrint(total(10, 0))
+"""
+
+
+@pytest.fixture
+def source_file(tmp_path) -> Path:
+    path = tmp_path / "program.yp"
+    path.write_text(PROGRAM)
+    return path
+
+
+# run the command line with some arguments, returning what it printed and the code it exited with
+def run_cli(arguments: List[str], capsys, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["pyhton", *arguments])
+    exit_code = 0
+    try:
+        cli.main()
+    except SystemExit as e:
+        exit_code = e.code
+    return capsys.readouterr().out, exit_code
+
+
+# options of the tree engine are rejected with any other engine, rather than silently ignored
+@pytest.mark.parametrize("engine", ["closure", "bytecode", "stackless", "python"])
+@pytest.mark.parametrize("option", ["--no-tco", "--memoize", "--no-quicken"])
+def test_tree_options_need_the_tree_engine(option: str, engine: str, source_file, capsys, monkeypatch):
+    output, exit_code = run_cli(["--engine", engine, option, str(source_file)], capsys, monkeypatch)
+    assert exit_code == 1
+    assert f"{option} cannot be combined with --engine {engine}" in output
+
+
+@pytest.mark.parametrize("option", ["--no-tco", "--memoize", "--no-quicken"])
+def test_tree_options(option: str, source_file, capsys, monkeypatch):
+    assert run_cli(["--engine", "tree", option, str(source_file)], capsys, monkeypatch) == ("55\n", 0)
+    assert run_cli([option, str(source_file)], capsys, monkeypatch) == ("55\n", 0)
+
+
+def test_every_tree_option_is_reported(source_file, capsys, monkeypatch):
+    arguments = ["--engine", "closure", "--no-tco", "--memoize", "--no-quicken", str(source_file)]
+    output, exit_code = run_cli(arguments, capsys, monkeypatch)
+    assert exit_code == 1
+    assert "--no-tco and --memoize and --no-quicken cannot be combined with --engine closure" in output
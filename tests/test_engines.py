@@ -0,0 +1,223 @@
+import contextlib
+import io
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pytest
+
+from pyhton.core.engines import DEFAULT_ENGINE, create_interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.optimizer import Optimizer
+from pyhton.core.parser import Parser
+
+EXAMPLES_DIRECTORY = Path(__file__).resolve().parent.parent / "examples"
+
+# programs that cover what the examples don't: errors (which every engine must report with the same message,
+# after the same output), scoping, tail calls, memoized functions that are redefined, exact integers and
+# operations whose operand types change
+PROGRAMS = {
+    "unknown variable": """
+prrint("before")
+prrint(nope)
+""",
+    "unknown function": """
+prrint(missing(1))
+""",
+    "wrong number of arguments": """
+deff f(a):
+    retrn a
+endfnc
+prrint(f(1, 2))
+""",
+    "division by zero": """
+prrint(1 / 0)
+""",
+    "bad for loop iterable": """
+ffor i inn 5:
+    prrint(i)
+endfr
+""",
+    "bad range arguments": """
+prrint(rangee("a"))
+""",
+    "error inside nested calls": """
+deff inner(n):
+    fi n == 0:
+        retrn n - "x"
+    endiff
+    retrn inner(n - 1)
+endfnc
+ffor i inn rangee(3):
+    prrint(i)
+    prrint(inner(2))
+endfr
+""",
+    "top-level return": """
+prrint(1)
+retrn 5
+prrint(2)
+""",
+    "globals and locals": """
+x = 1
+deff shadow(y):
+    prrint(x + y)
+    x = 10
+    retrn x
+endfnc
+prrint(shadow(2))
+prrint(x)
+ffor i inn rangee(2):
+    x = x + i
+endfr
+prrint(x)
+""",
+    "tail calls": """
+deff total(n, acc):
+    fi n == 0:
+        retrn acc
+    endiff
+    retrn total(n - 1, acc + n)
+endfnc
+prrint(total(100, 0))
+""",
+    "memoized function redefined": """
+deff g(x):
+    retrn x + 1
+endfnc
+deff f(x):
+    retrn g(x) * 2
+endfnc
+prrint(f(1))
+prrint(f(1))
+deff g(x):
+    prrint("side")
+    retrn x
+endfnc
+prrint(f(1))
+""",
+    "exact integers": """
+deff factorial(n):
+    fi n < 2:
+        retrn 1
+    endiff
+    retrn n * factorial(n - 1)
+endfnc
+prrint(factorial(30))
+prrint(factorial(5.0))
+prrint(7 / 2)
+prrint("ab" * 3)
+""",
+    "changing operand types": """
+deff add(a, b):
+    retrn a + b
+endfnc
+ffor i inn rangee(12):
+    prrint(add(i, 1))
+    prrint(add("s", i))
+    prrint(add(i, 0.5))
+    prrint(add(Tru, i) < i)
+endfr
+""",
+}
+
+
+# the source code of every program the engines are compared on, by name
+def all_programs() -> Dict[str, str]:
+    programs = {path.name: path.read_text() for path in sorted(EXAMPLES_DIRECTORY.glob("*.yp"))}
+    programs.update(PROGRAMS)
+    return programs
+
+
+# run a program with an engine, returning what it printed and the message of the error it stopped with, if any
+def run(code: str, engine: str, **options) -> Tuple[str, Optional[str]]:
+    output = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(output):
+        try:
+            program = Optimizer().optimize(Parser(Lexer(code).tokenize()).parse())
+            create_interpreter(engine, **options).interpret(program)
+        except Exception as e:
+            error = str(e)
+    return output.getvalue(), error
+
+
+# check that an engine, or the tree engine with some options, prints the same and stops with the same error as the
+# tree engine does by default
+def assert_matches_tree(code: str, engine: str = DEFAULT_ENGINE, **options):
+    assert run(code, engine, **options) == run(code, DEFAULT_ENGINE)
+
+
+# the examples are meant to run without errors, so an error in the tree engine is a bug in itself
+@pytest.mark.parametrize("name", [path.name for path in sorted(EXAMPLES_DIRECTORY.glob("*.yp"))])
+def test_example_runs_without_errors(name: str):
+    output, error = run((EXAMPLES_DIRECTORY / name).read_text(), DEFAULT_ENGINE)
+    assert error is None
+    assert output
+
+
+@pytest.mark.parametrize("name", all_programs())
+def test_closure_engine_matches_tree(name: str):
+    assert_matches_tree(all_programs()[name], "closure")
+
+
+@pytest.mark.parametrize("name", all_programs())
+def test_bytecode_engine_matches_tree(name: str):
+    assert_matches_tree(all_programs()[name], "bytecode")
+
+
+@pytest.mark.parametrize("name", all_programs())
+def test_stackless_engine_matches_tree(name: str):
+    assert_matches_tree(all_programs()[name], "stackless")
+
+
+# the stackless engine never nests Python calls, so recursion is only limited by its stack memory
+def test_stackless_engine_recurses_deeply():
+    code = "deff depth(n):\n    fi n == 0:\n        retrn 0\n    endiff\n    retrn 1 + depth(n - 1)\nendfnc\n"
+    code += "prrint(depth(50000))\n"
+    assert run(code, "stackless") == ("50000\n", None)
+    assert run(code, "stackless", stack_memory=2**10)[1].startswith("maximum recursion depth exceeded")
+
+
+@pytest.mark.parametrize("name", all_programs())
+def test_python_engine_matches_tree(name: str):
+    assert_matches_tree(all_programs()[name], "python")
+
+
+@pytest.mark.parametrize("name", all_programs())
+def test_no_tco_matches_tree(name: str):
+    assert_matches_tree(all_programs()[name], tail_calls=False)
+
+
+# a tail call of a function to itself reuses its call, so it can recurse far past the recursion limit
+def test_tail_calls_do_not_nest():
+    code = PROGRAMS["tail calls"].replace("total(100, 0)", "total(20000, 0)")
+    assert run(code, DEFAULT_ENGINE) == ("200010000\n", None)
+    assert "recursion" in run(code, DEFAULT_ENGINE, tail_calls=False)[1]
+
+
+@pytest.mark.parametrize("name", all_programs())
+def test_memoize_matches_tree(name: str):
+    assert_matches_tree(all_programs()[name], memoize=True)
+
+
+# integers are exact however large they get, and only become floats when divided or mixed with one
+def test_exact_integers():
+    assert run(PROGRAMS["exact integers"], DEFAULT_ENGINE) == (
+        "265252859812191058636308480000000\n120.0\n3.5\nababab\n",
+        None,
+    )
+
+
+@pytest.mark.parametrize("name", all_programs())
+def test_no_quicken_matches_tree(name: str):
+    assert_matches_tree(all_programs()[name], quicken=False)
+
+
+# operations specialize themselves as the program runs, and only when quickening is on
+def test_quickening_specializes_operations():
+    program = Optimizer().optimize(Parser(Lexer(PROGRAMS["changing operand types"]).tokenize()).parse())
+    for quicken in (True, False):
+        interpreter = create_interpreter(DEFAULT_ENGINE, quicken=quicken)
+        with contextlib.redirect_stdout(io.StringIO()):
+            interpreter.interpret(program)
+        assert bool(interpreter.specialization_counts) == quicken
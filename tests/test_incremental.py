@@ -0,0 +1,177 @@
+import random
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from pyhton.core.incremental import IncrementalDocument, split_lines
+from pyhton.core.lexer import Lexer
+from pyhton.core.parser import Parser
+
+EXAMPLES_DIRECTORY = Path(__file__).resolve().parent.parent / "examples"
+
+PROGRAM = """x = 1
+deff add(a, b):
+    total = a + b
+    retrn total
+endfnc
+
+fi x > 0:
+    prrint(add(x, 2))
+endiff
+prrint("done")
+"""
+
+
+# the program and tokens of a full lex and parse of some code, or the message of the error it fails with
+def full_parse(code: str):
+    try:
+        return Parser(Lexer(code).tokenize()).parse(), Lexer(code).tokenize()
+    except Exception as e:
+        return str(e)
+
+
+# the program and tokens of a document, or the message of the error it fails with
+def document_parse(document: IncrementalDocument):
+    try:
+        return document.program(), document.tokens()
+    except Exception as e:
+        return str(e)
+
+
+# record which lines a document lexes and which blocks it parses
+@pytest.fixture
+def work(monkeypatch) -> Tuple[List[str], List[Tuple[int, int]]]:
+    lexed_lines: List[str] = []
+    parsed_blocks: List[Tuple[int, int]] = []
+    lex_line = IncrementalDocument._lex_line
+    parse_block = IncrementalDocument._parse_block
+
+    def recording_lex_line(self, text, line):
+        lexed_lines.append(text)
+        return lex_line(self, text, line)
+
+    def recording_parse_block(self, start, stop):
+        parsed_blocks.append((start, stop))
+        return parse_block(self, start, stop)
+
+    monkeypatch.setattr(IncrementalDocument, "_lex_line", recording_lex_line)
+    monkeypatch.setattr(IncrementalDocument, "_parse_block", recording_parse_block)
+    return lexed_lines, parsed_blocks
+
+
+def test_split_lines():
+    assert split_lines("") == []
+    assert split_lines("a\nb") == ["a\n", "b"]
+    assert split_lines("a\n\n") == ["a\n", "\n"]
+    assert split_lines("a\r\nb\r") == ["a\r\n", "b\r"]
+
+
+@pytest.mark.parametrize("path", sorted(EXAMPLES_DIRECTORY.glob("*.yp")), ids=lambda path: path.name)
+def test_loading_matches_full_parse(path):
+    code = path.read_text()
+    document = IncrementalDocument(code)
+    assert document.code == code
+    assert document_parse(document) == full_parse(code)
+
+
+# typing in a function body only lexes the edited line and only parses the function again
+def test_edit_in_a_block(work):
+    lexed_lines, parsed_blocks = work
+    document = IncrementalDocument(PROGRAM)
+    lexed_lines.clear()
+    parsed_blocks.clear()
+
+    document.edit(2, 16, 2, 17, "b * 2")
+    assert document.lines[2] == "    total = a + b * 2\n"
+    assert lexed_lines == ["    total = a + b * 2\n"]
+    assert parsed_blocks == [(1, 5)]
+    assert document_parse(document) == full_parse(document.code)
+
+
+def test_edit_of_a_top_level_statement(work):
+    lexed_lines, parsed_blocks = work
+    document = IncrementalDocument(PROGRAM)
+    lexed_lines.clear()
+    parsed_blocks.clear()
+
+    document.edit(9, 8, 9, 12, "all done")
+    assert lexed_lines == ['prrint("all done")\n']
+    assert parsed_blocks == [(9, 10)]
+    assert document_parse(document) == full_parse(document.code)
+
+
+# inserting lines moves the blocks after them, without parsing them again
+def test_inserting_lines(work):
+    lexed_lines, parsed_blocks = work
+    document = IncrementalDocument(PROGRAM)
+    lexed_lines.clear()
+    parsed_blocks.clear()
+
+    assert document.block_starts == [0, 1, 5, 6, 9]
+    document.edit(0, 5, 0, 5, "\ny = 2\nz = 3")
+    assert lexed_lines == ["x = 1\n", "y = 2\n", "z = 3\n"]
+    assert parsed_blocks == [(0, 1), (1, 2), (2, 3)]
+    assert document.block_starts == [0, 1, 2, 3, 7, 8, 11]
+    assert document_parse(document) == full_parse(document.code)
+
+
+# opening a block joins the lines after it into the block, until it is closed again
+def test_opening_and_closing_a_block():
+    document = IncrementalDocument(PROGRAM)
+    document.edit(9, 0, 9, 0, "whiel x < 3:\n    x = x + 1\n")
+    assert document_parse(document) == full_parse(document.code)
+    assert isinstance(document_parse(document), str)  # the while loop is never closed
+
+    document.edit(11, 0, 11, 0, "endwhle\n")
+    assert document.error is None
+    assert document_parse(document) == full_parse(document.code)
+
+
+# a string that runs over several lines, and a correctly spelled keyword, can't be handled line by line, so the
+# document falls back to a full lex and parse until they are gone
+@pytest.mark.parametrize("text", ['"open', "print", "endfnc", "deff f():"])
+def test_edits_that_need_a_full_parse(text):
+    document = IncrementalDocument(PROGRAM)
+    document.edit(0, 5, 0, 5, text)
+    assert document_parse(document) == full_parse(document.code)
+
+    document.edit(0, 5, 0, 5 + len(text), "")
+    assert document.code == PROGRAM
+    assert document.error is None
+    assert document_parse(document) == full_parse(PROGRAM)
+
+
+# after any sequence of edits, the document must still be the same as a full lex and parse of its code
+def test_random_edits_match_full_parse():
+    rng = random.Random(10)
+    pieces = ["x", " ", "1", "\n", "fi x:\n", "endiff\n", "deff f(a):\n", "retrn a\n", "endfnc\n", '"', "print", "+"]
+    pieces += ["ffor i inn rangee(2):\n", "endfr\n", "prrint(x)\n", "# note\n", "\t", ":"]
+    document = IncrementalDocument(PROGRAM)
+
+    for _ in range(400):
+        # (there is an empty line after the last one only if it ends with a newline)
+        last_line = (
+            len(document.lines) if document.code.endswith("\n") or not document.lines else len(document.lines) - 1
+        )
+        start_line = rng.randint(0, last_line)
+        start_character = rng.randint(0, len(document._line_text(start_line).rstrip("\n")))
+        end_line, end_character = start_line, start_character
+        if rng.random() < 0.4:
+            end_line = rng.randint(start_line, min(start_line + 2, last_line))
+            end_limit = len(document._line_text(end_line).rstrip("\n"))
+            end_character = rng.randint(start_character if end_line == start_line else 0, end_limit)
+
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 3)))
+        document.edit(start_line, start_character, end_line, end_character, text)
+        assert document_parse(document) == full_parse(document.code), document.code
+
+
+def test_edit_outside_the_document():
+    document = IncrementalDocument("x = 1\n")
+    with pytest.raises(Exception, match="Line 3 is outside the document"):
+        document.edit(3, 0, 3, 0, "y")
+    with pytest.raises(Exception, match="Character 6 is outside line 0"):
+        document.edit(0, 6, 0, 6, "y")
+    with pytest.raises(Exception, match="The end of an edit cannot be before its start"):
+        document.edit(0, 3, 0, 1, "y")
@@ -0,0 +1,132 @@
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+from pyhton.cli import cli
+from pyhton.cli.file_runner import check_pyhton_file, run_pyhton_file
+from pyhton.core.interpreter import Interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.parser import FunctionDef, LazyFunctionDef, Parser
+
+EXAMPLES_DIRECTORY = Path(__file__).resolve().parent.parent / "examples"
+
+# a program with a syntax error in the body of a function, which is only called after something is printed
+BROKEN_PROGRAM = """deff broken(a):
+    retrn a +
+endfnc
+prrint("before")
+prrint(broken(1))
+prrint("after")
+"""
+
+SYNTAX_ERROR = "Unexpected token: Token(type=<TokenType.NEWLINE: 'NEWLINE'>, value='\\n', line=2, column=14"
+
+
+def parse(code: str, lazy_functions: bool):
+    return Parser(Lexer(code).tokenize(), lazy_functions=lazy_functions).parse()
+
+
+# what a program prints, and the message of the error it stops with, if any
+def run(code: str, lazy_functions: bool):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            Interpreter().interpret(parse(code, lazy_functions))
+        except Exception as e:
+            return output.getvalue(), str(e)
+    return output.getvalue(), None
+
+
+def test_function_bodies_are_kept_as_tokens():
+    program = parse("deff f(a):\n    deff g():\n    endfnc\n    retrn a\nendfnc\nprrint(f(1))\n", lazy_functions=True)
+    function = program.statements[0]
+    assert isinstance(function, LazyFunctionDef)
+    assert function.params == ("a",)
+    assert function.body_tokens[-1].value == "endfnc"  # the closing endfnc of f, not the one of g
+    assert len([token for token in function.body_tokens if token.value == "endfnc"]) == 2
+
+
+def test_functions_are_parsed_eagerly_by_default():
+    assert isinstance(parse("deff f(a):\n    retrn a\nendfnc\n", lazy_functions=False).statements[0], FunctionDef)
+
+
+@pytest.mark.parametrize("path", sorted(EXAMPLES_DIRECTORY.glob("*.yp")), ids=lambda path: path.name)
+def test_lazy_functions_run_the_same(path):
+    code = path.read_text()
+    assert run(code, lazy_functions=True) == run(code, lazy_functions=False)
+
+
+# the syntax error in a lazily parsed body is only raised when the function is first called
+def test_syntax_error_is_raised_when_the_function_is_called():
+    with pytest.raises(Exception, match="Unexpected token"):
+        parse(BROKEN_PROGRAM, lazy_functions=False)
+
+    output, error = run(BROKEN_PROGRAM, lazy_functions=True)
+    assert output == "before\n"
+    assert error.startswith(SYNTAX_ERROR)
+
+
+def test_syntax_error_in_a_function_that_is_never_called():
+    code = BROKEN_PROGRAM.replace("prrint(broken(1))\n", "")
+    assert run(code, lazy_functions=True) == ("before\nafter\n", None)
+
+
+def test_running_a_file_lazily(tmp_path, capsys):
+    path = tmp_path / "broken.yp"
+    path.write_text(BROKEN_PROGRAM)
+
+    run_pyhton_file(str(path), lazy_functions=True)
+    output = capsys.readouterr().out
+    assert output.startswith("before\n")
+    assert SYNTAX_ERROR in output and "after" not in output
+
+
+# checking a file parses every function body, so it finds the error without running anything
+def test_check_reports_syntax_errors_in_function_bodies(tmp_path, capsys):
+    path = tmp_path / "broken.yp"
+    path.write_text(BROKEN_PROGRAM)
+
+    assert not check_pyhton_file(str(path))
+    output = capsys.readouterr().out
+    assert SYNTAX_ERROR in output
+    assert "before" not in output
+
+
+def test_check_without_errors(tmp_path, capsys):
+    path = tmp_path / "fixed.yp"
+    path.write_text(BROKEN_PROGRAM.replace("a +", "a + 1"))
+
+    assert check_pyhton_file(str(path))
+    output = capsys.readouterr().out
+    assert output.endswith("no syntax errors in 4 statement(s)\n")
+    assert "before" not in output
+
+
+def test_check_missing_file(tmp_path, capsys):
+    assert not check_pyhton_file(str(tmp_path / "missing.yp"))
+    assert "not found" in capsys.readouterr().out
+
+
+def test_check_command(tmp_path, capsys, monkeypatch):
+    path = tmp_path / "broken.yp"
+    path.write_text(BROKEN_PROGRAM)
+
+    monkeypatch.setattr(sys, "argv", ["pyhton", "--check", str(path)])
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main()
+    assert exit_info.value.code == 1
+    assert SYNTAX_ERROR in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("flag", ["--lazy", "--stream", "--debug", "--compact-tokens"])
+def test_check_cannot_be_combined(flag, tmp_path, capsys, monkeypatch):
+    path = tmp_path / "broken.yp"
+    path.write_text(BROKEN_PROGRAM)
+
+    monkeypatch.setattr(sys, "argv", ["pyhton", "--check", flag, str(path)])
+    with pytest.raises(SystemExit):
+        cli.main()
+    assert "--check cannot be combined with --debug, --stream, --lazy or --compact-tokens" in capsys.readouterr().out
@@ -0,0 +1,262 @@
+import io
+import mmap
+import random
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import pytest
+
+from pyhton.cli.file_runner import close_source_file, map_source_file
+from pyhton.core.lexer import IDENTIFIER_TOKEN_TYPES, KEYWORD_TOKEN_TYPES, Lexer, Token, TokenType
+from pyhton.core.parser import Parser
+from pyhton.language.typo_engine import TypoEngine
+
+EXAMPLES_DIRECTORY = Path(__file__).resolve().parent.parent / "examples"
+
+# sources covering what the examples don't: tabs, every operator, odd numbers, unterminated strings, characters
+# outside of ascii (which the regex scanners leave to the character scanner) and characters that are not tokens
+SOURCES = {
+    "tabs and comments": 'x = 1\t# a comment\n\tfi x >= 1:\n\t\tprrint("tab\there")  # ﬁ\n\tendiff\n',
+    "operators": "a=b==c!=d<e<=f>g>=h+i-j*k/l\n(a, b): c\n",
+    "numbers": "x = 12 + 3.5 + 1.2.3 + 007.\n",
+    "unterminated string": 'prrint("never closed\nstill the string',
+    "unicode": 'naïve = "ça va"  # ünïcode\nprrint(naïve, x²)\nyy = ٣ + 1\n\tζ2 = naïve\n',
+    "unknown characters": "x = 1 $ 2 @ ~ ! ; \\\n",
+    "carriage returns": "x = 1\r\nprrint(x)\r\n",
+    "no final newline": "prrint(1)",
+    "empty": "",
+    "only whitespace": "  \t \n\n  \t",
+}
+
+# sources with a correctly spelled keyword, which stops the lexer with an error once it reaches it
+ERROR_SOURCES = {
+    "correct keyword": "x = 1\nfi x:\n    print(x)\nendiff\n",
+    "correct word after unicode": 'naïve = "é"\n\tdef f():\n',
+    "correct word at the end": "prrint(1)\nreturn",
+}
+
+
+# the pieces random sources are made of
+FRAGMENTS = 'prrint fi x naïve ζ 12 3.5 ٣ "str" "open #c == = != ! <= < >= > + - * / ( ) : , $ _ x² print'.split() + [
+    " ",
+    "  ",
+    "\t",
+    "\n",
+    "\r",
+]
+
+
+# every source the lexer is tested on, by name
+def all_sources() -> dict:
+    sources = {path.name: path.read_text() for path in sorted(EXAMPLES_DIRECTORY.glob("*.yp"))}
+    sources.update(SOURCES)
+    sources.update(ERROR_SOURCES)
+    return sources
+
+
+# random sources made of fragments that run into each other, some of them with correctly spelled words
+def random_sources(count: int) -> List[str]:
+    rng = random.Random(6)
+    return ["".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 40))) for _ in range(count)]
+
+
+# run a lexer until it reaches the end or fails, returning the tokens it made and the message of the error, if any
+def lex(tokens: Iterable[Token]) -> Tuple[List[Token], Optional[str]]:
+    lexed = []
+    try:
+        for token in tokens:
+            lexed.append(token)
+    except Exception as e:
+        return lexed, str(e)
+    return lexed, None
+
+
+# the tokens the original character scanner makes, and the error it stops with, which every other scanner must match
+def char_scanner_tokens(code: str) -> Tuple[List[Token], Optional[str]]:
+    return lex(Lexer(code, scanner="char").iter_tokens())
+
+
+@pytest.mark.parametrize("name", all_sources())
+def test_identifiers_are_classified_like_the_typo_engine(name: str):
+    typo_engine = TypoEngine()
+    tokens, _ = lex(Lexer(all_sources()[name]).iter_tokens())
+    for token in tokens:
+        if token.type in IDENTIFIER_TOKEN_TYPES:
+            original_word = typo_engine.find_original_word(token.value)
+            assert token.type == KEYWORD_TOKEN_TYPES.get(original_word, TokenType.IDENTIFIER)
+            assert token.original_word == (original_word if token.type == TokenType.BOOLEAN else None)
+
+
+def test_identifiers_are_interned():
+    code = "".join(f"{name} = {name} + 1\n" for name in ["total", "count", "total", "prrint", "total"])
+    tokens = [token for token in Lexer(code).tokenize() if token.value == "total"]
+    assert len(tokens) == 6
+    assert all(token.value is tokens[0].value for token in tokens)
+
+
+def test_each_spelling_is_classified_once(monkeypatch):
+    classified = []
+    classify_identifier = Lexer._classify_identifier
+
+    def counting_classify_identifier(self, value):
+        classified.append(value)
+        return classify_identifier(self, value)
+
+    monkeypatch.setattr(Lexer, "_classify_identifier", counting_classify_identifier)
+    lexer = Lexer("x = x + 1\nprrint(x)\nprrint(y)\n")
+    lexer.tokenize()
+
+    assert classified == ["x", "prrint", "y"]
+    assert lexer.identifier_count == 6
+    assert lexer.identifier_hit_rate() == 0.5
+
+
+def test_hit_rate_without_identifiers():
+    lexer = Lexer("1 + 2\n")
+    lexer.tokenize()
+    assert lexer.identifier_hit_rate() == 0.0
+
+
+# a correctly spelled word is never added to the intern table, so every use of it is an error
+def test_correctly_spelled_words_are_not_interned():
+    lexer = Lexer("print")
+    with pytest.raises(Exception, match="'print' is spelled correctly. It must be a typo."):
+        lexer.tokenize()
+    assert lexer.identifier_table == {}
+
+
+@pytest.mark.parametrize("name", all_sources())
+def test_regex_scanner_matches_char_scanner(name: str):
+    code = all_sources()[name]
+    assert lex(Lexer(code, scanner="regex").iter_tokens()) == char_scanner_tokens(code)
+
+
+def test_regex_scanner_matches_char_scanner_on_random_sources():
+    for code in random_sources(500):
+        assert lex(Lexer(code).iter_tokens()) == char_scanner_tokens(code), code
+
+
+def test_unknown_scanner():
+    with pytest.raises(Exception, match="Unknown scanner: table"):
+        Lexer("x", scanner="table")
+
+
+# chunk sizes small enough to split every kind of token, and the whitespace before it, between two chunks
+CHUNK_SIZES = [1, 2, 3, 5, 16, 4096]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("name", all_sources())
+def test_chunked_file_matches_char_scanner(name: str, chunk_size: int):
+    code = all_sources()[name]
+    assert lex(Lexer(io.StringIO(code), chunk_size=chunk_size).iter_tokens()) == char_scanner_tokens(code)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES[:4])
+def test_chunked_file_matches_char_scanner_on_random_sources(chunk_size: int):
+    for code in random_sources(200):
+        assert lex(Lexer(io.StringIO(code), chunk_size=chunk_size).iter_tokens()) == char_scanner_tokens(code), code
+
+
+# statements parsed from a stream of tokens are the same as the statements of the whole program
+def test_streamed_statements_match_whole_program():
+    for path in sorted(EXAMPLES_DIRECTORY.glob("*.yp")):
+        code = path.read_text()
+        streamed = Parser(Lexer(io.StringIO(code), chunk_size=5).iter_tokens()).iter_statements()
+        assert tuple(streamed) == Parser(Lexer(code).tokenize()).parse().statements
+
+
+def test_char_scanner_needs_a_string():
+    with pytest.raises(Exception, match="The char scanner can only read source code from a string"):
+        Lexer(io.StringIO("x"), scanner="char").tokenize()
+
+
+@pytest.mark.parametrize("name", all_sources())
+def test_bytes_match_char_scanner(name: str):
+    code = all_sources()[name]
+    assert lex(Lexer(code.encode("utf-8")).iter_tokens()) == char_scanner_tokens(code)
+
+
+def test_bytes_match_char_scanner_on_random_sources():
+    for code in random_sources(500):
+        assert lex(Lexer(code.encode("utf-8")).iter_tokens()) == char_scanner_tokens(code), code
+
+
+# a mapped file is lexed in place, except for the files map_source_file reads as text instead
+@pytest.mark.parametrize("name", all_sources())
+def test_mapped_file_matches_char_scanner(name: str, tmp_path):
+    path = tmp_path / "program.yp"
+    path.write_bytes(all_sources()[name].encode("utf-8"))
+
+    source = map_source_file(str(path))
+    try:
+        assert lex(Lexer(source).iter_tokens()) == char_scanner_tokens(path.read_text())
+    finally:
+        close_source_file(source)
+
+
+def test_map_source_file(tmp_path):
+    path = tmp_path / "program.yp"
+    path.write_bytes(b"prrint(1)\n")
+    source = map_source_file(str(path))
+    assert isinstance(source, mmap.mmap)
+    assert source[:] == b"prrint(1)\n"
+    close_source_file(source)
+
+
+# an empty file can't be mapped, so it is read as an empty string
+def test_map_source_file_empty(tmp_path):
+    path = tmp_path / "empty.yp"
+    path.write_bytes(b"")
+    assert map_source_file(str(path)) == ""
+
+
+# reading a file as text turns its \r line endings into \n, which the mapped bytes would keep
+def test_map_source_file_carriage_returns(tmp_path):
+    path = tmp_path / "windows.yp"
+    path.write_bytes(b"x = 1\r\nprrint(x)\rprrint(2)\n")
+    assert map_source_file(str(path)) == "x = 1\nprrint(x)\nprrint(2)\n"
+
+
+# the tokens of a compact token stream, made by iterating and by indexing it, or the error making it stopped with
+def compact_tokens(code: str) -> Tuple[Optional[List[Token]], Optional[str]]:
+    try:
+        stream = Lexer(code).tokenize_compact()
+    except Exception as e:
+        return None, str(e)
+
+    tokens = list(stream)
+    assert [stream[index] for index in range(len(stream))] == tokens
+    assert [stream.token_type(index) for index in range(len(stream))] == [token.type for token in tokens]
+    return tokens, None
+
+
+# a compact stream is only returned once the whole source is lexed, so for a source with an error only the
+# error can be compared
+@pytest.mark.parametrize("name", all_sources())
+def test_compact_tokens_match_char_scanner(name: str):
+    code = all_sources()[name]
+    tokens, error = char_scanner_tokens(code)
+    assert compact_tokens(code) == (None if error else tokens, error)
+
+
+def test_compact_tokens_match_char_scanner_on_random_sources():
+    for code in random_sources(500):
+        tokens, error = char_scanner_tokens(code)
+        assert compact_tokens(code) == (None if error else tokens, error), code
+
+
+def test_compact_tokens_share_interned_identifiers():
+    stream = Lexer("total = total + 1\n").tokenize_compact()
+    assert stream[0].value is stream[2].value
+
+
+def test_parsing_compact_tokens():
+    for path in sorted(EXAMPLES_DIRECTORY.glob("*.yp")):
+        code = path.read_text()
+        assert Parser(Lexer(code).tokenize_compact()).parse() == Parser(Lexer(code).tokenize()).parse()
+
+
+def test_compact_tokens_need_a_string():
+    with pytest.raises(Exception, match="Compact token streams can only be made from source code in a string"):
+        Lexer(b"x").tokenize_compact()
@@ -0,0 +1,153 @@
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+from pyhton.core.interpreter import Interpreter
+from pyhton.core.lexer import Lexer
+from pyhton.core.optimizer import Optimizer
+from pyhton.core.parser import Parser, Program
+
+EXAMPLES_DIRECTORY = Path(__file__).resolve().parent.parent / "examples"
+
+
+def parse(code: str) -> Program:
+    return Parser(Lexer(code).tokenize()).parse()
+
+
+def optimize(code: str) -> Program:
+    return Optimizer().optimize(parse(code))
+
+
+# what a program prints, and the message of the error it stops with, if any
+def run(program: Program):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            Interpreter().interpret(program)
+        except Exception as e:
+            return output.getvalue(), str(e)
+    return output.getvalue(), None
+
+
+@pytest.mark.parametrize(
+    "code, folded",
+    [
+        ("x = 1 + 2 * 3", "x = 7"),
+        ("x = (1 + 2) * 3 - 4", "x = 5"),
+        ("x = 7 / 2", "x = 3.5"),
+        ("x = 1.5 * 2", "x = 3.0"),
+        ("x = 0.1 + 0.2", f"x = {0.1 + 0.2}"),
+        ("x = y + (1 + 2)", "x = y + 3"),
+        ("prrint(2 * 21)", "prrint(42)"),
+        ("x = f(1 + 1, y * (2 - 1))", "x = f(2, y * 1)"),
+    ],
+)
+def test_folding_numbers(code: str, folded: str):
+    assert optimize(code) == parse(folded)
+
+
+@pytest.mark.parametrize(
+    "code, folded",
+    [
+        ('x = "ab" + "cd"', 'x = "abcd"'),
+        ('x = "n" + 1', 'x = "n1"'),
+        ('x = 2.5 + "s"', 'x = "2.5s"'),
+        ('x = "ab" * 3', 'x = "ababab"'),
+        ('x = "a" == "a"', "x = Tru"),
+    ],
+)
+def test_folding_strings(code: str, folded: str):
+    assert optimize(code) == parse(folded)
+
+
+# repeating a string into one longer than MAX_FOLDED_STRING_LENGTH is left to run time
+@pytest.mark.parametrize("code", ['x = "ab" * 513', 'x = 2000 * "a"', 'x = "a" * 1000000000'])
+def test_long_repetitions_are_not_folded(code: str):
+    assert optimize(code) == parse(code)
+
+
+def test_longest_folded_repetition():
+    assert optimize('x = "ab" * 512') == parse(f'x = "{"ab" * 512}"')
+
+
+@pytest.mark.parametrize(
+    "code, folded",
+    [
+        ("x = 1 < 2 annd nott Fals", "x = Tru"),
+        ("x = 3 >= 4 orr 2 != 2", "x = Fals"),
+        ("x = nott nott 0", "x = Fals"),
+        # the right side of a short circuit is never run, so it doesn't have to be constant
+        ("x = Tru orr y", "x = Tru"),
+        ("x = 0 annd f(y)", "x = Fals"),
+        ("x = Tru annd y", "x = Tru annd y"),
+    ],
+)
+def test_folding_comparisons_and_logic(code: str, folded: str):
+    assert optimize(code) == parse(folded)
+
+
+# an operation that fails is left in the program, so that it still fails when (and only if) it runs
+@pytest.mark.parametrize("code", ["x = 1 / 0", "x = 2 + 1 / 0", 'x = "a" - 1', 'x = "a" * "b"', "x = 1 / (2 - 2)"])
+def test_errors_are_left_to_run_time(code: str):
+    program = optimize(code)
+    assert program == parse(code.replace("(2 - 2)", "0"))
+    assert run(program) == run(parse(code))
+    assert run(program)[1] is not None
+
+
+def test_error_in_a_branch_that_never_runs():
+    assert run(optimize("fi Fals:\n    x = 1 / 0\nendiff\nprrint(1)\n")) == ("1\n", None)
+
+
+@pytest.mark.parametrize(
+    "code, optimized",
+    [
+        ("fi 1 < 2:\n    prrint(1)\nese:\n    prrint(2)\nendiff\n", "prrint(1)"),
+        ("fi 1 > 2:\n    prrint(1)\nese:\n    prrint(2)\nendiff\n", "prrint(2)"),
+        ("fi Fals:\n    prrint(1)\nendiff\nprrint(3)\n", "prrint(3)"),
+        # a branch that is always taken becomes the else branch, and the branches after it are dropped
+        (
+            "fi x:\n    prrint(1)\nelfi Tru:\n    prrint(2)\nelfi y:\n    prrint(3)\nendiff\n",
+            "fi x:\n    prrint(1)\nese:\n    prrint(2)\nendiff\n",
+        ),
+        # a branch that is never taken is dropped
+        (
+            "fi x:\n    prrint(1)\nelfi 0:\n    prrint(2)\nelfi y:\n    prrint(3)\nendiff\n",
+            "fi x:\n    prrint(1)\nelfi y:\n    prrint(3)\nendiff\n",
+        ),
+        ("fi Fals:\n    prrint(1)\nelfi x:\n    prrint(2)\nendiff\n", "fi x:\n    prrint(2)\nendiff\n"),
+        # branches inside the bodies of other statements are simplified too
+        (
+            "deff f(a):\n    fi 2 > 1:\n        retrn a\n    endiff\nendfnc\n",
+            "deff f(a):\n    retrn a\nendfnc\n",
+        ),
+    ],
+)
+def test_removing_if_branches(code: str, optimized: str):
+    assert optimize(code) == parse(optimized)
+
+
+@pytest.mark.parametrize(
+    "code, optimized",
+    [
+        ("whiel Fals:\n    prrint(1)\nendwhle\nprrint(2)\n", "prrint(2)"),
+        ("whiel 1 > 2:\n    prrint(1)\nendwhle\n", ""),
+        ("whiel x < 1 + 1:\n    x = x + 1\nendwhle\n", "whiel x < 2:\n    x = x + 1\nendwhle\n"),
+        ("whiel Tru:\n    retrn 1\nendwhle\n", "whiel Tru:\n    retrn 1\nendwhle\n"),
+    ],
+)
+def test_removing_while_loops(code: str, optimized: str):
+    assert optimize(code) == parse(optimized)
+
+
+def test_removing_statements_after_a_return():
+    code = "deff f(a):\n    retrn a\n    prrint(a)\nendfnc\nprrint(f(1))\nretrn 2\nprrint(3)\n"
+    assert optimize(code) == parse("deff f(a):\n    retrn a\nendfnc\nprrint(f(1))\nretrn 2\n")
+
+
+@pytest.mark.parametrize("path", sorted(EXAMPLES_DIRECTORY.glob("*.yp")), ids=lambda path: path.name)
+def test_optimized_examples_run_the_same(path):
+    program = parse(path.read_text())
+    assert run(Optimizer().optimize(program)) == run(program)
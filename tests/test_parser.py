@@ -0,0 +1,162 @@
+import random
+from typing import List
+
+import pytest
+
+from pyhton.core.lexer import Lexer, TokenType
+from pyhton.core.parser import (
+    BinaryOp,
+    ComparisonOp,
+    Identifier,
+    IntegerLiteral,
+    LogicalOp,
+    Parser,
+    UnaryOp,
+)
+
+
+# the original parser, with one method per precedence level, which the precedence climbing parser must match
+class ChainedParser(Parser):
+    def _expression(self):
+        return self._logical_or()
+
+    def _logical_or(self):
+        expr = self._logical_and()
+        while self._match(TokenType.OR):
+            operator = self._previous().value
+            right = self._logical_and()
+            expr = LogicalOp(expr, operator, right, "or")
+        return expr
+
+    def _logical_and(self):
+        expr = self._equality()
+        while self._match(TokenType.AND):
+            operator = self._previous().value
+            right = self._equality()
+            expr = LogicalOp(expr, operator, right, "and")
+        return expr
+
+    def _equality(self):
+        expr = self._comparison()
+        while self._match(TokenType.EQUALS, TokenType.NOT_EQUALS):
+            operator = self._previous().value
+            right = self._comparison()
+            expr = ComparisonOp(expr, operator, right)
+        return expr
+
+    def _comparison(self):
+        expr = self._addition()
+        while self._match(TokenType.GREATER_THAN, TokenType.GREATER_EQUAL, TokenType.LESS_THAN, TokenType.LESS_EQUAL):
+            operator = self._previous().value
+            right = self._addition()
+            expr = ComparisonOp(expr, operator, right)
+        return expr
+
+    def _addition(self):
+        expr = self._multiplication()
+        while self._match(TokenType.PLUS, TokenType.MINUS):
+            operator = self._previous().value
+            right = self._multiplication()
+            expr = BinaryOp(expr, operator, right)
+        return expr
+
+    def _multiplication(self):
+        expr = self._unary()
+        while self._match(TokenType.MULTIPLY, TokenType.DIVIDE):
+            operator = self._previous().value
+            right = self._unary()
+            expr = BinaryOp(expr, operator, right)
+        return expr
+
+    def _unary(self):
+        if self._match(TokenType.NOT):
+            operator = self._previous().value
+            return UnaryOp(operator, self._unary())
+        return self._primary()
+
+
+# the expression of a single expression statement
+def expression(code: str):
+    return Parser(Lexer(code + "\n").tokenize()).parse().statements[0]
+
+
+# the program a parser makes from some code, or the message of the error it fails with
+def parse_with(parser_class, code: str):
+    try:
+        return parser_class(Lexer(code).tokenize()).parse()
+    except Exception as e:
+        return str(e)
+
+
+a, b, c, d = Identifier("a"), Identifier("b"), Identifier("c"), Identifier("d")
+
+
+@pytest.mark.parametrize(
+    "code, tree",
+    [
+        ("a - b - c", BinaryOp(BinaryOp(a, "-", b), "-", c)),
+        ("a / b / c", BinaryOp(BinaryOp(a, "/", b), "/", c)),
+        ("a - (b - c)", BinaryOp(a, "-", BinaryOp(b, "-", c))),
+        ("a + b * c", BinaryOp(a, "+", BinaryOp(b, "*", c))),
+        ("a * b + c * d", BinaryOp(BinaryOp(a, "*", b), "+", BinaryOp(c, "*", d))),
+        ("a - b * c / d", BinaryOp(a, "-", BinaryOp(BinaryOp(b, "*", c), "/", d))),
+        ("a == b == c", ComparisonOp(ComparisonOp(a, "==", b), "==", c)),
+        ("a < b == c > d", ComparisonOp(ComparisonOp(a, "<", b), "==", ComparisonOp(c, ">", d))),
+        (
+            "a + 1 >= b * 2",
+            ComparisonOp(BinaryOp(a, "+", IntegerLiteral(1)), ">=", BinaryOp(b, "*", IntegerLiteral(2))),
+        ),
+        ("nott a == b", ComparisonOp(UnaryOp("nott", a), "==", b)),
+        ("nott (a == b)", UnaryOp("nott", ComparisonOp(a, "==", b))),
+        ("nott nott a", UnaryOp("nott", UnaryOp("nott", a))),
+        ("nott a annd b", LogicalOp(UnaryOp("nott", a), "annd", b, "and")),
+        ("a orr b annd c", LogicalOp(a, "orr", LogicalOp(b, "annd", c, "and"), "or")),
+        ("a annd b orr c", LogicalOp(LogicalOp(a, "annd", b, "and"), "orr", c, "or")),
+        ("a orr b orr c", LogicalOp(LogicalOp(a, "orr", b, "or"), "orr", c, "or")),
+        ("a annd b annd c", LogicalOp(LogicalOp(a, "annd", b, "and"), "annd", c, "and")),
+        ("(a orr b) annd c", LogicalOp(LogicalOp(a, "orr", b, "or"), "annd", c, "and")),
+        ("a == b annd c != d", LogicalOp(ComparisonOp(a, "==", b), "annd", ComparisonOp(c, "!=", d), "and")),
+    ],
+)
+def test_precedence_and_associativity(code: str, tree):
+    assert expression(code) == tree
+    assert ChainedParser(Lexer(code + "\n").tokenize()).parse().statements[0] == tree
+
+
+# random expressions, some of them broken, must give the same tree or the same error as the chained parser
+def random_expressions(count: int) -> List[str]:
+    rng = random.Random(14)
+    operands = ["a", "b", "1", "2.5", '"s"', "Tru", "f(a, 1)", "(a + b)", "(a orr nott b)"]
+    operators = ["+", "-", "*", "/", "==", "!=", "<", "<=", ">", ">=", "annd", "orr"]
+    expressions = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, 8)):
+            parts.extend(["nott"] * rng.choice([0, 0, 0, 1, 2]))
+            parts.append(rng.choice(operands))
+            parts.append(rng.choice(operators))
+        if rng.random() < 0.8:
+            parts.pop()  # a trailing operator is a syntax error
+        if rng.random() < 0.1:
+            parts.insert(rng.randint(0, len(parts)), rng.choice(["(", ")", ","]))
+        expressions.append("x = " + " ".join(parts) + "\n")
+    return expressions
+
+
+def test_random_expressions_match_chained_parser():
+    for code in random_expressions(2000):
+        assert parse_with(Parser, code) == parse_with(ChainedParser, code), code
+
+
+# a run of nots is collected in a loop, so it does not hit the recursion limit the chained parser did
+def test_long_chain_of_nots():
+    tree = expression("nott " * 5000 + "a")
+    for _ in range(5000):
+        assert isinstance(tree, UnaryOp)
+        tree = tree.operand
+    assert tree == a
+
+
+def test_long_chain_of_operators():
+    tree = expression(" - ".join(["a"] * 5000))
+    assert tree.right == a and tree.left.right == a
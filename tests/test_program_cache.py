@@ -0,0 +1,144 @@
+import pickle
+from pathlib import Path
+
+import pytest
+
+from pyhton.cli import file_runner
+from pyhton.cli.file_runner import run_pyhton_file
+from pyhton.core import program_cache
+from pyhton.core.lexer import Lexer
+from pyhton.core.optimizer import Optimizer
+from pyhton.core.parser import Parser
+from pyhton.core.program_cache import (
+    PROGRAM_CACHE_MAGIC,
+    cache_file_path,
+    load_cached_program,
+    program_cache_key,
+    store_cached_program,
+)
+
+EXAMPLES_DIRECTORY = Path(__file__).resolve().parent.parent / "examples"
+
+PROGRAM = """deff square(n):
+    retrn n * n
+endfnc
+prrint(square(7))
+"""
+
+
+@pytest.fixture
+def source_file(tmp_path) -> Path:
+    path = tmp_path / "program.yp"
+    path.write_text(PROGRAM)
+    return path
+
+
+def parse(code: str):
+    return Optimizer().optimize(Parser(Lexer(code).tokenize()).parse())
+
+
+# stop files from being parsed, so only a cache hit can run them
+def forbid_parsing(monkeypatch):
+    def parse(self):
+        raise AssertionError("the file was parsed instead of loaded from the cache")
+
+    monkeypatch.setattr(file_runner.Parser, "parse", parse)
+
+
+def test_cache_file_path():
+    path = cache_file_path("some/dir/program.yp")
+    assert path.parent == Path("some/dir/__pycache__")
+    assert path.name.startswith("program.pyhton-") and path.suffix == ".ypc"
+
+
+@pytest.mark.parametrize("path", sorted(EXAMPLES_DIRECTORY.glob("*.yp")), ids=lambda path: path.name)
+def test_round_trip(path, tmp_path):
+    code = path.read_text()
+    filename = str(tmp_path / path.name)
+    key = program_cache_key(code)
+
+    assert load_cached_program(filename, key) is None
+    store_cached_program(filename, key, parse(code))
+    assert load_cached_program(filename, key) == parse(code)
+
+
+def test_key_changes_with_the_source():
+    assert program_cache_key(PROGRAM) == program_cache_key(PROGRAM.encode("utf-8"))
+    assert program_cache_key(PROGRAM) != program_cache_key(PROGRAM + "\n")
+
+
+def test_changed_source_is_not_loaded(source_file):
+    key = program_cache_key(PROGRAM)
+    store_cached_program(str(source_file), key, parse(PROGRAM))
+    assert load_cached_program(str(source_file), program_cache_key(PROGRAM.replace("7", "8"))) is None
+
+
+def test_changed_format_version_is_not_loaded(source_file, monkeypatch):
+    key = program_cache_key(PROGRAM)
+    store_cached_program(str(source_file), key, parse(PROGRAM))
+
+    monkeypatch.setattr(program_cache, "PROGRAM_CACHE_FORMAT_VERSION", program_cache.PROGRAM_CACHE_FORMAT_VERSION + 1)
+    monkeypatch.setattr(program_cache, "_environment_key", None)
+    new_key = program_cache_key(PROGRAM)
+    assert new_key != key
+    assert load_cached_program(str(source_file), new_key) is None
+
+
+# a cache file that is not a .ypc file, is cut short or does not hold a program is ignored
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        lambda data: b"",
+        lambda data: b"not a cache file",
+        lambda data: data[: len(PROGRAM_CACHE_MAGIC) + 10],
+        lambda data: data[:-20],
+        lambda data: data[:60] + b"\xff" * 20 + data[80:],
+        lambda data: data[: len(PROGRAM_CACHE_MAGIC) + 32] + pickle.dumps(["not", "a", "program"]),
+    ],
+    ids=["empty", "no magic", "truncated key", "truncated program", "garbled program", "not a program"],
+)
+def test_corrupt_cache_file_is_ignored(corrupt, source_file):
+    key = program_cache_key(PROGRAM)
+    store_cached_program(str(source_file), key, parse(PROGRAM))
+    cache_file = cache_file_path(str(source_file))
+    cache_file.write_bytes(corrupt(cache_file.read_bytes()))
+
+    assert load_cached_program(str(source_file), key) is None
+
+
+def test_running_a_file_uses_the_cache(source_file, capsys, monkeypatch):
+    run_pyhton_file(str(source_file))
+    assert capsys.readouterr().out == "49\n"
+    assert cache_file_path(str(source_file)).exists()
+
+    forbid_parsing(monkeypatch)
+    run_pyhton_file(str(source_file))
+    assert capsys.readouterr().out == "49\n"
+
+
+# a corrupt cache file falls back to a normal parse, which replaces it
+def test_running_a_file_with_a_corrupt_cache(source_file, capsys, monkeypatch):
+    run_pyhton_file(str(source_file))
+    cache_file = cache_file_path(str(source_file))
+    cache_file.write_bytes(cache_file.read_bytes()[:-20])
+    capsys.readouterr()
+
+    run_pyhton_file(str(source_file))
+    assert capsys.readouterr().out == "49\n"
+
+    forbid_parsing(monkeypatch)
+    run_pyhton_file(str(source_file))
+    assert capsys.readouterr().out == "49\n"
+
+
+def test_edited_file_is_parsed_again(source_file, capsys):
+    run_pyhton_file(str(source_file))
+    source_file.write_text(PROGRAM.replace("7", "8"))
+    run_pyhton_file(str(source_file))
+    assert capsys.readouterr().out == "49\n64\n"
+
+
+def test_no_cache(source_file, capsys):
+    run_pyhton_file(str(source_file), use_cache=False)
+    assert capsys.readouterr().out == "49\n"
+    assert not cache_file_path(str(source_file)).exists()
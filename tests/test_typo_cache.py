@@ -0,0 +1,137 @@
+import warnings
+
+import pytest
+
+from pyhton.language import typo_cache
+from pyhton.language.typo_cache import (
+    cache_directory,
+    load_typo_tables,
+    store_typo_tables,
+    typo_tables_fingerprint,
+)
+from pyhton.language.typo_engine import TYPO_MATCHERS, TypoEngine
+from pyhton.language.typo_trie import TYPO_RULES
+
+WORDS = ["print", "range", "while"]
+OTHER_WORDS = ["print", "range", "while", "return"]
+
+
+# forget the tables this process has loaded or built, as a new process would
+def forget_loaded_tables(monkeypatch):
+    monkeypatch.setattr(typo_cache, "_loaded_tables", {})
+
+
+# stop the engine from building its tables, so only a cache hit can create it
+def forbid_building(monkeypatch):
+    def build_tables(self):
+        raise AssertionError("the tables were built instead of loaded from the cache")
+
+    monkeypatch.setattr(TypoEngine, "_build_tables", build_tables)
+
+
+def test_cache_directory(monkeypatch, tmp_path, typo_cache_directory):
+    assert cache_directory() == typo_cache_directory
+
+    monkeypatch.delenv("PYHTON_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert cache_directory() == tmp_path / "pyhton"
+
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert cache_directory() == tmp_path / ".cache" / "pyhton"
+
+
+@pytest.mark.parametrize("matcher", TYPO_MATCHERS)
+def test_round_trip(matcher, typo_cache_directory, monkeypatch):
+    built = TypoEngine(WORDS, matcher=matcher)
+    assert [path.name for path in typo_cache_directory.iterdir()] == [
+        f"typo-{matcher}-{typo_tables_fingerprint(WORDS, matcher, TYPO_RULES)}.marshal"
+    ]
+
+    forget_loaded_tables(monkeypatch)
+    forbid_building(monkeypatch)
+    loaded = TypoEngine(WORDS, matcher=matcher)
+    for word in ["prrint", "rnage", "whiel", "x", "print", "total"]:
+        assert loaded.find_original_word(word) == built.find_original_word(word)
+
+
+def test_tables_are_shared_within_a_process(monkeypatch, typo_cache_directory):
+    TypoEngine(WORDS)
+    for path in typo_cache_directory.iterdir():
+        path.unlink()
+
+    forbid_building(monkeypatch)
+    assert TypoEngine(WORDS).find_original_word("prrint") == "print"
+
+
+def test_fingerprint_changes_with_what_the_tables_are_built_from():
+    fingerprint = typo_tables_fingerprint(WORDS, "index", TYPO_RULES)
+    assert fingerprint == typo_tables_fingerprint(reversed(WORDS), "index", TYPO_RULES)
+    assert fingerprint != typo_tables_fingerprint(OTHER_WORDS, "index", TYPO_RULES)
+    assert fingerprint != typo_tables_fingerprint(WORDS, "trie", TYPO_RULES)
+    assert fingerprint != typo_tables_fingerprint(WORDS, "index", TYPO_RULES[:2])
+
+
+# a changed vocabulary misses the cache and is rebuilt, without evicting the tables of the vocabulary before it
+def test_other_vocabularies_are_kept(monkeypatch, typo_cache_directory):
+    TypoEngine(WORDS)
+    engine = TypoEngine(OTHER_WORDS)
+    assert engine.find_original_word("retrn") == "return"
+    assert len(list(typo_cache_directory.iterdir())) == 2
+
+    forget_loaded_tables(monkeypatch)
+    forbid_building(monkeypatch)
+    assert TypoEngine(WORDS).find_original_word("retrn") is None
+    assert TypoEngine(OTHER_WORDS).find_original_word("retrn") == "return"
+
+
+# tables an older format stored for the same vocabulary are replaced
+def test_stale_format_is_replaced(monkeypatch, typo_cache_directory):
+    with monkeypatch.context() as old_format:
+        old_format.setattr(typo_cache, "CACHE_FORMAT_VERSION", 0)
+        TypoEngine(WORDS)
+        TypoEngine(OTHER_WORDS)
+    forget_loaded_tables(monkeypatch)
+
+    TypoEngine(WORDS)
+    current = f"typo-index-{typo_tables_fingerprint(WORDS, 'index', TYPO_RULES)}.marshal"
+    names = sorted(path.name for path in typo_cache_directory.iterdir())
+    assert current in names
+    assert len(names) == 2  # the stale tables of WORDS are gone, the stale tables of OTHER_WORDS are not
+
+
+@pytest.mark.parametrize("contents", [b"", b"not marshal data", b"\xe3\x00"])
+def test_corrupt_cache_file_is_rebuilt(contents, monkeypatch, typo_cache_directory):
+    fingerprint = typo_tables_fingerprint(WORDS, "index", TYPO_RULES)
+    cache_file = typo_cache_directory / f"typo-index-{fingerprint}.marshal"
+    cache_file.write_bytes(contents)
+
+    assert load_typo_tables(fingerprint, "index") is None
+    assert TypoEngine(WORDS).find_original_word("prrint") == "print"
+
+    forget_loaded_tables(monkeypatch)
+    assert load_typo_tables(fingerprint, "index") is not None
+
+
+def test_cache_file_for_another_fingerprint_is_ignored(monkeypatch, typo_cache_directory):
+    fingerprint = typo_tables_fingerprint(WORDS, "index", TYPO_RULES)
+    other = typo_tables_fingerprint(OTHER_WORDS, "index", TYPO_RULES)
+    store_typo_tables(other, "index", {"typo_index": {}, "ambiguous_typos": {}})
+    (typo_cache_directory / f"typo-index-{other}.marshal").rename(
+        typo_cache_directory / f"typo-index-{fingerprint}.marshal"
+    )
+    forget_loaded_tables(monkeypatch)
+
+    assert load_typo_tables(fingerprint, "index") is None
+
+
+# the cache is only an optimisation, so an engine can still be made when the cache directory can't be written to
+def test_unwritable_cache_directory(monkeypatch, tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    monkeypatch.setenv("PYHTON_CACHE_DIR", str(blocker / "pyhton"))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        engine = TypoEngine(WORDS)
+    assert engine.find_original_word("prrint") == "print"
@@ -0,0 +1,151 @@
+import random
+import warnings
+from typing import Iterator, Optional
+
+import pytest
+
+from pyhton.language.python_words import ALL_WORDS
+from pyhton.language.typo_engine import TypoEngine
+from pyhton.language.typo_trie import TypoTrie
+
+# words that are not a typo of anything in the vocabulary, or too short to count as one
+NOT_TYPOS = ["x", "i", "", "total", "fib", "counter", "prnt", "rnage", "deff_", "PRINT"]
+
+
+# every doubled, missing and swapped letter variant of a word, made the slow way
+def variants(word: str) -> Iterator[str]:
+    for i in range(len(word)):
+        yield word[:i] + word[i] + word[i:]
+        yield word[:i] + word[i + 1 :]
+    for i in range(len(word) - 1):
+        yield word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+
+
+# the identifiers the matchers are checked on: every variant of every word, the words themselves and non-typos
+def candidate_words(words) -> list:
+    return sorted({variant for word in words for variant in variants(word)} | set(words) | set(NOT_TYPOS))
+
+
+# a vocabulary of short words made of only a few letters, so that many typos could stand for more than one word
+def crowded_vocabulary() -> list:
+    rng = random.Random(7)
+    return sorted({"".join(rng.choice("abcd") for _ in range(rng.randint(2, 6))) for _ in range(80)})
+
+
+# the original per-word lookup: check every typo rule against every word in the vocabulary, picking the
+# alphabetically first word if the typo could stand for more than one
+def find_by_rules(engine: TypoEngine, typo: str) -> Optional[str]:
+    if len(typo) <= 1:
+        return None
+    matches = [word for word in engine.valid_words if engine.is_valid_typo(typo, word)]
+    return min(matches) if matches else None
+
+
+def test_index_matches_rules():
+    engine = TypoEngine(use_cache=False)
+    for word in candidate_words(ALL_WORDS):
+        assert engine.find_original_word(word) == find_by_rules(engine, word), word
+
+
+def test_index_matches_rules_with_some_rules():
+    engine = TypoEngine(rules=["missing_letter", "swapped_letters"], use_cache=False)
+    assert engine.find_original_word("pirnt") == "print"
+    assert engine.find_original_word("prrint") is None
+    for word in candidate_words(ALL_WORDS):
+        assert engine.find_original_word(word) == find_by_rules(engine, word), word
+
+
+def test_trie_matches_rules():
+    engine = TypoEngine(matcher="trie", use_cache=False)
+    for word in candidate_words(ALL_WORDS):
+        assert engine.find_original_word(word) == find_by_rules(engine, word), word
+
+
+def test_trie_matches_rules_with_some_rules():
+    engine = TypoEngine(matcher="trie", rules=["doubled_letter"], use_cache=False)
+    assert engine.find_original_word("prrint") == "print"
+    assert engine.find_original_word("pirnt") is None
+    for word in candidate_words(ALL_WORDS):
+        assert engine.find_original_word(word) == find_by_rules(engine, word), word
+
+
+# in a crowded vocabulary both matchers must still pick the same word as the rules for every ambiguous typo
+def test_matchers_agree_on_ambiguous_typos():
+    vocabulary = crowded_vocabulary()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        index = TypoEngine(vocabulary, use_cache=False)
+    trie = TypoEngine(vocabulary, matcher="trie", use_cache=False)
+    assert index.ambiguous_typos
+
+    for word in candidate_words(vocabulary):
+        expected = find_by_rules(index, word)
+        assert index.find_original_word(word) == expected, word
+        assert trie.find_original_word(word) == expected, word
+
+
+def test_trie_finds_every_original_word():
+    vocabulary = crowded_vocabulary()
+    trie = TypoTrie(vocabulary)
+    engine = TypoEngine(vocabulary, matcher="trie", use_cache=False)
+    for word in candidate_words(vocabulary):
+        expected = {original for original in vocabulary if engine.is_valid_typo(word, original)}
+        assert trie.find_original_words(word) == expected, word
+
+
+def test_typos_of_one_letter_are_ignored():
+    engine = TypoEngine(words=["if", "in"], use_cache=False)
+    assert engine.find_original_word("i") is None
+    assert "i" not in engine.typo_index
+
+
+def test_correct_words():
+    engine = TypoEngine(use_cache=False)
+    assert engine.is_correct_word("print")
+    assert not engine.is_correct_word("prrint")
+    assert not engine.is_correct_word("x")
+
+
+def test_ambiguous_typos_are_reported():
+    with pytest.warns(UserWarning, match=r"'frm' -> \['form', 'from'\]"):
+        engine = TypoEngine(words=["from", "form"], use_cache=False)
+
+    assert engine.ambiguous_typos == {"fom": {"form", "from"}, "frm": {"form", "from"}}
+    assert engine.find_original_word("frm") == "form"
+
+
+def test_unambiguous_vocabulary_does_not_warn():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        engine = TypoEngine(words=["print", "range"], use_cache=False)
+    assert engine.ambiguous_typos == {}
+
+
+# without the cache, the tables are built (and ambiguous typos reported) every time, and nothing is written to disk
+def test_without_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYHTON_CACHE_DIR", str(tmp_path))
+    for _ in range(2):
+        with pytest.warns(UserWarning, match="Ambiguous typos"):
+            engine = TypoEngine(words=["from", "form"], use_cache=False)
+        assert engine.find_original_word("fomr") == "form"
+
+    engine = TypoEngine(words=["from", "form"], matcher="trie", use_cache=False)
+    assert engine.find_original_word("fomr") == "form"
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unknown_matcher_or_rule():
+    with pytest.raises(Exception, match="Unknown typo matcher: regex"):
+        TypoEngine(matcher="regex", use_cache=False)
+    with pytest.raises(Exception, match="Unknown typo rule: extra_letter"):
+        TypoEngine(rules=["extra_letter"], use_cache=False)
+
+
+@pytest.mark.parametrize("matcher", ["index", "trie"])
+def test_classify_many_matches_find_original_word(matcher):
+    engine = TypoEngine(matcher=matcher, use_cache=False)
+    words = candidate_words(ALL_WORDS) * 2
+    assert engine.classify_many(words) == [engine.find_original_word(word) for word in words]
+    assert engine.classify_many(iter(["fi", "x", "fi", "prrint"])) == ["if", None, "if", "print"]
+    assert engine.classify_many([]) == []